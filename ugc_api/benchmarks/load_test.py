@@ -0,0 +1,232 @@
+"""
+Нагрузочный тест сервиса: смесь запросов к настоящим эндпоинтам через ASGI-приложение.
+
+Сценарии (вес в смеси задается аргументами):
+    - movie: чтение фильма с рейтингом и статистикой (GET /movies/{movie_id});
+    - reaction: лайк фильма и его снятие при следующем запросе того же пользователя (POST /reactions/);
+    - bookmarks: список закладок пользователя (GET /bookmarks/);
+    - review: создание рецензии (POST /reviews/).
+
+Приложение вызывается в том же процессе через httpx.ASGITransport, без сети и uvicorn. База данных -
+mongomock-motor или локальный mongod (--mongo-uri), в который записываются тестовые данные в отдельную базу.
+Токены подписываются приватным ключом из tools/keys так же, как в tools/generate_token.py.
+Выводятся пропускная способность и p50/p95/p99 времени ответа по каждому сценарию.
+
+mongomock-motor значительно медленнее настоящей MongoDB, поэтому с ним абсолютные значения завышены,
+но результаты подходят для сравнения изменений в коде сервиса между собой.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/load_test.py --duration 10 --concurrency 16
+    PYTHONPATH=src python benchmarks/load_test.py --mongo-uri mongodb://localhost:27017
+"""
+
+# stdlib
+import argparse
+import asyncio
+import importlib.util
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+# thirdparty
+import beanie
+import httpx
+import mongomock_motor
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# project
+from db.indexes import sync_indexes
+from db.mongodb import COLLECTIONS
+from documents.bookmark import Bookmark
+from documents.movie import Movie
+from documents.movie_stats import MovieStats
+from main import app
+from services.jwt_token import jwt_public_key
+
+TOOLS_DIR = Path(__file__).resolve().parents[2] / "tools"
+API_PREFIX = "/api-ugc/v1"
+BENCHMARK_DB = "ugc_load_test"
+SEED = 42
+PERCENTILES = (50, 95, 99)
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def load_jwt_service() -> Any:
+    """Загружает JWTService из tools/generate_token.py, который не входит в пакет сервиса."""
+    spec = importlib.util.spec_from_file_location("generate_token", TOOLS_DIR / "generate_token.py")
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Не найден {TOOLS_DIR / 'generate_token.py'}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.JWTService()
+
+
+@dataclass
+class User:
+    id: UUID
+    headers: dict[str, str]
+    # Фильмы, которым пользователь поставил лайк: следующий запрос реакции к ним снимает лайк
+    liked: set[UUID] = field(default_factory=set)
+
+
+@dataclass
+class Results:
+    durations: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class Scenarios:
+    """Запросы сценариев нагрузки от имени случайных пользователей к случайным фильмам."""
+
+    def __init__(self, users: list[User], movie_ids: list[UUID], rng: random.Random) -> None:
+        self.users = users
+        self.movie_ids = movie_ids
+        self.rng = rng
+
+    def get_request(self, name: str) -> Request:
+        user = self.rng.choice(self.users)
+        movie_id = self.rng.choice(self.movie_ids)
+        headers = {**user.headers, "X-Request-Id": str(uuid4())}
+
+        if name == "movie":
+            return lambda client: client.get(f"{API_PREFIX}/movies/{movie_id}", headers=headers)
+        if name == "reaction":
+            value = None if movie_id in user.liked else 1
+            user.liked.symmetric_difference_update({movie_id})
+            reaction = {"content_type": "movie", "target_id": str(movie_id), "value": value}
+            return lambda client: client.post(f"{API_PREFIX}/reactions/", json=reaction, headers=headers)
+        if name == "bookmarks":
+            return lambda client: client.get(f"{API_PREFIX}/bookmarks/?page_size=50", headers=headers)
+        if name == "review":
+            review = {"movie_id": str(movie_id), "title": "Нагрузочный тест", "review_text": "Текст рецензии"}
+            return lambda client: client.post(f"{API_PREFIX}/reviews/", json=review, headers=headers)
+        raise ValueError(f"Неизвестный сценарий {name}")
+
+
+async def init_database(mongo_uri: str | None) -> AsyncIOMotorClient:
+    """Подключает Beanie к mongomock-motor или к пустой базе локального mongod."""
+    client: AsyncIOMotorClient
+    if mongo_uri is None:
+        client = mongomock_motor.AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(mongo_uri)
+        await client.drop_database(BENCHMARK_DB)
+    await beanie.init_beanie(database=client.get_database(BENCHMARK_DB), document_models=COLLECTIONS)
+    if mongo_uri is not None:
+        await sync_indexes(COLLECTIONS)
+    return client
+
+
+async def seed(users_count: int, movies_count: int, bookmarks_per_user: int) -> tuple[list[User], list[UUID]]:
+    """Создает фильмы со статистикой и закладки пользователей, возвращает пользователей с токенами."""
+    jwt_service = load_jwt_service()
+    # Токены подписаны ключом из tools/keys, поэтому сервис проверяет их парным публичным ключом
+    jwt_public_key.path = str(TOOLS_DIR / "keys" / "example_public_key.pem")
+    jwt_public_key.reload()
+
+    movies = [Movie(title=f"Фильм {number}", rating=number % 10) for number in range(movies_count)]
+    await Movie.insert_many(movies)
+    await MovieStats.insert_many([MovieStats(id=movie.id) for movie in movies])
+    movie_ids = [movie.id for movie in movies]
+
+    users = []
+    bookmarks = []
+    for _ in range(users_count):
+        user_id = uuid4()
+        token = jwt_service.create_access_token(str(user_id))
+        users.append(User(id=user_id, headers={"Authorization": f"Bearer {token}"}))
+        for movie_id in random.sample(movie_ids, min(bookmarks_per_user, movies_count)):
+            bookmarks.append(Bookmark(user_id=user_id, movie_id=movie_id))
+    if bookmarks:
+        await Bookmark.insert_many(bookmarks)
+    return users, movie_ids
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: Scenarios,
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+) -> tuple[Results, float]:
+    """Выполняет запросы сценариев с заданной конкурентностью и возвращает результаты и фактическую длительность."""
+    results = Results()
+    names = list(weights)
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            name = scenarios.rng.choices(names, weights=[weights[name] for name in names])[0]
+            request = scenarios.get_request(name)
+            request_started_at = time.perf_counter()
+            response = await request(client)
+            results.durations[name].append(time.perf_counter() - request_started_at)
+            if not response.is_success:
+                results.errors[name] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - started_at
+
+
+def print_report(results: Results, elapsed: float) -> None:
+    header = f"{'Сценарий':12} {'Запросов':>9} {'Ошибок':>7} {'Запросов/с':>11}"
+    print(header + "".join(f" {f'p{percentile}, мс':>10}" for percentile in PERCENTILES))
+
+    rows = {**results.durations, "всего": [value for values in results.durations.values() for value in values]}
+    for name, durations in rows.items():
+        errors = results.errors[name] if name in results.durations else sum(results.errors.values())
+        line = f"{name:12} {len(durations):9} {errors:7} {len(durations) / elapsed:11.0f}"
+        if len(durations) > 1:
+            quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+            line += "".join(f" {quantiles[percentile - 1] * 1000:10.2f}" for percentile in PERCENTILES)
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Access-лог и логи приложения на каждый запрос исказили бы замер
+    logging.getLogger().setLevel(logging.WARNING)
+    random.seed(SEED)
+    mongo_client = await init_database(args.mongo_uri)
+    users, movie_ids = await seed(args.users, args.movies, args.bookmarks)
+    scenarios = Scenarios(users, movie_ids, random.Random(SEED))
+    weights = {"movie": args.movie, "reaction": args.reaction, "bookmarks": args.bookmarks_list, "review": args.review}
+    weights = {name: weight for name, weight in weights.items() if weight > 0}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+        await run_load(client, scenarios, weights, args.concurrency, args.warmup)
+        results, elapsed = await run_load(client, scenarios, weights, args.concurrency, args.duration)
+
+    print_report(results, elapsed)
+    if args.mongo_uri is not None:
+        await mongo_client.drop_database(BENCHMARK_DB)
+    mongo_client.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", help="Локальный mongod вместо mongomock-motor, база ugc_load_test удаляется")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Длительность прогрева перед замером, с")
+    parser.add_argument("--concurrency", type=int, default=16, help="Одновременных запросов")
+    parser.add_argument("--users", type=int, default=100, help="Пользователей с токенами")
+    parser.add_argument("--movies", type=int, default=1000, help="Фильмов")
+    parser.add_argument("--bookmarks", type=int, default=20, help="Закладок у пользователя")
+    parser.add_argument("--movie", type=int, default=60, help="Вес чтения фильма в смеси")
+    parser.add_argument("--reaction", type=int, default=20, help="Вес лайка и его снятия")
+    parser.add_argument("--bookmarks-list", type=int, default=15, help="Вес списка закладок")
+    parser.add_argument("--review", type=int, default=5, help="Вес создания рецензии")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
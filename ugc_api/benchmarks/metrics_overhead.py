@@ -0,0 +1,83 @@
+"""
+Микробенчмарк накладных расходов сбора метрик Prometheus.
+
+Измеряет время обработки запроса минимальным ASGI-приложением с MetricsMiddleware и без него,
+а также время обработки пары событий CommandListener на одну команду MongoDB.
+С переменной окружения PROMETHEUS_MULTIPROC_DIR замер выполняется в режиме нескольких воркеров,
+в котором значения метрик пишутся в файлы.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/metrics_overhead.py
+"""
+
+# stdlib
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+# thirdparty
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# project
+from db.command_metrics import CommandMetricsListener
+from middlewares.metrics import MetricsMiddleware
+
+ITERATIONS = 100_000
+CONNECTION_ID = ("mongos1", 27017)
+
+
+class Route:
+    path = "/api-ugc/v1/movies/{movie_id}"
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    scope["route"] = Route()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive() -> Message:
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+async def measure_requests(asgi_app: ASGIApp) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api-ugc/v1/movies/1"}
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await asgi_app(dict(scope), receive, send)
+    return (time.perf_counter() - started_at) / ITERATIONS
+
+
+def measure(function: Callable[[], None]) -> float:
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function()
+    return (time.perf_counter() - started_at) / ITERATIONS
+
+
+def main() -> None:
+    without_metrics = asyncio.run(measure_requests(app))
+    with_metrics = asyncio.run(measure_requests(MetricsMiddleware(app, metrics_path="/metrics")))
+    print(f"Запрос без метрик:  {without_metrics * 1_000_000:6.2f} мкс")
+    overhead = with_metrics - without_metrics
+    print(f"Запрос с метриками: {with_metrics * 1_000_000:6.2f} мкс (+{overhead * 1_000_000:.2f})")
+
+    listener = CommandMetricsListener()
+    started = monitoring.CommandStartedEvent({"find": "movies"}, "Movies", 1, CONNECTION_ID, 1)
+    succeeded = monitoring.CommandSucceededEvent(timedelta(milliseconds=1), {}, "find", 1, CONNECTION_ID, 1)
+
+    def handle_command() -> None:
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    print(f"Команда MongoDB:    {measure(handle_command) * 1_000_000:6.2f} мкс")
+
+
+if __name__ == "__main__":
+    main()
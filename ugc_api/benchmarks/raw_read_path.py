@@ -0,0 +1,92 @@
+"""
+Микробенчмарк чтения страницы из 50 реакций.
+
+Сравнивает прежний путь (модели Beanie из list, проверка по response_model и сериализация ответа FastAPI)
+с list_raw и dumps_documents, которые сериализуют словари MongoDB сразу в JSON.
+
+Время запроса к базе в обоих путях одинаковое, поэтому отдельно измеряется обработка уже прочитанных
+документов, а затем страница целиком. Для сквозного замера используется mongomock-motor, который
+сам по себе медленнее настоящей MongoDB, поэтому выигрыш в сквозном замере занижен.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/raw_read_path.py
+"""
+
+# stdlib
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+# thirdparty
+import beanie
+import mongomock_motor
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import TypeAdapter
+
+# project
+from documents.reaction import Reaction as ReactionDocument
+from schemas.reaction import Reaction
+from services.bson_json import dumps_documents
+from services.repositories.reactions import ReactionRepository
+
+PAGE_SIZE = 50
+ITERATIONS = 2000
+REACTION_FIELDS = list(Reaction.model_fields)
+response_adapter = TypeAdapter(list[Reaction])
+
+
+def serialize_documents(documents: list[ReactionDocument]) -> bytes:
+    """Сериализация ответа так, как ее выполняет FastAPI для response_model=list[Reaction]."""
+    response_content = response_adapter.validate_python(documents, from_attributes=True)
+    return bytes(ORJSONResponse(jsonable_encoder(response_content)).body)
+
+
+async def measure(name: str, read_page: Callable[[], Awaitable[Any]]) -> None:
+    for _ in range(ITERATIONS // 10):
+        await read_page()
+
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await read_page()
+    duration = time.perf_counter() - started_at
+    rows_per_second = ITERATIONS * PAGE_SIZE / duration
+    print(f"{name:45} {duration / ITERATIONS * 1_000_000:8.1f} мкс/страница, {rows_per_second:10.0f} строк/с")
+
+
+async def main() -> None:
+    client: AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient()
+    await beanie.init_beanie(database=client.get_database("benchmark"), document_models=[ReactionDocument])
+    user_id = uuid4()
+    for _ in range(PAGE_SIZE):
+        await ReactionDocument(user_id=user_id, target_id=uuid4()).insert()
+
+    repo = ReactionRepository()
+    records = await repo.list_raw(fields=REACTION_FIELDS, limit=PAGE_SIZE)
+
+    async def parse_and_serialize() -> bytes:
+        documents = [ReactionDocument.model_validate(record) for record in records]
+        return serialize_documents(documents)
+
+    async def dump_raw() -> bytes:
+        return dumps_documents(records, REACTION_FIELDS)
+
+    async def read_documents_page() -> bytes:
+        return serialize_documents(await repo.list(limit=PAGE_SIZE))
+
+    async def read_raw_page() -> bytes:
+        return dumps_documents(await repo.list_raw(fields=REACTION_FIELDS, limit=PAGE_SIZE), REACTION_FIELDS)
+
+    print("Обработка прочитанных документов:")
+    await measure("  модели Beanie + response_model", parse_and_serialize)
+    await measure("  dumps_documents", dump_raw)
+    print("Страница целиком (mongomock-motor):")
+    await measure("  list + response_model", read_documents_page)
+    await measure("  list_raw + dumps_documents", read_raw_page)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
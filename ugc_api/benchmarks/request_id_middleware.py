@@ -0,0 +1,82 @@
+"""
+Микробенчмарк накладных расходов middleware проверки X-Request-Id.
+
+Сравнивает приложение без middleware, прежнюю реализацию через app.middleware("http")
+(BaseHTTPMiddleware) и ASGI-реализацию RequestIdMiddleware.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/request_id_middleware.py
+"""
+
+# stdlib
+import asyncio
+import time
+from collections.abc import Callable
+
+# thirdparty
+import httpx
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
+
+# project
+from middlewares.request_id import RequestIdMiddleware
+
+REQUESTS = 5000
+HEADERS = {"X-Request-Id": "benchmark"}
+
+
+async def request_id_require(request: Request, call_next: Callable) -> ORJSONResponse:
+    """Прежняя реализация middleware на BaseHTTPMiddleware."""
+    request_id = request.headers.get("X-Request-Id")
+    if not request_id:
+        return ORJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "X-Request-Id is required"},
+        )
+    response = await call_next(request)
+    return response
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+async def measure(app: FastAPI) -> float:
+    """Возвращает среднее время обработки запроса в микросекундах."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for _ in range(REQUESTS // 10):
+            await client.get("/ping", headers=HEADERS)
+
+        started_at = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.get("/ping", headers=HEADERS)
+        return (time.perf_counter() - started_at) / REQUESTS * 1_000_000
+
+
+async def main() -> None:
+    baseline_app = create_app()
+
+    base_http_app = create_app()
+    base_http_app.middleware("http")(request_id_require)
+
+    asgi_app = create_app()
+    asgi_app.add_middleware(RequestIdMiddleware)
+
+    baseline = await measure(baseline_app)
+    base_http = await measure(base_http_app)
+    asgi = await measure(asgi_app)
+
+    print(f"Без middleware:                {baseline:8.1f} мкс/запрос")
+    for name, duration in [("BaseHTTPMiddleware (прежний):", base_http), ("RequestIdMiddleware (ASGI):", asgi)]:
+        print(f"{name:30} {duration:8.1f} мкс/запрос, накладные расходы {duration - baseline:6.1f} мкс")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
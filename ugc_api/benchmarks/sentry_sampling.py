@@ -0,0 +1,101 @@
+"""
+Бенчмарк накладных расходов трассировки Sentry при разной доле трассируемых запросов.
+
+Запросы выполняются к минимальному FastAPI-приложению с middleware сервиса, эндпоинт которого создает
+несколько спанов, как запросы к MongoDB. Обращения к базе в замер не входят, поэтому видна стоимость самой
+трассировки. Sentry подключается с RouteTracesSampler и транспортом, который сериализует конверты,
+но никуда их не отправляет: в замер входит построение транзакций и их сериализация, но не сеть.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/sentry_sampling.py
+"""
+
+# stdlib
+import asyncio
+import logging
+import time
+
+# thirdparty
+import httpx
+import sentry_sdk
+from fastapi import FastAPI
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.transport import Transport
+
+# project
+from core.sentry import RouteTracesSampler
+from middlewares.request_id import RequestIdMiddleware
+from middlewares.sentry_traces import SlowRequestTraceMiddleware
+
+REQUESTS = 5000
+ROUNDS = 3
+SPANS_PER_REQUEST = 3
+SAMPLE_RATES = [0.0, 0.01, 0.1, 1.0]
+URL = "/movies/22222222-2222-2222-2222-222222222222"
+
+
+class DiscardingTransport(Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.envelopes = 0
+
+    def capture_envelope(self, envelope: Envelope) -> None:
+        envelope.serialize()
+        self.envelopes += 1
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/movies/{movie_id}")
+    async def get_movie(movie_id: str) -> dict[str, str]:
+        for _ in range(SPANS_PER_REQUEST):
+            with sentry_sdk.start_span(op="db", name="find"):
+                pass
+        return {"id": movie_id}
+
+    app.add_middleware(RequestIdMiddleware)
+    app.add_middleware(SlowRequestTraceMiddleware, slow_request_threshold_ms=1000)
+    return app
+
+
+async def measure(name: str, client: httpx.AsyncClient) -> None:
+    """Выводит лучшее из ROUNDS измерений, чтобы уменьшить влияние шума."""
+    for _ in range(REQUESTS // 10):
+        await client.get(URL)
+
+    durations = []
+    for _ in range(ROUNDS):
+        started_at = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.get(URL)
+        durations.append(time.perf_counter() - started_at)
+    duration = min(durations)
+    print(f"{name:28} {duration / REQUESTS * 1_000_000:8.1f} мкс/запрос, {REQUESTS / duration:8.0f} запросов/с")
+
+
+async def main() -> None:
+    # Логи каждого запроса httpx заметно дороже самой трассировки
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", headers={"X-Request-Id": "bench"}
+    ) as client:
+        sentry_sdk.init()
+        await measure("Sentry выключен", client)
+
+        for rate in SAMPLE_RATES:
+            sentry_transport = DiscardingTransport()
+            sentry_sdk.init(
+                dsn="http://public@localhost/1",
+                transport=sentry_transport,
+                traces_sampler=RouteTracesSampler(app, default_rate=rate, route_rates={}),
+            )
+            await measure(f"Трассировка {rate:.0%} запросов", client)
+            sentry_sdk.flush()
+            print(f"{'':28} транзакций: {sentry_transport.envelopes}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
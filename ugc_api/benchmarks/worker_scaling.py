@@ -0,0 +1,103 @@
+"""
+Бенчмарк масштабирования пропускной способности по числу воркеров продакшн-режима (server.py).
+
+Для каждого числа воркеров запускает server.py на отдельном порту, ждет готовности,
+нагружает эндпоинт из нескольких процессов-клиентов и выводит число запросов в секунду.
+Сервису нужна доступная MongoDB с настройками UGC_MONGO_* из окружения или .env.
+
+Запуск из каталога ugc_api:
+    PYTHONPATH=src python benchmarks/worker_scaling.py --workers 1 2 4 --duration 10
+"""
+
+# stdlib
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# thirdparty
+import httpx
+
+SERVER_PATH = Path(__file__).resolve().parent.parent / "src" / "server.py"
+HEADERS = {"X-Request-Id": "benchmark"}
+STARTUP_TIMEOUT = 60.0
+
+
+async def _load(url: str, concurrency: int, duration: float) -> int:
+    """Отправляет запросы с заданной конкурентностью и возвращает число успешных ответов."""
+    deadline = time.monotonic() + duration
+    completed = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal completed
+        while time.monotonic() < deadline:
+            response = await client.get(url, headers=HEADERS)
+            if response.is_success:
+                completed += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return completed
+
+
+def _run_load(url: str, concurrency: int, duration: float) -> int:
+    return asyncio.run(_load(url, concurrency, duration))
+
+
+def _wait_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.py завершился с кодом {process.returncode}")
+        try:
+            httpx.get(url, headers=HEADERS, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.5)
+    raise TimeoutError(f"Сервис не запустился за {STARTUP_TIMEOUT} с")
+
+
+def measure(workers: int, args: argparse.Namespace) -> float:
+    """Запускает сервис с указанным числом воркеров и возвращает число запросов в секунду."""
+    env = {
+        **os.environ,
+        "UGC_API_WORKERS": str(workers),
+        "UGC_API_PORT": str(args.port),
+        "UGC_API_HOST": "127.0.0.1",
+    }
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    process = subprocess.Popen([sys.executable, str(SERVER_PATH)], env=env, stdout=subprocess.DEVNULL)
+    try:
+        _wait_ready(url, process)
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.starmap(_run_load, [(url, args.concurrency, args.duration)] * args.clients)
+        return sum(results) / args.duration
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность нагрузки, с")
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1, help="Процессов-клиентов")
+    parser.add_argument("--concurrency", type=int, default=16, help="Одновременных запросов на клиента")
+    parser.add_argument("--path", default="/api-ugc/v1/movies/?page_size=50")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    baseline = None
+    for workers in args.workers:
+        rps = measure(workers, args)
+        baseline = baseline or rps
+        print(f"Воркеров: {workers:3}  {rps:10.0f} запросов/с  x{rps / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
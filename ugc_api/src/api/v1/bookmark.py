@@ -5,15 +5,18 @@ from uuid import UUID
 
 # thirdparty
 from beanie.odm.enums import SortDirection
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from motor.motor_asyncio import AsyncIOMotorClientSession
 from pydantic import BaseModel
 from starlette import status
 
 # project
+from api.v1.fields import SparseFields
 from api.v1.pagination import PaginationParams
-from documents.bookmark import Bookmark as BookmarkDocument
+from api.v1.sessions import get_causal_session
 from schemas.auth import JwtToken
 from schemas.bookmark import Bookmark, BookmarkCreateRequest, BookmarkCreateResponse, CreateBookmark
+from services.bson_json import dumps_document, dumps_documents
 from services.jwt_token import JWTBearer
 from services.repositories.bookmarks import BookmarkRepository
 from services.repositories.movies import MovieRepository
@@ -30,6 +33,17 @@ class BookmarkSortParams(BaseModel):
     direction: SortDirection = SortDirection.ASCENDING
 
 
+async def get_user_bookmark_repository(
+    session: Annotated[AsyncIOMotorClientSession | None, Depends(get_causal_session)],
+) -> BookmarkRepository:
+    """
+    Репозиторий закладок, операции которого выполняются в причинно-согласованной сессии клиента.
+
+    Пользователь видит только что созданные и удаленные закладки, даже если они читаются со вторичных узлов.
+    """
+    return BookmarkRepository(session=session)
+
+
 @router.get(
     "/",
     response_model=list[Bookmark],
@@ -38,18 +52,25 @@ class BookmarkSortParams(BaseModel):
     summary="Получение списка закладок",
 )
 async def get_bookmarks(
-    bookmark_repo: Annotated[BookmarkRepository, Depends()],
+    bookmark_repo: Annotated[BookmarkRepository, Depends(get_user_bookmark_repository)],
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
     pagination_params: Annotated[PaginationParams, Depends()],
     sort_params: Annotated[BookmarkSortParams, Depends()],
-) -> list[BookmarkDocument]:
-    return await bookmark_repo.list(
-        skip=pagination_params.page_number - 1,
+    fields: Annotated[list[str], Depends(SparseFields(Bookmark))],
+) -> Response:
+    records = await bookmark_repo.list_raw(
+        fields=fields,
+        skip=pagination_params.offset,
         limit=pagination_params.page_size,
         sort_field=sort_params.order_by,
         sort_order=sort_params.direction,
         filters={"user_id": token_payload.user},
+        after=pagination_params.after,
     )
+    pagination_params.set_next_cursor(
+        bookmark_repo.get_next_raw_cursor(records, pagination_params.page_size, sort_params.order_by)
+    )
+    return pagination_params.json_response(dumps_documents(records, fields))
 
 
 @router.get(
@@ -61,11 +82,16 @@ async def get_bookmarks(
 )
 async def get_bookmark(
     bookmark_id: UUID,
-    bookmark_repo: Annotated[BookmarkRepository, Depends()],
+    bookmark_repo: Annotated[BookmarkRepository, Depends(get_user_bookmark_repository)],
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
-) -> Bookmark:
-    bookmark = await bookmark_repo.get(document_id=bookmark_id, filters={"user_id": token_payload.user})
-    return Bookmark(**bookmark.model_dump())
+    fields: Annotated[list[str], Depends(SparseFields(Bookmark))],
+) -> Response:
+    record = await bookmark_repo.get_raw(
+        document_id=bookmark_id,
+        fields=fields,
+        filters={"user_id": token_payload.user},
+    )
+    return Response(content=dumps_document(record, fields), media_type="application/json")
 
 
 @router.post(
@@ -78,7 +104,7 @@ async def get_bookmark(
 async def create_bookmark(
     bookmark_data: BookmarkCreateRequest,
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
-    bookmark_repo: Annotated[BookmarkRepository, Depends()],
+    bookmark_repo: Annotated[BookmarkRepository, Depends(get_user_bookmark_repository)],
     movie_repo: Annotated[MovieRepository, Depends()],
 ) -> BookmarkCreateResponse:
     await movie_repo.get(bookmark_data.movie_id)
@@ -97,7 +123,6 @@ async def create_bookmark(
 async def delete_bookmark(
     bookmark_id: UUID,
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
-    bookmark_repo: Annotated[BookmarkRepository, Depends()],
+    bookmark_repo: Annotated[BookmarkRepository, Depends(get_user_bookmark_repository)],
 ) -> None:
-    bookmark = await bookmark_repo.get(document_id=bookmark_id, filters={"user_id": token_payload.user})
-    await bookmark.delete()
+    await bookmark_repo.delete(document_id=bookmark_id, filters={"user_id": token_payload.user})
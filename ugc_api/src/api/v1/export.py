@@ -0,0 +1,36 @@
+# stdlib
+from typing import Annotated
+
+# thirdparty
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette import status
+
+# project
+from core.config import settings
+from schemas.auth import JwtToken
+from services.jwt_token import JWTBearer
+from services.user_export import export_user_documents
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    description=(
+        "Выгрузка всех реакций, закладок и рецензий пользователя в формате NDJSON: "
+        'по одной записи вида {"type": ..., "data": ...} на строку'
+    ),
+    summary="Выгрузка данных пользователя",
+    responses={status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_user_data(
+    token_payload: Annotated[JwtToken, Depends(JWTBearer())],
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_user_documents(token_payload.user, batch_size=settings.export_batch_size),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="ugc-export.ndjson"'},
+    )
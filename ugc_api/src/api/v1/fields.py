@@ -0,0 +1,36 @@
+# thirdparty
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from starlette import status
+
+
+class SparseFields:
+    """
+    Параметр fields: список полей ответа через запятую, например ?fields=id,rating.
+
+    Разрешены только поля схемы ответа. Поля возвращаются в порядке схемы,
+    без параметра возвращаются все поля.
+    """
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        self.allowed_fields = list(schema.model_fields)
+
+    def __call__(
+        self,
+        fields: str | None = Query(
+            default=None,
+            description="Поля ответа через запятую. Если не передан, возвращаются все поля",
+        ),
+    ) -> list[str]:
+        if fields is None:
+            return self.allowed_fields
+
+        requested_fields = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown_fields = requested_fields.difference(self.allowed_fields)
+        if not requested_fields or unknown_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}. "
+                f"Allowed fields: {', '.join(self.allowed_fields)}",
+            )
+        return [field for field in self.allowed_fields if field in requested_fields]
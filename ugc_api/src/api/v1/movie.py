@@ -5,15 +5,19 @@ from uuid import UUID
 
 # thirdparty
 from beanie.odm.enums import SortDirection
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from starlette import status
 
 # project
+from api.v1.fields import SparseFields
 from api.v1.pagination import PaginationParams
-from documents.movie import Movie as MovieDocument
-from schemas.movie import CreateMovie, Movie, MovieDetail
+from core.config import settings
+from schemas.movie import MOVIE_DETAILS_MAX_IDS, CreateMovie, Movie, MovieDetail, MovieDetails, MovieImportResult
+from services.bson_json import dumps_documents
 from services.jwt_token import JWTBearer
+from services.movie_import import MovieImporter, iter_ndjson_lines
 from services.repositories.movies import MovieRepository
 
 router = APIRouter()
@@ -40,19 +44,56 @@ async def get_movies(
     movie_repo: Annotated[MovieRepository, Depends()],
     pagination_params: Annotated[PaginationParams, Depends()],
     sort_params: Annotated[MovieSortParams, Depends()],
+    fields: Annotated[list[str], Depends(SparseFields(Movie))],
     rating__gte: Annotated[int | None, Query(description="Фильтр по рейтингу фильма (больше или равно)")] = None,
     rating__lte: Annotated[int | None, Query(description="Фильтр по рейтингу фильма (меньше или равно)")] = None,
-) -> list[MovieDocument]:
+) -> Response:
     filters = {
         "rating__gte": rating__gte,
         "rating__lte": rating__lte,
     }
-    return await movie_repo.list(
-        skip=pagination_params.page_number - 1,
+    records = await movie_repo.list_raw(
+        fields=fields,
+        skip=pagination_params.offset,
         limit=pagination_params.page_size,
         sort_field=sort_params.order_by,
         sort_order=sort_params.direction,
         filters=filters,
+        after=pagination_params.after,
+    )
+    pagination_params.set_next_cursor(
+        movie_repo.get_next_raw_cursor(records, pagination_params.page_size, sort_params.order_by)
+    )
+    return pagination_params.json_response(dumps_documents(records, fields))
+
+
+@router.get(
+    "/details",
+    response_model=MovieDetails,
+    status_code=status.HTTP_200_OK,
+    description="Получение детальной информации о нескольких фильмах в порядке переданных идентификаторов",
+    summary="Получение нескольких фильмов",
+)
+async def get_movie_details(
+    movie_repo: Annotated[MovieRepository, Depends()],
+    ids: Annotated[
+        list[UUID],
+        Query(min_length=1, max_length=MOVIE_DETAILS_MAX_IDS, description="Идентификаторы фильмов"),
+    ],
+    fields: Annotated[list[str], Depends(SparseFields(MovieDetail))],
+) -> ORJSONResponse:
+    movie_details = await movie_repo.get_detail_info_many(ids)
+    movie_ids = list(dict.fromkeys(ids))
+    include = set(fields)
+    return ORJSONResponse(
+        content={
+            "items": [
+                movie_details[movie_id].model_dump(include=include)
+                for movie_id in movie_ids
+                if movie_id in movie_details
+            ],
+            "missing_ids": [movie_id for movie_id in movie_ids if movie_id not in movie_details],
+        }
     )
 
 
@@ -66,9 +107,10 @@ async def get_movies(
 async def get_review(
     movie_id: UUID,
     movie_repo: Annotated[MovieRepository, Depends()],
-) -> MovieDetail:
+    fields: Annotated[list[str], Depends(SparseFields(MovieDetail))],
+) -> ORJSONResponse:
     movie = await movie_repo.get_detail_info(document_id=movie_id)
-    return MovieDetail(**movie.model_dump())
+    return ORJSONResponse(content=movie.model_dump(include=set(fields)))
 
 
 @router.post(
@@ -85,3 +127,25 @@ async def create_reviews(
 ) -> Movie:
     movie = await movie_repo.create(movie_data)
     return Movie(**movie.model_dump())
+
+
+@router.post(
+    "/import",
+    response_model=MovieImportResult,
+    status_code=status.HTTP_200_OK,
+    description="Загрузка фильмов из тела запроса в формате NDJSON: по одному объекту CreateMovie на строку",
+    summary="Импорт фильмов",
+    dependencies=[Depends(JWTBearer())],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def import_movies(request: Request) -> MovieImportResult:
+    importer = MovieImporter(
+        chunk_size=settings.movie_import_chunk_size,
+        max_errors=settings.movie_import_max_errors,
+    )
+    return await importer.run(iter_ndjson_lines(request.stream(), settings.movie_import_max_line_size))
@@ -1,12 +1,56 @@
 # thirdparty
-from fastapi import Query
+from fastapi import Query, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 
 class PaginationParams:
     def __init__(
         self,
+        response: Response,
         page_size: int = Query(default=10, ge=1, le=50),
         page_number: int = Query(default=1, ge=1),
+        after: str | None = Query(
+            default=None,
+            description=(
+                f"Курсор следующей страницы из заголовка {NEXT_CURSOR_HEADER}. "
+                "Если передан, то page_number игнорируется"
+            ),
+        ),
     ) -> None:
+        self.response = response
         self.page_size = page_size
         self.page_number = page_number
+        self.after = after
+
+    @property
+    def offset(self) -> int:
+        """Количество документов, которые нужно пропустить при постраничной выдаче."""
+        if self.after is not None:
+            return 0
+        return (self.page_number - 1) * self.page_size
+
+    def set_next_cursor(self, next_cursor: str | None) -> None:
+        """
+        Передает клиенту курсор следующей страницы в заголовке ответа.
+
+        Args:
+            next_cursor: Курсор следующей страницы. Если None, то страниц больше нет.
+        """
+        if next_cursor is not None:
+            self.response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    def json_response(self, content: bytes) -> Response:
+        """
+        Создает ответ из уже сериализованного JSON с заголовками пагинации.
+
+        Заголовки, установленные через параметр response, FastAPI не переносит
+        в ответ, возвращенный из эндпоинта напрямую, поэтому они копируются здесь.
+
+        Args:
+            content: Тело ответа.
+        """
+        response = Response(content=content, media_type="application/json")
+        if NEXT_CURSOR_HEADER in self.response.headers:
+            response.headers[NEXT_CURSOR_HEADER] = self.response.headers[NEXT_CURSOR_HEADER]
+        return response
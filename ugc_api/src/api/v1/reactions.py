@@ -5,17 +5,27 @@ from uuid import UUID
 
 # thirdparty
 from beanie.odm.enums import SortDirection
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from motor.motor_asyncio import AsyncIOMotorClientSession
 from pydantic import BaseModel
 from starlette import status
 
 # project
+from api.v1.fields import SparseFields
 from api.v1.pagination import PaginationParams
-from documents.reaction import ContentType, LikeValue, Reaction as ReactionDocument
+from api.v1.sessions import get_causal_session, get_reaction_session_repository, get_review_session_repository
+from documents.reaction import ContentType, LikeValue
 from schemas.auth import JwtToken
-from schemas.reaction import Reaction, ReactionRequest, ReactionResponse
+from schemas.reaction import (
+    REACTIONS_BATCH_MAX_SIZE,
+    Reaction,
+    ReactionBatchResult,
+    ReactionRequest,
+    ReactionResponse,
+)
+from services.bson_json import dumps_documents
 from services.jwt_token import JWTBearer
-from services.reactions import remove_user_reaction, update_user_reaction
+from services.reactions import apply_user_reactions_batch, remove_user_reaction, update_user_reaction
 from services.repositories.movies import MovieRepository
 from services.repositories.reactions import ReactionRepository
 from services.repositories.reviews import ReviewRepository
@@ -35,6 +45,22 @@ class ReactionSortParams(BaseModel):
     direction: SortDirection = SortDirection.ASCENDING
 
 
+class ReactionFilterParams:
+    def __init__(
+        self,
+        target_id: Annotated[UUID | None, Query(description="Фильтр по фильму или рецензии")] = None,
+        user_id: Annotated[UUID | None, Query(description="Фильтр по пользователю")] = None,
+        content_type: Annotated[ContentType | None, Query(description="Фильтр по типу контента")] = None,
+        value: Annotated[LikeValue | None, Query(description="Фильтр по значению реакции")] = None,
+    ) -> None:
+        self.filters = {
+            "target_id": target_id,
+            "user_id": user_id,
+            "content_type": content_type,
+            "value": value,
+        }
+
+
 @router.get(
     "/",
     response_model=list[Reaction],
@@ -43,27 +69,25 @@ class ReactionSortParams(BaseModel):
     summary="Получение списка реакций",
 )
 async def get_reactions(
-    reaction_repo: Annotated[ReactionRepository, Depends()],
+    reaction_repo: Annotated[ReactionRepository, Depends(get_reaction_session_repository)],
     pagination_params: Annotated[PaginationParams, Depends()],
     sort_params: Annotated[ReactionSortParams, Depends()],
-    target_id: Annotated[UUID | None, Query(description="Фильтр по фильму или рецензии")] = None,
-    user_id: Annotated[UUID | None, Query(description="Фильтр по пользователю")] = None,
-    content_type: Annotated[ContentType | None, Query(description="Фильтр по типу контента")] = None,
-    value: Annotated[LikeValue | None, Query(description="Фильтр по значению реакции")] = None,
-) -> list[ReactionDocument]:
-    filters = {
-        "target_id": target_id,
-        "user_id": user_id,
-        "content_type": content_type,
-        "value": value,
-    }
-    return await reaction_repo.list(
-        skip=pagination_params.page_number - 1,
+    filter_params: Annotated[ReactionFilterParams, Depends()],
+    fields: Annotated[list[str], Depends(SparseFields(Reaction))],
+) -> Response:
+    records = await reaction_repo.list_raw(
+        fields=fields,
+        skip=pagination_params.offset,
         limit=pagination_params.page_size,
         sort_field=sort_params.order_by,
         sort_order=sort_params.direction,
-        filters=filters,
+        filters=filter_params.filters,
+        after=pagination_params.after,
+    )
+    pagination_params.set_next_cursor(
+        reaction_repo.get_next_raw_cursor(records, pagination_params.page_size, sort_params.order_by)
     )
+    return pagination_params.json_response(dumps_documents(records, fields))
 
 
 @router.post(
@@ -77,7 +101,8 @@ async def evaluate_content(
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
     reaction_request: ReactionRequest,
     movie_repo: Annotated[MovieRepository, Depends()],
-    review_repo: Annotated[ReviewRepository, Depends()],
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
+    session: Annotated[AsyncIOMotorClientSession | None, Depends(get_causal_session)],
 ) -> ReactionResponse:
     if reaction_request.content_type == ContentType.movie:
         repo = movie_repo  # type: ignore
@@ -93,6 +118,7 @@ async def evaluate_content(
             content_type=reaction_request.content_type,
             user_id=token_payload.user,
             repo=repo,
+            session=session,
         )
         return ReactionResponse(success=True)
 
@@ -102,5 +128,28 @@ async def evaluate_content(
         value=reaction_request.value,
         user_id=token_payload.user,
         repo=repo,
+        session=session,
     )
     return ReactionResponse(success=True)
+
+
+@router.post(
+    "/batch",
+    response_model=list[ReactionBatchResult],
+    status_code=status.HTTP_200_OK,
+    description=f"Поставить, изменить или удалить до {REACTIONS_BATCH_MAX_SIZE} реакций одним запросом",
+    summary="Оценить несколько единиц контента",
+)
+async def evaluate_content_batch(
+    token_payload: Annotated[JwtToken, Depends(JWTBearer())],
+    reaction_requests: Annotated[list[ReactionRequest], Body(min_length=1, max_length=REACTIONS_BATCH_MAX_SIZE)],
+    movie_repo: Annotated[MovieRepository, Depends()],
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
+    session: Annotated[AsyncIOMotorClientSession | None, Depends(get_causal_session)],
+) -> list[ReactionBatchResult]:
+    return await apply_user_reactions_batch(
+        user_id=token_payload.user,
+        reaction_requests=reaction_requests,
+        repos={ContentType.movie: movie_repo, ContentType.review: review_repo},
+        session=session,
+    )
@@ -5,15 +5,17 @@ from uuid import UUID
 
 # thirdparty
 from beanie.odm.enums import SortDirection
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from starlette import status
 
 # project
+from api.v1.fields import SparseFields
 from api.v1.pagination import PaginationParams
-from documents.review import Review as ReviewDocument
+from api.v1.sessions import get_review_session_repository
 from schemas.auth import JwtToken
 from schemas.review import CreateReview, CreateReviewData, Review
+from services.bson_json import dumps_document, dumps_documents
 from services.jwt_token import JWTBearer
 from services.repositories.reviews import ReviewRepository
 
@@ -31,6 +33,22 @@ class ReviewSortParams(BaseModel):
     direction: SortDirection = SortDirection.ASCENDING
 
 
+class ReviewFilterParams:
+    def __init__(
+        self,
+        movie_id: Annotated[UUID | None, Query(description="Фильтр по фильму")] = None,
+        user_id: Annotated[UUID | None, Query(description="Фильтр по пользователю")] = None,
+        rating__gte: Annotated[int | None, Query(description="Фильтр по рейтингу рецензии (больше или равно)")] = None,
+        rating__lte: Annotated[int | None, Query(description="Фильтр по рейтингу рецензии (меньше или равно)")] = None,
+    ) -> None:
+        self.filters = {
+            "movie_id": movie_id,
+            "user_id": user_id,
+            "rating__gte": rating__gte,
+            "rating__lte": rating__lte,
+        }
+
+
 @router.get(
     "/",
     response_model=list[Review],
@@ -39,27 +57,25 @@ class ReviewSortParams(BaseModel):
     summary="Получение списка рецензий",
 )
 async def get_reviews(
-    review_repo: Annotated[ReviewRepository, Depends()],
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
     pagination_params: Annotated[PaginationParams, Depends()],
     sort_params: Annotated[ReviewSortParams, Depends()],
-    movie_id: Annotated[UUID | None, Query(description="Фильтр по фильму")] = None,
-    user_id: Annotated[UUID | None, Query(description="Фильтр по пользователю")] = None,
-    rating__gte: Annotated[int | None, Query(description="Фильтр по рейтингу рецензии (больше или равно)")] = None,
-    rating__lte: Annotated[int | None, Query(description="Фильтр по рейтингу рецензии (меньше или равно)")] = None,
-) -> list[ReviewDocument]:
-    filters = {
-        "movie_id": movie_id,
-        "user_id": user_id,
-        "rating__gte": rating__gte,
-        "rating__lte": rating__lte,
-    }
-    return await review_repo.list(
-        skip=pagination_params.page_number - 1,
+    filter_params: Annotated[ReviewFilterParams, Depends()],
+    fields: Annotated[list[str], Depends(SparseFields(Review))],
+) -> Response:
+    records = await review_repo.list_raw(
+        fields=fields,
+        skip=pagination_params.offset,
         limit=pagination_params.page_size,
         sort_field=sort_params.order_by,
         sort_order=sort_params.direction,
-        filters=filters,
+        filters=filter_params.filters,
+        after=pagination_params.after,
+    )
+    pagination_params.set_next_cursor(
+        review_repo.get_next_raw_cursor(records, pagination_params.page_size, sort_params.order_by)
     )
+    return pagination_params.json_response(dumps_documents(records, fields))
 
 
 @router.get(
@@ -71,10 +87,11 @@ async def get_reviews(
 )
 async def get_review(
     review_id: UUID,
-    review_repo: Annotated[ReviewRepository, Depends()],
-) -> Review:
-    review = await review_repo.get(document_id=review_id)
-    return Review(**review.model_dump())
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
+    fields: Annotated[list[str], Depends(SparseFields(Review))],
+) -> Response:
+    record = await review_repo.get_raw(document_id=review_id, fields=fields)
+    return Response(content=dumps_document(record, fields), media_type="application/json")
 
 
 @router.post(
@@ -87,7 +104,7 @@ async def get_review(
 async def create_review(
     review_data: CreateReviewData,
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
-    review_repo: Annotated[ReviewRepository, Depends()],
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
 ) -> Review:
     review = await review_repo.create(CreateReview(**review_data.model_dump(), user_id=token_payload.user))
     return Review(**review.model_dump())
@@ -102,7 +119,7 @@ async def create_review(
 async def delete_review(
     review_id: UUID,
     token_payload: Annotated[JwtToken, Depends(JWTBearer())],
-    review_repo: Annotated[ReviewRepository, Depends()],
+    review_repo: Annotated[ReviewRepository, Depends(get_review_session_repository)],
 ) -> None:
     review = await review_repo.get(document_id=review_id)
     if review.user_id != token_payload.user:
@@ -110,4 +127,4 @@ async def delete_review(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can delete only your review",
         )
-    await review.delete()
+    await review_repo.delete_document(review)
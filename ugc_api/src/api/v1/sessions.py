@@ -0,0 +1,53 @@
+# stdlib
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+# thirdparty
+from fastapi import Depends, Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+
+# project
+from documents.reaction import Reaction
+from middlewares.causal_time import CAUSAL_TIME_STATE
+from services.causal_sessions import CAUSAL_TIME_COOKIE, dump_operation_times, start_causal_session
+from services.repositories.reactions import ReactionRepository
+from services.repositories.reviews import ReviewRepository
+
+
+async def get_causal_session(request: Request) -> AsyncIterator[AsyncIOMotorClientSession | None]:
+    """
+    Причинно-согласованная сессия MongoDB, продолжающая предыдущие запросы клиента.
+
+    Клиент видит свои записи (закладки, рецензии, реакции), даже если они читаются со вторичных узлов.
+    Время последней операции сессии возвращается клиенту в cookie через CausalTimeCookieMiddleware.
+    """
+    # В заглушках motor у коллекции нет свойства database
+    client: AsyncIOMotorClient = Reaction.get_motor_collection().database.client  # type: ignore[assignment]
+    previous_causal_time = request.cookies.get(CAUSAL_TIME_COOKIE)
+    async with start_causal_session(client, previous_causal_time) as session:
+        try:
+            yield session
+        finally:
+            causal_time = dump_operation_times(session) if session is not None else None
+            if causal_time is not None and causal_time != previous_causal_time:
+                setattr(request.state, CAUSAL_TIME_STATE, causal_time)
+
+
+async def get_review_session_repository(
+    session: Annotated[AsyncIOMotorClientSession | None, Depends(get_causal_session)],
+) -> ReviewRepository:
+    """
+    Репозиторий рецензий, операции которого выполняются в причинно-согласованной сессии клиента.
+
+    Автор видит только что созданную рецензию, даже если рецензии читаются со вторичных узлов.
+    """
+    return ReviewRepository(session=session)
+
+
+async def get_reaction_session_repository(
+    session: Annotated[AsyncIOMotorClientSession | None, Depends(get_causal_session)],
+) -> ReactionRepository:
+    """
+    Репозиторий реакций, операции которого выполняются в причинно-согласованной сессии клиента.
+    """
+    return ReactionRepository(session=session)
@@ -1,5 +1,5 @@
 # stdlib
-from logging import config as logging_config
+from typing import Any
 
 # thirdparty
 from dotenv import find_dotenv, load_dotenv
@@ -7,9 +7,8 @@ from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # project
-from core.logger import LOGGING
+from core.logger import setup_logging
 
-logging_config.dictConfig(LOGGING)
 DOTENV_PATH = find_dotenv(".env")
 load_dotenv(DOTENV_PATH)
 
@@ -18,19 +17,94 @@ class AppSettings(BaseSettings):
     project_name: str = Field(default="UGC API")
     api_production: bool = Field(default=True)
 
+    # Запуск в продакшн-режиме (server.py)
+    api_host: str = Field(default="0.0.0.0")
+    api_port: int = Field(default=8000)
+    # Количество процессов-воркеров, 0 - по числу доступных процессу ядер
+    api_workers: int = Field(default=1)
+    # Перезапуск воркера после указанного числа запросов, 0 - без перезапуска (с одним воркером не применяется)
+    api_limit_max_requests: int = Field(default=0)
+    # Сколько секунд после SIGTERM ждать завершения обрабатываемых запросов
+    api_graceful_shutdown_timeout: int = Field(default=30)
+
     # MongoDB
     mongo_db: str = Field(default="Movies")
     mongo_user: str = Field(default="")
     mongo_password: str = Field(default="")
     mongo_host: str = Field(default="mongos1")
     mongo_port: int = Field(default=27017)
+    # Роутеры mongos через запятую, например "mongos1:27017,mongos2:27017". Если не заданы, то mongo_host:mongo_port
+    mongo_hosts: str = Field(default="")
+    # Запросы распределяются между mongos, время отклика которых отличается от лучшего не больше чем на это значение
+    mongo_local_threshold_ms: int = Field(default=15)
+    # Пул соединений (значения 0 оставляют значение по умолчанию драйвера)
+    mongo_max_pool_size: int = Field(default=100)
+    mongo_min_pool_size: int = Field(default=0)
+    mongo_max_idle_time_ms: int = Field(default=0)
+    mongo_wait_queue_timeout_ms: int = Field(default=0)
+    mongo_server_selection_timeout_ms: int = Field(default=30000)
+    # Сжатие трафика через запятую в порядке предпочтения: zstd (пакет zstandard), snappy (python-snappy), zlib
+    mongo_compressors: str = Field(default="")
+    # Чтение публичных списков и статистики со вторичных узлов (secondaryPreferred)
+    mongo_secondary_reads: bool = Field(default=False)
+    # Допустимое отставание вторичного узла от первичного в секундах (MongoDB требует не меньше 90)
+    mongo_max_staleness_seconds: int = Field(default=90, ge=90)
+
+    # Буфер отложенной записи рейтингов и счетчиков статистики
+    counter_buffer_enabled: bool = Field(default=False)
+    counter_buffer_flush_interval: float = Field(default=1.0)
+    counter_buffer_max_pending: int = Field(default=1000)
+
+    # Кеш детальной информации о фильмах в памяти процесса (0 отключает кеш)
+    movie_cache_ttl: float = Field(default=5.0)
+    movie_cache_max_size: int = Field(default=10000)
+
+    # Импорт фильмов из NDJSON
+    movie_import_chunk_size: int = Field(default=1000)
+    movie_import_max_line_size: int = Field(default=64 * 1024)
+    movie_import_max_errors: int = Field(default=1000)
+
+    # Выгрузка данных пользователя: размер пачки курсора MongoDB
+    export_batch_size: int = Field(default=1000)
+
+    # Лог медленных команд MongoDB (0 отключает)
+    slow_query_threshold_ms: float = Field(default=100.0)
+    # explain медленных запросов в фоне, не чаще раза в slow_query_explain_interval секунд для одной формы запроса
+    slow_query_explain: bool = Field(default=False)
+    slow_query_explain_interval: float = Field(default=300.0)
+    slow_query_explain_max_shapes: int = Field(default=1000)
+
+    # Логи в stdout: в формате JSON (False - текстом), через очередь, которую выводит отдельный поток
+    log_json: bool = Field(default=True)
+    # При переполнении очереди (stdout не успевает) записи отбрасываются
+    log_queue_max_size: int = Field(default=10000)
+    # Доля записей access-лога по умолчанию и для отдельных маршрутов, ответы 4xx и 5xx логируются всегда
+    log_access_sample_rate: float = Field(default=1.0, ge=0, le=1)
+    log_access_route_rates: dict[str, float] = Field(default_factory=dict)
+
+    # Метрики Prometheus
+    metrics_enabled: bool = Field(default=True)
+    metrics_path: str = Field(default="/metrics")
+    # Каталог для метрик воркеров в продакшн-режиме с несколькими воркерами. Если не задан, то временный каталог
+    metrics_multiproc_dir: str = Field(default="")
 
     # Sentry
     sentry_dsn: str = Field(default="")
+    # Доля трассируемых запросов по умолчанию и для отдельных маршрутов,
+    # например {"POST /api-ugc/v1/reviews/": 1.0, "GET /api-ugc/v1/movies/": 0.001}
+    sentry_traces_sample_rate: float = Field(default=0.01, ge=0, le=1)
+    sentry_traces_route_rates: dict[str, float] = Field(default_factory=dict)
+    # Запросы дольше порога и завершившиеся ошибкой 5xx отправляются в Sentry независимо от выборки (0 - только ошибки)
+    sentry_slow_request_threshold_ms: float = Field(default=1000.0)
 
     # Работа с токенами
     jwt_algorithm: str = Field(default="RS256")
     jwt_public_key_path: str = Field(default="/app/keys/example_public_key.pem")
+    # Как часто проверять, не изменился ли файл публичного ключа (в секундах)
+    jwt_public_key_check_interval: float = Field(default=5.0)
+    # Кеш проверенных токенов (0 отключает кеш)
+    jwt_cache_ttl: float = Field(default=300.0)
+    jwt_cache_max_size: int = Field(default=10000)
 
     # Другие настройки
     test_mode: bool = Field(default=False)
@@ -42,14 +116,33 @@ class AppSettings(BaseSettings):
         env_prefix="ugc_",
     )
 
+    @property
+    def mongo_seeds(self) -> str:
+        hosts = [host.strip() for host in self.mongo_hosts.split(",") if host.strip()]
+        return ",".join(hosts) if hosts else f"{self.mongo_host}:{self.mongo_port}"
+
     @property
     def mongo_dns(self) -> str:
         if not self.mongo_user or not self.mongo_password:
-            return f"mongodb://{self.mongo_host}:{self.mongo_port}/{self.mongo_db}"
-        return (
-            f"mongodb://{self.mongo_user}:{self.mongo_password}@{self.mongo_host}:{self.mongo_port}/"
-            f"{self.mongo_db}?authSource=admin"
-        )
+            return f"mongodb://{self.mongo_seeds}/{self.mongo_db}"
+        return f"mongodb://{self.mongo_user}:{self.mongo_password}@{self.mongo_seeds}/{self.mongo_db}?authSource=admin"
+
+    @property
+    def mongo_client_options(self) -> dict[str, Any]:
+        """Параметры пула соединений и сжатия для AsyncIOMotorClient."""
+        options: dict[str, Any] = {"localThresholdMS": self.mongo_local_threshold_ms}
+        pool_options = {
+            "maxPoolSize": self.mongo_max_pool_size,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_time_ms,
+            "waitQueueTimeoutMS": self.mongo_wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+        }
+        # Нулевые значения не передаются, чтобы драйвер использовал свои: maxPoolSize=0 в pymongo снимает ограничение
+        options.update((name, value) for name, value in pool_options.items() if value)
+        if self.mongo_compressors:
+            options["compressors"] = self.mongo_compressors
+        return options
 
     @property
     def jwt_public_key(self) -> str:
@@ -63,3 +156,9 @@ class AppSettings(BaseSettings):
 
 
 settings = AppSettings()
+setup_logging(
+    json_logs=settings.log_json,
+    queue_max_size=settings.log_queue_max_size,
+    access_sample_rate=settings.log_access_sample_rate,
+    access_route_rates=settings.log_access_route_rates,
+)
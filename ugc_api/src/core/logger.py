@@ -1,57 +1,204 @@
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_DEFAULT_HANDLERS = [
-    "console",
-]
+# stdlib
+import atexit
+import copy
+import logging
+import queue
+import random
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from logging import config as logging_config
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, cast
 
-LOGGING = {
+# thirdparty
+import orjson
+from fastapi import status
+
+# project
+from core.metrics import LOG_RECORDS_DROPPED
+from middlewares.request_id import RequestIdFilter, get_request_route
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] [%(route)s] %(message)s"
+ACCESS_LOGGER = "uvicorn.access"
+# Аргументы записи access-лога uvicorn: адрес клиента, метод, путь, версия HTTP, статус
+ACCESS_LOG_ARGS_COUNT = 5
+# Атрибуты любой записи лога. Остальные атрибуты добавлены фильтрами или через extra и выводятся в JSON,
+# кроме color_message: uvicorn передает в extra копию сообщения с ANSI-кодами цвета для консоли
+LOG_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "color_message"}
+
+LOGGING: dict[str, Any] = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "verbose": {"format": LOG_FORMAT},
-        "default": {
-            "()": "uvicorn.logging.DefaultFormatter",
-            "fmt": "%(levelprefix)s %(message)s",
-            "use_colors": None,
-        },
-        "access": {
-            "()": "uvicorn.logging.AccessFormatter",
-            "fmt": ("%(levelprefix)s %(client_addr)s - '%(request_line)s' %(status_code)s"),
-        },
+        "json": {"()": "core.logger.JsonFormatter"},
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "verbose",
-        },
-        "default": {
-            "formatter": "default",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stdout",
-        },
-        "access": {
-            "formatter": "access",
-            "class": "logging.StreamHandler",
+            "formatter": "json",
             "stream": "ext://sys.stdout",
         },
     },
     "loggers": {
-        "": {
-            "handlers": LOG_DEFAULT_HANDLERS,
-            "level": "INFO",
+        # Логи uvicorn, включая access-лог, выводятся через очередь корневого логгера
+        "uvicorn": {
+            "handlers": [],
+            "propagate": True,
         },
         "uvicorn.error": {
             "level": "INFO",
         },
-        "uvicorn.access": {
-            "handlers": ["access"],
+        ACCESS_LOGGER: {
+            "handlers": [],
             "level": "INFO",
-            "propagate": False,
+            "propagate": True,
         },
     },
     "root": {
         "level": "INFO",
-        "formatter": "verbose",
-        "handlers": LOG_DEFAULT_HANDLERS,
+        "handlers": ["console"],
     },
 }
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись лога в строку JSON с полями запроса (X-Request-Id, маршрут) для сбора логов в ELK."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update((key, value) for key, value in vars(record).items() if key not in LOG_RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(data, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Передает записи логов в ограниченную очередь, из которой их выводит поток QueueListener.
+
+    Если вывод не успевает и очередь заполнена, запись отбрасывается: задержка запросов важнее полноты логов.
+    """
+
+    exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Сообщение и traceback форматируются до постановки в очередь: аргументы могут измениться после вызова логгера
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class AccessLogSampler(logging.Filter):
+    """
+    Оставляет долю записей access-лога uvicorn, заданную для маршрута вида "GET /api-ugc/v1/movies/".
+
+    Ответы со статусом 400 и выше логируются всегда. В оставленные записи добавляются поля запроса для JSON.
+    """
+
+    def __init__(self, default_rate: float, route_rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.default_rate = default_rate
+        self.route_rates = route_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not isinstance(record.args, tuple) or len(record.args) != ACCESS_LOG_ARGS_COUNT:
+            return True
+
+        client_addr, method, path, _, status_code = cast(tuple[str, str, str, str, int], record.args)
+        if status_code < status.HTTP_400_BAD_REQUEST and not self._sample(method):
+            return False
+        record.client_addr = client_addr
+        record.method = method
+        record.path = path
+        record.status_code = status_code
+        return True
+
+    def _sample(self, method: Any) -> bool:
+        rate = self.default_rate
+        route = get_request_route()
+        if self.route_rates and route is not None:
+            rate = self.route_rates.get(f"{method} {route}", self.default_rate)
+        return rate >= 1 or random.random() < rate
+
+
+class LogQueue:
+    """
+    Очередь логов: обработчики корневого логгера вызываются в потоке QueueListener, а не в потоке event loop.
+
+    X-Request-Id и маршрут добавляются в записи до постановки в очередь, пока доступен контекст запроса.
+    """
+
+    def __init__(self) -> None:
+        self._listener: QueueListener | None = None
+
+    def start(self, max_size: int) -> None:
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        records: queue.Queue[logging.LogRecord] = queue.Queue(max_size)
+        queue_handler = NonBlockingQueueHandler(records)
+        queue_handler.addFilter(RequestIdFilter())
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        self._listener = QueueListener(records, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Останавливает поток, предварительно выведя записи, оставшиеся в очереди."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+log_queue = LogQueue()
+atexit.register(log_queue.stop)
+
+
+def setup_logging(
+    json_logs: bool,
+    queue_max_size: int,
+    access_sample_rate: float,
+    access_route_rates: Mapping[str, float],
+) -> None:
+    """
+    Настраивает логирование сервиса: вывод в stdout в формате JSON (или текстом) через очередь и отдельный поток.
+
+    Args:
+        json_logs: Выводить записи в формате JSON.
+        queue_max_size: Размер очереди логов, при переполнении записи отбрасываются.
+        access_sample_rate: Доля записей access-лога по умолчанию.
+        access_route_rates: Доля записей access-лога для маршрутов вида "GET /api-ugc/v1/movies/".
+    """
+    log_queue.stop()
+    config = copy.deepcopy(LOGGING)
+    if not json_logs:
+        config["handlers"]["console"]["formatter"] = "verbose"
+    logging_config.dictConfig(config)
+    access_logger = logging.getLogger(ACCESS_LOGGER)
+    # dictConfig не удаляет фильтры логгера, оставшиеся от предыдущей настройки
+    access_logger.filters = [item for item in access_logger.filters if not isinstance(item, AccessLogSampler)]
+    access_logger.addFilter(AccessLogSampler(access_sample_rate, access_route_rates))
+    log_queue.start(queue_max_size)
@@ -0,0 +1,95 @@
+# stdlib
+import os
+
+# thirdparty
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter as PrometheusCounter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Переменная окружения prometheus_client: если она задана, метрики воркеров пишутся в файлы в этом каталоге
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+MONGO_COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNTER_BUFFER_FLUSH_SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNTER_BUFFER_FLUSH_LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "ugc_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "ugc_http_requests_in_progress",
+    "Число обрабатываемых HTTP-запросов",
+    multiprocess_mode="livesum",
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "ugc_mongo_command_duration_seconds",
+    "Время выполнения команды MongoDB",
+    ["collection", "command"],
+    buckets=MONGO_COMMAND_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = PrometheusCounter(
+    "ugc_mongo_command_failures_total",
+    "Число команд MongoDB, завершившихся ошибкой",
+    ["collection", "command"],
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "ugc_mongo_pool_checkout_wait_seconds",
+    "Время ожидания соединения из пула MongoDB",
+    buckets=MONGO_COMMAND_BUCKETS,
+)
+MONGO_POOL_CONNECTIONS_IN_USE = Gauge(
+    "ugc_mongo_pool_connections_in_use",
+    "Число занятых соединений пула MongoDB",
+    multiprocess_mode="livesum",
+)
+COUNTER_BUFFER_FLUSH_SIZE = Histogram(
+    "ugc_counter_buffer_flush_size",
+    "Число документов, счетчики которых записаны одним сбросом буфера",
+    buckets=COUNTER_BUFFER_FLUSH_SIZE_BUCKETS,
+)
+COUNTER_BUFFER_FLUSH_LAG = Histogram(
+    "ugc_counter_buffer_flush_lag_seconds",
+    "Время от первого изменения счетчика в буфере до его записи в MongoDB",
+    buckets=COUNTER_BUFFER_FLUSH_LAG_BUCKETS,
+)
+LOG_RECORDS_DROPPED = PrometheusCounter(
+    "ugc_log_records_dropped_total",
+    "Число записей логов, отброшенных из-за переполнения очереди логирования",
+)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Возвращает метрики в текстовом формате Prometheus.
+
+    В режиме нескольких воркеров метрики собираются из файлов всех процессов,
+    поэтому ответ не зависит от того, какой воркер принял запрос.
+
+    Returns:
+        Тело ответа и его Content-Type.
+    """
+    if not is_multiprocess():
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Удаляет значения gauge завершающегося воркера, чтобы они не учитывались в livesum."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
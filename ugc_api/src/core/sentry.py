@@ -0,0 +1,62 @@
+# stdlib
+from collections.abc import Mapping
+from typing import Any
+
+# thirdparty
+import sentry_sdk
+from starlette.applications import Starlette
+from starlette.routing import Match
+from starlette.types import Scope
+
+# project
+from core.config import settings
+
+
+class RouteTracesSampler:
+    """
+    traces_sampler для Sentry: доля трассируемых запросов задается для маршрутов вида "GET /api-ugc/v1/movies/".
+
+    Решение принимается в начале запроса, до маршрутизации, поэтому маршрут определяется сопоставлением пути
+    с маршрутами приложения. Решение вызывающего сервиса (заголовок sentry-trace) сохраняется.
+    """
+
+    def __init__(self, app: Starlette, default_rate: float, route_rates: Mapping[str, float]) -> None:
+        self.app = app
+        self.default_rate = default_rate
+        self.route_rates = route_rates
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return float(parent_sampled)
+
+        scope = sampling_context.get("asgi_scope")
+        if not self.route_rates or scope is None or scope.get("type") != "http":
+            return self.default_rate
+
+        route_key = self.get_route_key(scope)
+        if route_key is None:
+            return self.default_rate
+        return self.route_rates.get(route_key, self.default_rate)
+
+    def get_route_key(self, scope: Scope) -> str | None:
+        """Возвращает маршрут запроса в виде "МЕТОД шаблон пути" или None, если маршрут не найден."""
+        for route in self.app.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return f"{scope['method']} {getattr(route, 'path', '')}"
+        return None
+
+
+def init_sentry(app: Starlette) -> None:
+    """Подключает Sentry с выборкой трассировок по маршрутам из настроек."""
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        # Ошибки отправляются всегда, выборка относится только к трассировкам
+        sample_rate=1.0,
+        traces_sampler=RouteTracesSampler(
+            app,
+            default_rate=settings.sentry_traces_sample_rate,
+            route_rates=settings.sentry_traces_route_rates,
+        ),
+    )
@@ -0,0 +1,45 @@
+# stdlib
+from collections.abc import Mapping
+from typing import Any
+
+# thirdparty
+from pymongo import monitoring
+
+# project
+from core.metrics import MONGO_COMMAND_DURATION, MONGO_COMMAND_FAILURES
+
+
+def get_command_collection(command_name: str, command: Mapping[str, Any]) -> str:
+    """Возвращает имя коллекции из документа команды или пустую строку для команд уровня базы."""
+    if command_name == "getMore":
+        collection = command.get("collection")
+    else:
+        collection = command.get(command_name)
+    return collection if isinstance(collection, str) else ""
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Записывает в гистограмму Prometheus время выполнения команд MongoDB по коллекциям и командам.
+
+    В событии завершения команды нет ее документа, поэтому коллекция запоминается при старте команды.
+    """
+
+    def __init__(self) -> None:
+        self._collections: dict[tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        collection = get_command_collection(event.command_name, event.command)
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1_000_000)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+command_metrics_listener = CommandMetricsListener()
@@ -0,0 +1,93 @@
+# stdlib
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections import Counter
+
+# thirdparty
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+# project
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RouterUsageListener(monitoring.CommandListener):
+    """Считает выполненные команды по адресам mongos, чтобы видеть распределение нагрузки между ними."""
+
+    def __init__(self) -> None:
+        self.commands: Counter[str] = Counter()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        host, port = event.connection_id
+        self.commands[f"{host}:{port}"] += 1
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+async def check_failover(duration: float, concurrency: int) -> int:
+    """
+    Выполняет чтения через все mongos из настроек и раз в секунду выводит число успешных и неудачных запросов.
+
+    Пока проверка работает, один из роутеров можно остановить (make check-failover делает это сам):
+    чтения должны продолжать выполняться через оставшийся mongos.
+
+    Args:
+        duration: Длительность проверки в секундах.
+        concurrency: Число одновременных запросов.
+
+    Returns:
+        Код выхода: 1, если были неудачные запросы, иначе 0.
+    """
+    listener = RouterUsageListener()
+    client: AsyncIOMotorClient = AsyncIOMotorClient(
+        settings.mongo_dns,
+        event_listeners=[listener],
+        **settings.mongo_client_options,
+    )
+    collection = client.get_database(settings.mongo_db).get_collection("movies")
+    per_second: Counter[str] = Counter()
+    total: Counter[str] = Counter()
+    deadline = time.monotonic() + duration
+
+    async def read() -> None:
+        while time.monotonic() < deadline:
+            try:
+                await collection.find_one({})
+                result = "ok"
+            except PyMongoError as e:
+                result = "failed"
+                logger.error(f"Ошибка чтения: {e}")
+            per_second[result] += 1
+            total[result] += 1
+
+    async def report() -> None:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            print(f"ok={per_second['ok']:8} failed={per_second['failed']:6} routers={dict(listener.commands)}")
+            per_second.clear()
+            listener.commands.clear()
+
+    try:
+        await asyncio.gather(report(), *(read() for _ in range(concurrency)))
+    finally:
+        client.close()
+    print(f"Всего: ok={total['ok']} failed={total['failed']}")
+    return 1 if total["failed"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check_failover(args.duration, args.concurrency)))
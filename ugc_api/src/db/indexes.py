@@ -0,0 +1,196 @@
+# stdlib
+import asyncio
+import logging
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+# thirdparty
+from beanie import Document
+from beanie.odm.fields import IndexModelField
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pydantic import BaseModel
+from pymongo.errors import PyMongoError
+
+# project
+from api.v1.bookmark import BookmarkSortParams
+from api.v1.movie import MovieSortParams
+from api.v1.reactions import ReactionSortParams
+from api.v1.review import ReviewSortParams
+from core.config import settings
+from documents.bookmark import Bookmark
+from documents.movie import Movie
+from documents.movie_stats import MovieStats
+from documents.reaction import ContentType, Reaction
+from documents.review import Review
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_ID = Binary.from_uuid(UUID("00000000-0000-0000-0000-000000000000"))
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Форма запроса, который выполняет сервис: коллекция, фильтр и сортировка."""
+
+    name: str
+    document: type[Document]
+    filter: dict[str, Any]
+    sort: list[tuple[str, int]] = field(default_factory=list)
+
+
+def get_list_query_shapes(
+    name: str,
+    document: type[Document],
+    sort_params: type[BaseModel],
+    filters: dict[str, dict[str, Any]],
+) -> list[QueryShape]:
+    """
+    Возвращает формы запросов списка для каждого поля сортировки, которое принимает эндпоинт.
+
+    Поля и направление сортировки берутся из параметров сортировки эндпоинта, поэтому новая сортировка
+    сразу попадает в проверку индексов. Как и BaseRepository.list, сортировка дополняется полем _id.
+
+    Args:
+        name: Название списка, например "reviews.list".
+        document: Документ, коллекция которого читается.
+        sort_params: Параметры сортировки эндпоинта с полями order_by и direction.
+        filters: Фильтры списка по названиям, пустое название означает список без фильтров.
+
+    Returns:
+        Формы запросов для всех сочетаний фильтра и поля сортировки.
+    """
+    order_by = sort_params.model_fields["order_by"].default
+    direction = int(sort_params.model_fields["direction"].default)
+    shapes = []
+    for filter_name, query in filters.items():
+        for sort_field in type(order_by):
+            description = " ".join(
+                part
+                for part in (
+                    name,
+                    f"by {filter_name}" if filter_name else "",
+                    f"order_by {sort_field}",
+                    "(default)" if sort_field == order_by else "",
+                )
+                if part
+            )
+            shapes.append(QueryShape(description, document, query, [(str(sort_field), direction), ("_id", direction)]))
+    return shapes
+
+
+# Формы запросов из services/repositories/* и services/reactions.py
+QUERY_SHAPES: list[QueryShape] = [
+    QueryShape("movies.get/update_rating_count", Movie, {"_id": SAMPLE_ID}),
+    QueryShape("movies.get_detail_info_many", Movie, {"_id": {"$in": [SAMPLE_ID]}}),
+    *get_list_query_shapes("movies.list", Movie, MovieSortParams, {"": {}, "rating": {"rating": {"$gte": 0}}}),
+    QueryShape(
+        "reactions.upsert/remove_value",
+        Reaction,
+        {"content_type": ContentType.movie, "target_id": SAMPLE_ID, "user_id": SAMPLE_ID},
+    ),
+    QueryShape(
+        "reactions.get_movie_statistics",
+        Reaction,
+        {"target_id": SAMPLE_ID, "content_type": ContentType.movie},
+    ),
+    *get_list_query_shapes(
+        "reactions.list",
+        Reaction,
+        ReactionSortParams,
+        {"": {}, "user_id": {"user_id": SAMPLE_ID}, "target_id": {"target_id": SAMPLE_ID}},
+    ),
+    QueryShape("reviews.get/update_rating_count", Review, {"_id": SAMPLE_ID}),
+    QueryShape("reviews.get_movie_statistics", Review, {"movie_id": SAMPLE_ID}),
+    *get_list_query_shapes(
+        "reviews.list",
+        Review,
+        ReviewSortParams,
+        {
+            "": {},
+            "movie_id": {"movie_id": SAMPLE_ID},
+            "user_id": {"user_id": SAMPLE_ID},
+            "rating": {"rating": {"$gte": 0}},
+        },
+    ),
+    QueryShape("bookmarks.get/delete", Bookmark, {"_id": SAMPLE_ID, "user_id": SAMPLE_ID}),
+    QueryShape("bookmarks.get_or_create", Bookmark, {"movie_id": SAMPLE_ID, "user_id": SAMPLE_ID}),
+    *get_list_query_shapes("bookmarks.list", Bookmark, BookmarkSortParams, {"user_id": {"user_id": SAMPLE_ID}}),
+    QueryShape("bookmarks.get_movie_statistics", Bookmark, {"movie_id": SAMPLE_ID}),
+    QueryShape("movie_stats.get_statistics/increment", MovieStats, {"_id": SAMPLE_ID}),
+    QueryShape("movie_stats.get_statistics_many", MovieStats, {"_id": {"$in": [SAMPLE_ID]}}),
+]
+
+
+async def sync_indexes(document_models: list[type[Document]]) -> None:
+    """
+    Создает индексы, объявленные в Settings документов, которых еще нет в базе.
+
+    Существующие индексы с той же спецификацией MongoDB пропускает, лишние индексы не удаляются.
+
+    Args:
+        document_models: Документы, индексы которых нужно синхронизировать.
+    """
+    for document in document_models:
+        indexes = IndexModelField.list_to_index_model(document.get_settings().indexes)
+        if not indexes:
+            continue
+        try:
+            created = await document.get_motor_collection().create_indexes(indexes)
+            logger.info(f"Индексы коллекции {document.get_collection_name()} синхронизированы: {created}")
+        except PyMongoError as e:
+            logger.error(f"Ошибка создания индексов коллекции {document.get_collection_name()}: {e}")
+
+
+def _iter_stages(plan: Any) -> Iterator[str]:
+    """Обходит план запроса и возвращает названия всех его стадий."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _iter_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _iter_stages(item)
+
+
+async def find_unindexed_query_shapes(database: AsyncIOMotorDatabase) -> list[str]:
+    """
+    Выполняет explain для каждой формы запроса и возвращает те, что выполняются полным сканированием коллекции.
+
+    Args:
+        database: База данных, в которой проверяются запросы.
+
+    Returns:
+        Названия форм запросов, в плане которых есть стадия COLLSCAN.
+    """
+    unindexed = []
+    for shape in QUERY_SHAPES:
+        cursor = database[shape.document.get_collection_name()].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        explain = await cursor.explain()
+        if "COLLSCAN" in _iter_stages(explain["queryPlanner"]):
+            unindexed.append(shape.name)
+    return unindexed
+
+
+async def check_indexes() -> int:
+    client: AsyncIOMotorClient = AsyncIOMotorClient(settings.mongo_dns)
+    try:
+        unindexed = await find_unindexed_query_shapes(client.get_database(settings.mongo_db))
+    finally:
+        client.close()
+
+    for shape_name in unindexed:
+        logger.error(f"Запрос без индекса (COLLSCAN): {shape_name}")
+    if not unindexed:
+        logger.info("Все формы запросов используют индексы.")
+    return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(check_indexes()))
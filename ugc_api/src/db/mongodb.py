@@ -1,15 +1,23 @@
 # stdlib
+import asyncio
 import logging
 
 # thirdparty
 from beanie import Document, init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import OperationFailure
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
 
 # project
 from core.config import settings
+from db.command_metrics import command_metrics_listener
+from db.indexes import sync_indexes
+from db.pool_metrics import pool_metrics_listener
+from db.sharding import shard_collections
+from db.slow_queries import propagate_context_to_motor, slow_query_listener
 from documents.bookmark import Bookmark
 from documents.movie import Movie
+from documents.movie_stats import MovieStats
 from documents.reaction import Reaction
 from documents.review import Review
 
@@ -20,28 +28,57 @@ COLLECTIONS: list[type[Document]] = [
     Reaction,
     Review,
     Bookmark,
+    MovieStats,
 ]
 
+_background_tasks: set[asyncio.Task] = set()
 
-async def init_mongodb() -> AsyncIOMotorClient:
-    client: AsyncIOMotorClient = AsyncIOMotorClient(settings.mongo_dns)
 
+async def prewarm_pool(client: AsyncIOMotorClient, connections: int) -> None:
+    """
+    Открывает соединения пула заранее, чтобы первые запросы не ждали установки соединения.
+
+    Одновременные ping занимают разные соединения, поэтому пул создает их сразу, не дожидаясь
+    фонового поддержания minPoolSize.
+
+    Args:
+        client: Клиент MongoDB.
+        connections: Сколько соединений открыть.
+    """
+    if connections <= 0:
+        return
     try:
-        admin_db = client.get_database("admin")
-        for collection in COLLECTIONS:
-            collection_name = collection.Settings.name
-            await admin_db.command(
-                "shardCollection",
-                f"{settings.mongo_db}.{collection_name}",
-                key={"id": "hashed"},
-            )
-            logger.info(f"Шардирование коллекции {collection_name} настроено.")
-    except OperationFailure as e:
-        logger.error(f"Ошибка настройки шардирования коллекций: {e}")
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+    except PyMongoError as e:
+        logger.error(f"Ошибка прогрева пула соединений MongoDB: {e}")
+
+
+async def init_mongodb() -> AsyncIOMotorClient:
+    event_listeners: list[monitoring.CommandListener | monitoring.ConnectionPoolListener] = [pool_metrics_listener]
+    if settings.metrics_enabled:
+        event_listeners.append(command_metrics_listener)
+    if settings.slow_query_threshold_ms > 0:
+        propagate_context_to_motor()
+        event_listeners.append(slow_query_listener)
+    client: AsyncIOMotorClient = AsyncIOMotorClient(
+        settings.mongo_dns,
+        event_listeners=event_listeners,
+        **settings.mongo_client_options,
+    )
+    slow_query_listener.start(client)
+    await prewarm_pool(client, settings.mongo_min_pool_size)
+
+    await shard_collections(client, COLLECTIONS)
 
     await init_beanie(
         database=client.get_database(settings.mongo_db),
         document_models=COLLECTIONS,
+        skip_indexes=True,
     )
 
+    # Индексы создаются в фоне, чтобы построение индексов на больших коллекциях не задерживало запуск
+    task = asyncio.create_task(sync_indexes(COLLECTIONS))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
     return client
@@ -0,0 +1,64 @@
+# stdlib
+import argparse
+import asyncio
+import logging
+import sys
+
+# thirdparty
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# project
+from core.config import settings
+from db.mongodb import COLLECTIONS
+from documents.movie import Movie
+from services.reactions import rebuild_movie_statistics
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_all_movie_statistics(concurrency: int) -> int:
+    """
+    Пересчитывает документы статистики всех фильмов по реакциям, закладкам и рецензиям.
+
+    Идентификаторы фильмов читаются курсором, поэтому в памяти одновременно находится не больше concurrency фильмов.
+
+    Args:
+        concurrency: Сколько фильмов пересчитывать одновременно.
+
+    Returns:
+        Число фильмов, статистика которых пересчитана.
+    """
+    rebuilt = 0
+    movie_ids = []
+    async for record in Movie.get_motor_collection().find({}, projection={"_id": True}):
+        movie_ids.append(record["_id"].as_uuid())
+        if len(movie_ids) >= concurrency:
+            await asyncio.gather(*(rebuild_movie_statistics(movie_id) for movie_id in movie_ids))
+            rebuilt += len(movie_ids)
+            movie_ids.clear()
+    await asyncio.gather(*(rebuild_movie_statistics(movie_id) for movie_id in movie_ids))
+    return rebuilt + len(movie_ids)
+
+
+async def backfill_movie_statistics(concurrency: int) -> int:
+    client: AsyncIOMotorClient = AsyncIOMotorClient(settings.mongo_dns, **settings.mongo_client_options)
+    try:
+        await init_beanie(
+            database=client.get_database(settings.mongo_db),
+            document_models=COLLECTIONS,
+            skip_indexes=True,
+        )
+        rebuilt = await rebuild_all_movie_statistics(concurrency)
+    finally:
+        client.close()
+
+    logger.info(f"Статистика пересчитана для {rebuilt} фильмов.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(backfill_movie_statistics(args.concurrency)))
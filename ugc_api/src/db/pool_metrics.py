@@ -0,0 +1,102 @@
+# stdlib
+import logging
+import threading
+from dataclasses import asdict, dataclass
+
+# thirdparty
+from pymongo import monitoring
+
+# project
+from core.metrics import MONGO_POOL_CHECKOUT_WAIT, MONGO_POOL_CONNECTIONS_IN_USE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolMetrics:
+    connections_created: int = 0
+    connections_closed: int = 0
+    connections_in_use: int = 0
+    max_connections_in_use: int = 0
+    checkouts: int = 0
+    checkout_failures: int = 0
+    checkout_wait_total: float = 0.0
+    max_checkout_wait: float = 0.0
+    pool_clears: int = 0
+
+    @property
+    def average_checkout_wait(self) -> float:
+        return self.checkout_wait_total / self.checkouts if self.checkouts else 0.0
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Собирает метрики пулов соединений MongoDB: время ожидания соединения и число занятых соединений.
+
+    Обе метрики экспортируются в Prometheus, сводка всех счетчиков пишется в лог при остановке сервиса.
+    События приходят из потоков pymongo, поэтому счетчики изменяются под блокировкой.
+    """
+
+    def __init__(self) -> None:
+        self.metrics = PoolMetrics()
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> PoolMetrics:
+        """Возвращает копию текущих метрик."""
+        with self._lock:
+            return PoolMetrics(**asdict(self.metrics))
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.metrics.checkouts += 1
+            self.metrics.connections_in_use += 1
+            self.metrics.max_connections_in_use = max(
+                self.metrics.max_connections_in_use,
+                self.metrics.connections_in_use,
+            )
+            if event.duration is not None:
+                self.metrics.checkout_wait_total += event.duration
+                self.metrics.max_checkout_wait = max(self.metrics.max_checkout_wait, event.duration)
+        MONGO_POOL_CONNECTIONS_IN_USE.inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.metrics.connections_in_use -= 1
+        MONGO_POOL_CONNECTIONS_IN_USE.dec()
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.metrics.checkout_failures += 1
+        logger.warning(f"Не удалось получить соединение с MongoDB {event.address}: {event.reason}")
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.metrics.connections_created += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.metrics.connections_closed += 1
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.metrics.pool_clears += 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+
+pool_metrics_listener = PoolMetricsListener()
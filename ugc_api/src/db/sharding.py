@@ -0,0 +1,71 @@
+# stdlib
+import logging
+from typing import Any
+
+# thirdparty
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
+
+# project
+from core.config import settings
+from db.indexes import QUERY_SHAPES, QueryShape
+
+logger = logging.getLogger(__name__)
+
+
+def get_shard_key(document: type[Document]) -> dict[str, Any]:
+    """Возвращает ключ шардирования, объявленный в Settings документа."""
+    return document.Settings.shard_key  # type: ignore[attr-defined]
+
+
+async def shard_collections(client: AsyncIOMotorClient, document_models: list[type[Document]]) -> None:
+    """
+    Включает шардирование коллекций по ключам, объявленным в Settings документов.
+
+    Уже шардированная коллекция не перешардируется: для смены ключа нужен reshardCollection.
+
+    Args:
+        client: Клиент, подключенный к mongos.
+        document_models: Документы, коллекции которых нужно шардировать.
+    """
+    admin_db = client.get_database("admin")
+    for document in document_models:
+        collection_name = document.Settings.name
+        try:
+            await admin_db.command(
+                "shardCollection",
+                f"{settings.mongo_db}.{collection_name}",
+                key=get_shard_key(document),
+            )
+            logger.info(f"Шардирование коллекции {collection_name} настроено.")
+        except OperationFailure as e:
+            logger.error(f"Ошибка настройки шардирования коллекции {collection_name}: {e}")
+
+
+def is_targeted(shape: QueryShape) -> bool:
+    """
+    Проверяет, может ли mongos направить запрос на часть шардов, а не на все.
+
+    Запрос адресный, если фильтр содержит точное равенство по первому полю ключа шардирования.
+    Для хешированного ключа это единственный способ избежать рассылки на все шарды.
+
+    Args:
+        shape: Форма запроса.
+
+    Returns:
+        True, если запрос адресный, и False, если он рассылается на все шарды.
+    """
+    leading_field = next(iter(get_shard_key(shape.document)))
+    value = shape.filter.get(leading_field)
+    return value is not None and not isinstance(value, dict)
+
+
+def describe_query_routing() -> list[tuple[str, bool]]:
+    """Возвращает для каждой формы запроса сервиса признак адресного выполнения."""
+    return [(shape.name, is_targeted(shape)) for shape in QUERY_SHAPES]
+
+
+if __name__ == "__main__":
+    for shape_name, targeted in describe_query_routing():
+        logger.info(f"{'targeted ' if targeted else 'broadcast'}  {shape_name}")
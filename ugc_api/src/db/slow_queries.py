@@ -0,0 +1,240 @@
+# stdlib
+import asyncio
+import contextvars
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+# thirdparty
+import orjson
+from motor.frameworks import asyncio as motor_asyncio_framework
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+# project
+from core.config import settings
+from db.command_metrics import get_command_collection
+from middlewares.request_id import request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Служебные поля команды, которые не относятся к форме запроса и не передаются в explain
+SERVICE_FIELDS = frozenset(
+    {
+        "lsid",
+        "txnNumber",
+        "$db",
+        "$clusterTime",
+        "$readPreference",
+        "readConcern",
+        "writeConcern",
+        "cursor",
+        "batchSize",
+        "comment",
+        "maxTimeMS",
+        "startTransaction",
+        "autocommit",
+    }
+)
+# Поля со значениями, форма которых не нужна: например, вставляемые документы
+OMITTED_FIELDS = frozenset({"documents"})
+EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"})
+# Поле с операциями команд записи: explain принимает update и delete только с одной операцией
+WRITE_STATEMENTS_FIELDS = {"update": "updates", "delete": "deletes"}
+# Сигнатура motor.frameworks.asyncio.run_on_executor, которую подменяет propagate_context_to_motor
+RUN_ON_EXECUTOR_PARAMETERS = ["loop", "fn", "args", "kwargs"]
+PLACEHOLDER = "?"
+
+
+def normalize_query(value: Any) -> Any:
+    """
+    Заменяет значения в запросе на "?", оставляя поля, операторы и стадии конвейера.
+
+    Одинаковые элементы списков схлопываются, поэтому $in и $or из одинаковых условий дают одну форму
+    независимо от числа элементов.
+    """
+    if isinstance(value, Mapping):
+        return {key: normalize_query(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        items = []
+        for item in value:
+            normalized = normalize_query(item)
+            if normalized not in items:
+                items.append(normalized)
+        return items if any(isinstance(item, dict | list) for item in items) else PLACEHOLDER
+    return PLACEHOLDER
+
+
+def get_query_shape(command_name: str, command: Mapping[str, Any]) -> str:
+    """
+    Возвращает нормализованную форму команды, одинаковую для запросов, отличающихся только значениями.
+
+    Args:
+        command_name: Имя команды, например find.
+        command: Документ команды из события CommandStartedEvent.
+
+    Returns:
+        Форма запроса в виде JSON, например {"filter":{"movie_id":"?"},"sort":{"created_at":"?"}}.
+    """
+    shape = {
+        key: PLACEHOLDER if key in OMITTED_FIELDS else normalize_query(value)
+        for key, value in command.items()
+        if key != command_name and key not in SERVICE_FIELDS
+    }
+    return orjson.dumps(shape).decode()
+
+
+def get_plan_stages(explain: Mapping[str, Any]) -> list[str]:
+    """
+    Возвращает стадии выигравших планов из результата explain, например ["SHARD_MERGE", "FETCH", "IXSCAN"].
+
+    Стадии собираются со всех шардов, поэтому по ним видны и COLLSCAN, и опрос всех шардов.
+    """
+    stages: list[str] = []
+
+    def collect(plan: Any) -> None:
+        if isinstance(plan, Mapping):
+            stage = plan.get("stage")
+            if isinstance(stage, str) and stage not in stages:
+                stages.append(stage)
+            for key, value in plan.items():
+                if key != "rejectedPlans":
+                    collect(value)
+        elif isinstance(plan, list):
+            for item in plan:
+                collect(item)
+
+    collect(explain.get("queryPlanner", explain))
+    return stages
+
+
+def is_explainable(command_name: str, command: Mapping[str, Any]) -> bool:
+    """Проверяет, что для команды можно выполнить explain: update и delete только с одной операцией."""
+    if command_name not in EXPLAINABLE_COMMANDS:
+        return False
+    statements_field = WRITE_STATEMENTS_FIELDS.get(command_name)
+    return statements_field is None or len(command.get(statements_field, [])) == 1
+
+
+def propagate_context_to_motor() -> None:
+    """
+    Передает контекст asyncio в потоки, в которых motor выполняет операции pymongo.
+
+    События мониторинга команд вызываются в этих потоках, и без контекста в них недоступен request_id_var.
+    Подменяется закрытая функция motor run_on_executor, через которую проходит каждый вызов motor, поэтому
+    каждый вызов дополнительно копирует контекст (contextvars.copy_context). Если сигнатура функции
+    в новой версии motor изменилась, подмена не выполняется, и в логах медленных запросов не будет X-Request-Id.
+    """
+    run_on_executor: Callable[..., Any] = motor_asyncio_framework.run_on_executor
+    if getattr(run_on_executor, "propagates_context", False):
+        return
+    if list(inspect.signature(run_on_executor).parameters) != RUN_ON_EXECUTOR_PARAMETERS:
+        logger.warning("Неизвестная сигнатура motor run_on_executor: X-Request-Id не передается в потоки motor")
+        return
+
+    def run_on_executor_with_context(loop: asyncio.AbstractEventLoop, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        return run_on_executor(loop, contextvars.copy_context().run, fn, *args, **kwargs)
+
+    run_on_executor_with_context.propagates_context = True  # type: ignore[attr-defined]
+    motor_asyncio_framework.run_on_executor = run_on_executor_with_context
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Логирует команды MongoDB, выполнявшиеся дольше порога, с формой запроса и X-Request-Id.
+
+    Для медленных запросов может выполняться explain в фоне, не чаще одного раза в explain_interval
+    секунд для одной формы запроса: по выигравшему плану видно, был ли COLLSCAN или опрос всех шардов.
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool, explain_interval: float, max_shapes: int) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        self._commands: dict[tuple[Any, int], tuple[Mapping[str, Any], str, str | None]] = {}
+        self._explained_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._client: AsyncIOMotorClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self, client: AsyncIOMotorClient) -> None:
+        """Запоминает клиент и цикл событий, в котором будут выполняться explain."""
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if self.threshold_ms <= 0 or event.command_name == "explain":
+            return
+        self._commands[(event.connection_id, event.request_id)] = (
+            event.command,
+            event.database_name,
+            request_id_var.get(),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+    def _finish(self, event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent) -> None:
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if started is None or duration_ms < self.threshold_ms:
+            return
+
+        command, database_name, request_id = started
+        collection = get_command_collection(event.command_name, command)
+        shape = f"{collection}.{event.command_name} {get_query_shape(event.command_name, command)}"
+        logger.warning(f"Медленный запрос {duration_ms:.1f} мс: {shape} [request_id={request_id or '-'}]")
+        if self.explain and is_explainable(event.command_name, command) and self._should_explain(shape):
+            self._schedule_explain(command, database_name, shape)
+
+    def _should_explain(self, shape: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            explained_at = self._explained_at.get(shape)
+            if explained_at is not None and now - explained_at < self.explain_interval:
+                return False
+            if len(self._explained_at) >= self.max_shapes:
+                self._explained_at.clear()
+            self._explained_at[shape] = now
+            return True
+
+    def _schedule_explain(self, command: Mapping[str, Any], database_name: str, shape: str) -> None:
+        if self._client is None or self._loop is None or self._loop.is_closed():
+            return
+        explained_command = {key: value for key, value in command.items() if key not in SERVICE_FIELDS}
+        asyncio.run_coroutine_threadsafe(
+            self._explain(self._client, explained_command, database_name, shape),
+            self._loop,
+        )
+
+    @staticmethod
+    async def _explain(
+        client: AsyncIOMotorClient,
+        command: dict[str, Any],
+        database_name: str,
+        shape: str,
+    ) -> None:
+        try:
+            explain = await client.get_database(database_name).command(
+                {"explain": command, "verbosity": "queryPlanner"},
+            )
+        except PyMongoError as e:
+            logger.error(f"Ошибка explain медленного запроса {shape}: {e}")
+            return
+        logger.warning(f"План медленного запроса {shape}: {', '.join(get_plan_stages(explain))}")
+
+
+slow_query_listener = SlowQueryListener(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain=settings.slow_query_explain,
+    explain_interval=settings.slow_query_explain_interval,
+    max_shapes=settings.slow_query_explain_max_shapes,
+)
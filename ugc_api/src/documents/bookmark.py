@@ -5,6 +5,7 @@ from uuid import UUID, uuid4
 # thirdparty
 from beanie import Document
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 
 class Bookmark(Document):
@@ -15,3 +16,15 @@ class Bookmark(Document):
 
     class Settings:
         name = "bookmarks"
+        # Закладки читаются только в рамках пользователя, ключ совпадает с уникальным индексом
+        shard_key = {"user_id": ASCENDING, "movie_id": ASCENDING}
+        indexes = [
+            # Закладка на фильм у пользователя единственная; список закладок пользователя
+            IndexModel([("user_id", ASCENDING), ("movie_id", ASCENDING)], name="user_movie", unique=True),
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="user_created_at",
+            ),
+            # Подсчет закладок фильма
+            IndexModel([("movie_id", ASCENDING)], name="movie"),
+        ]
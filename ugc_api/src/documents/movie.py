@@ -5,6 +5,7 @@ from uuid import UUID, uuid4
 # thirdparty
 from beanie import Document
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 
 class Movie(Document):
@@ -15,3 +16,10 @@ class Movie(Document):
 
     class Settings:
         name = "movies"
+        # Фильмы читаются и обновляются по _id
+        shard_key = {"_id": "hashed"}
+        indexes = [
+            # Сортировка и фильтрация списка фильмов по рейтингу / дате создания
+            IndexModel([("rating", ASCENDING), ("_id", ASCENDING)], name="rating_id"),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        ]
@@ -0,0 +1,20 @@
+# stdlib
+from uuid import UUID
+
+# thirdparty
+from beanie import Document
+from pydantic import Field
+
+
+class MovieStats(Document):
+    id: UUID = Field()  # type: ignore
+    likes_count: int = 0
+    dislikes_count: int = 0
+    reactions_count: int = 0
+    bookmarks_count: int = 0
+    reviews_count: int = 0
+
+    class Settings:
+        name = "movie_stats"
+        # Статистика читается и обновляется по идентификатору фильма
+        shard_key = {"_id": "hashed"}
@@ -6,6 +6,7 @@ from uuid import UUID, uuid4
 # thirdparty
 from beanie import Document
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 
 class ContentType(StrEnum):
@@ -29,3 +30,23 @@ class Reaction(Document):
 
     class Settings:
         name = "reactions"
+        # Все запросы к реакциям фильтруют по target_id, ключ совпадает с уникальным индексом
+        shard_key = {"target_id": ASCENDING, "content_type": ASCENDING, "user_id": ASCENDING}
+        indexes = [
+            # Реакция пользователя на контент уникальна: upsert/remove и статистика по target_id
+            IndexModel(
+                [("target_id", ASCENDING), ("content_type", ASCENDING), ("user_id", ASCENDING)],
+                name="target_content_type_user",
+                unique=True,
+            ),
+            # Список реакций пользователя
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="user_created_at",
+            ),
+            # Сортировка списка реакций без фильтров: по дате создания (по умолчанию) и остальным полям ReactionOrderBy
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+            IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+            IndexModel([("content_type", ASCENDING), ("_id", ASCENDING)], name="content_type_id"),
+            IndexModel([("value", ASCENDING), ("_id", ASCENDING)], name="value_id"),
+        ]
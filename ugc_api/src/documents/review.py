@@ -5,6 +5,7 @@ from uuid import UUID, uuid4
 # thirdparty
 from beanie import Document
 from pydantic import Field, field_validator
+from pymongo import ASCENDING, IndexModel
 
 
 class Review(Document):
@@ -18,6 +19,25 @@ class Review(Document):
 
     class Settings:
         name = "reviews"
+        # Рецензии подсчитываются и выводятся по фильму
+        shard_key = {"movie_id": ASCENDING, "_id": ASCENDING}
+        indexes = [
+            # Подсчет и список рецензий к фильму
+            IndexModel(
+                [("movie_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="movie_created_at_id",
+            ),
+            # Список рецензий пользователя
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="user_created_at_id",
+            ),
+            # Фильтрация и сортировка списка рецензий по рейтингу
+            IndexModel([("rating", ASCENDING), ("_id", ASCENDING)], name="rating_id"),
+            # Сортировка списка рецензий без фильтров: по заголовку (по умолчанию) и по дате создания
+            IndexModel([("title", ASCENDING), ("_id", ASCENDING)], name="title_id"),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        ]
 
     @field_validator("review_text", "title")
     @classmethod
@@ -10,7 +10,7 @@ from starlette.responses import JSONResponse, Response
 
 # project
 from exceptions.auth_exceptions import AuthError
-from services.repositories.base import DocumentNotFoundException
+from services.repositories.base import DocumentNotFoundException, InvalidCursorException
 
 
 async def auth_exception_handler(_: Request, exc: AuthError) -> JSONResponse:
@@ -34,8 +34,16 @@ async def document_duplicate_exception_handler(_: Request, __: DuplicateKeyError
     )
 
 
+async def invalid_cursor_exception_handler(_: Request, exc: InvalidCursorException) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
 exception_handlers: dict[int | type[Exception], Callable[[Request, Any], Coroutine[Any, Any, Response]]] | None = {
     AuthError: auth_exception_handler,
     DocumentNotFoundException: document_not_found_exception_handler,
     DuplicateKeyError: document_duplicate_exception_handler,
+    InvalidCursorException: invalid_cursor_exception_handler,
 }
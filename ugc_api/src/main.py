@@ -1,31 +1,48 @@
 # stdlib
+import asyncio
+import logging
+import signal
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 # thirdparty
-import sentry_sdk
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
 # project
 from api.v1 import api_router as api_v1_router
 from core.config import settings
+from core.metrics import mark_process_dead
+from core.sentry import init_sentry
 from db.mongodb import init_mongodb
+from db.pool_metrics import pool_metrics_listener
 from handlers import exception_handlers
-from middlewares.request_id import request_id_require
+from middlewares.causal_time import CausalTimeCookieMiddleware
+from middlewares.metrics import MetricsMiddleware
+from middlewares.request_id import RequestIdMiddleware
+from middlewares.sentry_traces import SlowRequestTraceMiddleware
+from services.counter_buffer import counter_buffer
+from services.jwt_token import jwt_public_key
 
-if settings.sentry_dsn:
-    sentry_sdk.init(
-        dsn=str(settings.sentry_dsn),
-        traces_sample_rate=1.0,
-    )
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     client = await init_mongodb()
+    try:
+        jwt_public_key.reload()
+        # SIGHUP перечитывает публичный ключ без перезапуска сервиса
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, jwt_public_key.reload)
+    except (ValueError, NotImplementedError) as e:
+        logger.error(f"Ошибка загрузки публичного ключа JWT: {e}")
+    if settings.counter_buffer_enabled:
+        counter_buffer.start()
     yield
+    await counter_buffer.stop()
+    logger.info(f"Метрики пула соединений MongoDB: {pool_metrics_listener.snapshot()}")
     client.close()
+    mark_process_dead()
 
 
 app = FastAPI(
@@ -39,6 +56,19 @@ app = FastAPI(
     exception_handlers=exception_handlers,  # type: ignore
 )
 
-app.middleware("http")(request_id_require)
+app.add_middleware(RequestIdMiddleware)
+if settings.mongo_secondary_reads:
+    app.add_middleware(CausalTimeCookieMiddleware, max_age=settings.mongo_max_staleness_seconds)
+if settings.sentry_dsn:
+    app.add_middleware(
+        SlowRequestTraceMiddleware,
+        slow_request_threshold_ms=settings.sentry_slow_request_threshold_ms,
+    )
+if settings.metrics_enabled:
+    # Добавляется последним, чтобы быть внешним: время запроса включает остальные middleware
+    app.add_middleware(MetricsMiddleware, metrics_path=settings.metrics_path)
 
 app.include_router(api_v1_router, prefix="/api-ugc/v1")
+
+if settings.sentry_dsn:
+    init_sentry(app)
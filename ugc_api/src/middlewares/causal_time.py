@@ -0,0 +1,47 @@
+# stdlib
+from http.cookies import SimpleCookie
+
+# thirdparty
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# project
+from services.causal_sessions import CAUSAL_TIME_COOKIE
+
+# Ключ в scope["state"] (request.state), в который зависимость сессии записывает новое значение cookie
+CAUSAL_TIME_STATE = "causal_time"
+
+
+class CausalTimeCookieMiddleware:
+    """
+    ASGI middleware, возвращающий клиенту в cookie время последней операции его причинно-согласованной сессии.
+
+    Значение записывается в request.state при закрытии сессии, уже после того как FastAPI создал ответ,
+    поэтому cookie добавляется в заголовки при отправке ответа.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: int) -> None:
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            causal_time = scope.get("state", {}).get(CAUSAL_TIME_STATE)
+            if message["type"] == "http.response.start" and causal_time is not None:
+                message["headers"] = [*message.get("headers", []), self._get_cookie_header(causal_time)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+    def _get_cookie_header(self, causal_time: str) -> tuple[bytes, bytes]:
+        cookie: SimpleCookie = SimpleCookie()
+        cookie[CAUSAL_TIME_COOKIE] = causal_time
+        # Через max_age записи клиента есть на любом вторичном узле, выбранном с maxStalenessSeconds
+        cookie[CAUSAL_TIME_COOKIE]["max-age"] = self.max_age
+        cookie[CAUSAL_TIME_COOKIE]["path"] = "/"
+        cookie[CAUSAL_TIME_COOKIE]["httponly"] = True
+        cookie[CAUSAL_TIME_COOKIE]["samesite"] = "lax"
+        return b"set-cookie", cookie.output(header="").strip().encode("latin-1")
@@ -0,0 +1,65 @@
+# stdlib
+import time
+
+# thirdparty
+from fastapi import status
+from prometheus_client import Histogram
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# project
+from core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS, render_metrics
+
+# Метка запросов, не совпавших ни с одним маршрутом: путь в метке дал бы неограниченное число рядов
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware, собирающий метрики HTTP-запросов для Prometheus и отдающий их по metrics_path.
+
+    Время запроса записывается с шаблоном маршрута (например, /api-ugc/v1/movies/{movie_id}) и статусом ответа.
+    Метрики отдаются самим middleware, поэтому оно должно быть внешним: запросам Prometheus не нужен X-Request-Id.
+    """
+
+    def __init__(self, app: ASGIApp, metrics_path: str) -> None:
+        self.app = app
+        self.metrics_path = metrics_path
+        # labels() при каждом запросе берет блокировку, поэтому ряды гистограммы кешируются по меткам
+        self._durations: dict[tuple[str, str, str], Histogram] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] == self.metrics_path:
+            content, media_type = await run_in_threadpool(render_metrics)
+            await Response(content=content, media_type=media_type)(scope, receive, send)
+            return
+
+        # Если приложение завершилось исключением до отправки ответа, клиент получит 500
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started_at
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # Маршрут записывается в scope при маршрутизации FastAPI
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            labels = (scope["method"], route_path, str(status_code))
+            histogram = self._durations.get(labels)
+            if histogram is None:
+                histogram = self._durations[labels] = HTTP_REQUEST_DURATION.labels(*labels)
+            histogram.observe(duration)
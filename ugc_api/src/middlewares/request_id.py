@@ -1,20 +1,66 @@
 # stdlib
-from collections.abc import Callable
+import logging
+from contextvars import ContextVar
 
 # thirdparty
-from fastapi import Request, status
+import sentry_sdk
+from fastapi import status
 from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+REQUEST_ID_HEADER = "X-Request-Id"
 
-async def request_id_require(
-    request: Request,
-    call_next: Callable,
-) -> ORJSONResponse:
-    request_id = request.headers.get("X-Request-Id")
-    if not request_id:
-        return ORJSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={"detail": "X-Request-Id is required"},
-        )
-    response = await call_next(request)
-    return response
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+# scope текущего запроса: маршрут записывается в него при маршрутизации FastAPI, уже после middleware
+request_scope_var: ContextVar[Scope | None] = ContextVar("request_scope", default=None)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware, отклоняющий запросы без X-Request-Id.
+
+    Идентификатор и scope запроса сохраняются в контекстных переменных для логов и Sentry.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id:
+            response = ORJSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"{REQUEST_ID_HEADER} is required"},
+            )
+            await response(scope, receive, send)
+            return
+
+        token = request_id_var.set(request_id)
+        scope_token = request_scope_var.set(scope)
+        sentry_sdk.set_tag("request_id", request_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope_var.reset(scope_token)
+            request_id_var.reset(token)
+
+
+def get_request_route() -> str | None:
+    """Возвращает шаблон маршрута текущего запроса (например, /api-ugc/v1/movies/{movie_id}) или None."""
+    scope = request_scope_var.get()
+    route = scope.get("route") if scope is not None else None
+    return getattr(route, "path", None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет идентификатор и маршрут текущего запроса в записи логов."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        record.route = get_request_route() or "-"
+        return True
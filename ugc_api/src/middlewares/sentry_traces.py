@@ -0,0 +1,67 @@
+# stdlib
+import time
+from datetime import UTC, datetime
+
+# thirdparty
+import sentry_sdk
+from fastapi import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class SlowRequestTraceMiddleware:
+    """
+    ASGI middleware, отправляющий в Sentry медленные и завершившиеся ошибкой 5xx запросы, не попавшие в выборку.
+
+    Выборка трассировок решается в начале запроса, когда длительность и статус ответа еще неизвестны.
+    Для таких запросов после ответа отправляется транзакция без дочерних спанов, но с маршрутом, длительностью,
+    статусом и тегами запроса в том же trace, что и события ошибок.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_threshold_ms: float) -> None:
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        start_timestamp = datetime.now(UTC)
+        # Если приложение завершилось исключением до отправки ответа, клиент получит 500
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started_at
+            if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                self._keep_trace(scope, start_timestamp, status_code, "error")
+            elif self.slow_request_threshold > 0 and duration >= self.slow_request_threshold:
+                self._keep_trace(scope, start_timestamp, status_code, "slow")
+
+    @staticmethod
+    def _keep_trace(scope: Scope, start_timestamp: datetime, status_code: int, reason: str) -> None:
+        transaction = sentry_sdk.get_current_scope().transaction
+        if transaction is None or transaction.sampled:
+            return
+
+        route = scope.get("route")
+        name = str(route.path if route is not None else scope["path"])
+        kept_transaction = sentry_sdk.start_transaction(
+            name=name,
+            op="http.server",
+            source="route" if route is not None else "url",
+            trace_id=transaction.trace_id,
+            start_timestamp=start_timestamp,
+            sampled=True,
+        )
+        kept_transaction.set_http_status(status_code)
+        kept_transaction.set_tag("sampling_reason", reason)
+        kept_transaction.finish()
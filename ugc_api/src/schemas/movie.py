@@ -5,6 +5,8 @@ from uuid import UUID
 # thirdparty
 from pydantic import BaseModel
 
+MOVIE_DETAILS_MAX_IDS = 100
+
 
 class Movie(BaseModel):
     id: UUID
@@ -29,12 +31,29 @@ class MovieDetail(BaseModel):
     additional_info: AdditionalInfo
 
 
+class MovieDetails(BaseModel):
+    items: list[MovieDetail]
+    missing_ids: list[UUID]
+
+
 class CreateMovie(BaseModel):
     id: UUID
     title: str
     rating: int
 
 
+class MovieImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class MovieImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: list[MovieImportError]
+
+
 class UpdateMovie(BaseModel):
     title: str
     rating: int
@@ -8,6 +8,8 @@ from pydantic import BaseModel
 # project
 from documents.reaction import ContentType, LikeValue
 
+REACTIONS_BATCH_MAX_SIZE = 100
+
 
 class Reaction(BaseModel):
     content_type: ContentType = ContentType.movie
@@ -37,3 +39,10 @@ class ReactionRequest(BaseModel):
 
 class ReactionResponse(BaseModel):
     success: bool = True
+
+
+class ReactionBatchResult(BaseModel):
+    content_type: ContentType
+    target_id: UUID
+    success: bool
+    detail: str | None = None
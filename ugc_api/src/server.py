@@ -0,0 +1,82 @@
+# stdlib
+import logging
+import os
+import shutil
+import tempfile
+
+# thirdparty
+import uvicorn
+
+# project
+from core.config import settings
+from core.metrics import MULTIPROC_DIR_ENV
+
+logger = logging.getLogger(__name__)
+
+
+def get_workers_count(workers: int) -> int:
+    """Возвращает число воркеров: заданное явно или по числу ядер, доступных процессу."""
+    if workers > 0:
+        return workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_limit_max_requests(workers: int, limit_max_requests: int) -> int | None:
+    """
+    Возвращает число запросов, после которого воркер перезапускается, или None без перезапуска.
+
+    Перезапуском воркеров управляет процесс-супервизор uvicorn, который есть только при нескольких воркерах.
+    С одним воркером uvicorn после limit_max_requests завершил бы весь сервис, поэтому ограничение не применяется.
+    """
+    if limit_max_requests <= 0:
+        return None
+    if workers <= 1:
+        logger.warning("UGC_API_LIMIT_MAX_REQUESTS не применяется с одним воркером: он завершил бы весь сервис")
+        return None
+    return limit_max_requests
+
+
+def prepare_metrics_dir(workers: int) -> None:
+    """
+    Готовит каталог, в который воркеры пишут метрики Prometheus, чтобы /metrics любого воркера отдавал общие значения.
+
+    Каталог очищается при запуске: значения прошлого запуска не должны попасть в новые счетчики.
+    Переменная окружения наследуется воркерами и должна быть задана до импорта prometheus_client в них.
+    """
+    if not settings.metrics_enabled or workers <= 1:
+        return
+    metrics_dir = settings.metrics_multiproc_dir or tempfile.mkdtemp(prefix="ugc-metrics-")
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    os.environ[MULTIPROC_DIR_ENV] = metrics_dir
+
+
+def run() -> None:
+    """
+    Запуск сервиса в продакшн-режиме: несколько процессов uvicorn с uvloop и httptools.
+
+    Приложение передается строкой импорта, поэтому каждый воркер импортирует его сам
+    и создает собственный клиент MongoDB в lifespan. По SIGTERM воркеры перестают принимать
+    соединения и дожидаются завершения текущих запросов, после чего выполняется завершение lifespan.
+    """
+    workers = get_workers_count(settings.api_workers)
+    prepare_metrics_dir(workers)
+    uvicorn.run(
+        "main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        limit_max_requests=get_limit_max_requests(workers, settings.api_limit_max_requests),
+        timeout_graceful_shutdown=settings.api_graceful_shutdown_timeout,
+        proxy_headers=True,
+        # Логирование настраивается при импорте core.config, конфигурация uvicorn заменила бы очередь логов
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+# stdlib
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+# thirdparty
+import orjson
+from bson import Binary
+from bson.binary import UUID_SUBTYPE
+
+
+def bson_default(value: Any) -> Any:
+    """Функция default для orjson: кодирует UUID, хранящиеся в MongoDB как Binary subtype 4."""
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        # Форматирование hex заметно быстрее, чем str(value.as_uuid())
+        uuid_hex = value.hex()
+        return f"{uuid_hex[:8]}-{uuid_hex[8:12]}-{uuid_hex[12:16]}-{uuid_hex[16:20]}-{uuid_hex[20:]}"
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def get_mongo_field(field: str) -> str:
+    """Возвращает имя поля в MongoDB для поля модели: id хранится в _id."""
+    return "_id" if field == "id" else field
+
+
+def dumps_documents(records: Iterable[dict[str, Any]], fields: Sequence[str]) -> bytes:
+    """
+    Сериализует документы, прочитанные напрямую из MongoDB, в JSON-массив без создания моделей.
+
+    Args:
+        records: Документы MongoDB.
+        fields: Поля схемы ответа в порядке вывода.
+
+    Returns:
+        JSON-массив объектов с полями fields.
+    """
+    mongo_fields = [(field, get_mongo_field(field)) for field in fields]
+    return orjson.dumps(
+        [{field: record.get(mongo_field) for field, mongo_field in mongo_fields} for record in records],
+        default=bson_default,
+    )
+
+
+def dumps_document(record: dict[str, Any], fields: Sequence[str]) -> bytes:
+    """Сериализует один документ MongoDB в JSON-объект с полями fields."""
+    return orjson.dumps(
+        {field: record.get(get_mongo_field(field)) for field in fields},
+        default=bson_default,
+    )
@@ -0,0 +1,72 @@
+# stdlib
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+# project
+from core.config import settings
+from schemas.movie import MovieDetail
+
+ValueT = TypeVar("ValueT")
+
+
+class TTLCache(Generic[ValueT]):  # noqa: UP046
+    """
+    Ограниченный по размеру кеш в памяти процесса со временем жизни записей и вытеснением LRU.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, ValueT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> ValueT | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: ValueT, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение в кеше.
+
+        Args:
+            key: Ключ записи.
+            value: Значение.
+            ttl: Время жизни записи в секундах, если оно должно быть меньше времени жизни по умолчанию.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+movie_detail_cache: TTLCache[MovieDetail] = TTLCache(
+    ttl=settings.movie_cache_ttl,
+    max_size=settings.movie_cache_max_size,
+)
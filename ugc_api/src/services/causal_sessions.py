@@ -0,0 +1,84 @@
+# stdlib
+import base64
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from typing import Any
+
+# thirdparty
+import bson
+from bson import Timestamp
+from bson.errors import BSONError
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+
+# project
+from core.config import settings
+
+CAUSAL_TIME_COOKIE = "ugc_causal_time"
+
+OperationTimes = tuple[Mapping[str, Any], Timestamp]
+
+
+def dump_operation_times(session: AsyncIOMotorClientSession) -> str | None:
+    """
+    Кодирует время последней операции сессии для cookie клиента.
+
+    Returns:
+        clusterTime и operationTime сессии в BSON, закодированные base64, или None, если операций не было.
+    """
+    # В заглушках motor cluster_time и operation_time описаны как методы, хотя это свойства
+    cluster_time: Mapping[str, Any] | None = session.cluster_time  # type: ignore[assignment]
+    operation_time: Timestamp | None = session.operation_time  # type: ignore[assignment]
+    if cluster_time is None or operation_time is None:
+        return None
+    data = bson.encode({"clusterTime": cluster_time, "operationTime": operation_time})
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def load_operation_times(value: str) -> OperationTimes | None:
+    """
+    Декодирует время последней операции из cookie клиента.
+
+    Returns:
+        clusterTime и operationTime или None, если значение повреждено.
+    """
+    try:
+        data = bson.decode(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+    except (ValueError, BSONError):
+        return None
+    cluster_time = data.get("clusterTime")
+    operation_time = data.get("operationTime")
+    if not isinstance(cluster_time, Mapping) or not isinstance(operation_time, Timestamp):
+        return None
+    return cluster_time, operation_time
+
+
+@asynccontextmanager
+async def start_causal_session(
+    client: AsyncIOMotorClient,
+    causal_time: str | None,
+) -> AsyncIterator[AsyncIOMotorClientSession | None]:
+    """
+    Открывает причинно-согласованную сессию MongoDB, продолжающую предыдущие операции клиента.
+
+    Время последней операции передается между запросами в cookie клиента, а не хранится в памяти процесса,
+    поэтому следующий запрос может обслужить любой процесс сервиса: чтение со вторичного узла ждет, пока узел
+    применит записи клиента. clusterTime подписан сервером, поэтому подделать время клиент не может.
+
+    Args:
+        client: Клиент MongoDB.
+        causal_time: Значение cookie с временем последней операции клиента, см. dump_operation_times.
+
+    Returns:
+        Сессия или None, если чтение со вторичных узлов выключено и сессия не нужна.
+    """
+    if not settings.mongo_secondary_reads:
+        yield None
+        return
+
+    async with await client.start_session(causal_consistency=True) as session:
+        operation_times = load_operation_times(causal_time) if causal_time else None
+        if operation_times is not None:
+            cluster_time, operation_time = operation_times
+            session.advance_cluster_time(cluster_time)
+            session.advance_operation_time(operation_time)
+        yield session
@@ -0,0 +1,216 @@
+# stdlib
+import asyncio
+import contextlib
+import logging
+import time
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from uuid import UUID
+
+# thirdparty
+from beanie import Document
+from bson import Binary
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# project
+from core.config import settings
+from core.metrics import COUNTER_BUFFER_FLUSH_LAG, COUNTER_BUFFER_FLUSH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+IncrementKey = tuple[type[Document], UUID]
+
+
+@dataclass
+class BulkIncrementResult:
+    applied: int = 0
+    # Документы, изменения счетчиков которых не записаны, и ошибки записи
+    failed: set[IncrementKey] = field(default_factory=set)
+    errors: list[Exception] = field(default_factory=list)
+
+
+async def bulk_increment(
+    increments: Mapping[IncrementKey, Mapping[str, int]],
+    upsert: Mapping[type[Document], bool],
+) -> BulkIncrementResult:
+    """
+    Применяет изменения счетчиков документов одним неупорядоченным bulk_write на коллекцию.
+
+    Ошибки записи не выбрасываются, а возвращаются вместе с документами, изменения которых не записаны:
+    при BulkWriteError это только операции из writeErrors, остальные операции коллекции уже применены.
+    При других ошибках незаписанными считаются все документы коллекции.
+
+    Args:
+        increments: Изменения счетчиков по документам, например {(Movie, movie_id): {"rating": 2}}.
+        upsert: Создавать ли отсутствующие документы, для каждой коллекции.
+
+    Returns:
+        Количество примененных операций обновления и документы, изменения которых не записаны.
+    """
+    operations: dict[type[Document], list[UpdateOne]] = defaultdict(list)
+    keys: dict[type[Document], list[IncrementKey]] = defaultdict(list)
+    for (document_model, document_id), counters in increments.items():
+        changes = {name: delta for name, delta in counters.items() if delta}
+        if changes:
+            operations[document_model].append(
+                UpdateOne(
+                    {"_id": Binary.from_uuid(document_id)},
+                    {"$inc": changes},
+                    upsert=upsert.get(document_model, False),
+                )
+            )
+            keys[document_model].append((document_model, document_id))
+
+    outcomes = await asyncio.gather(
+        *(
+            document_model.get_motor_collection().bulk_write(requests, ordered=False)
+            for document_model, requests in operations.items()
+        ),
+        return_exceptions=True,
+    )
+    result = BulkIncrementResult()
+    for model_keys, outcome in zip(keys.values(), outcomes, strict=True):
+        if isinstance(outcome, BulkWriteError):
+            failed = {model_keys[error["index"]] for error in outcome.details["writeErrors"]}
+        elif isinstance(outcome, Exception):
+            failed = set(model_keys)
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            failed = set()
+        if failed:
+            result.failed.update(failed)
+            result.errors.append(outcome)  # type: ignore[arg-type]
+        result.applied += len(model_keys) - len(failed)
+    return result
+
+
+@dataclass
+class FlushMetrics:
+    flushes: int = 0
+    flushed_updates: int = 0
+    last_flush_size: int = 0
+    last_flush_lag: float = 0.0
+    max_flush_lag: float = 0.0
+    failed_flushes: int = 0
+
+
+class CounterBuffer:
+    """
+    Буфер отложенной записи счетчиков.
+
+    Объединяет изменения ($inc) по каждому документу и записывает их одним bulk_write на коллекцию
+    по таймеру или при превышении размера. Размер и задержка каждого сброса экспортируются в Prometheus.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.metrics = FlushMetrics()
+        self._pending: dict[IncrementKey, Counter[str]] = defaultdict(Counter)
+        self._upsert: dict[type[Document], bool] = {}
+        self._oldest_pending_at: float | None = None
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, document_model: type[Document], document_id: UUID, counters: dict[str, int], upsert: bool) -> None:
+        """
+        Добавляет изменения счетчиков документа в буфер.
+
+        Args:
+            document_model: Документ, в коллекции которого хранятся счетчики.
+            document_id: Идентификатор документа.
+            counters: Изменения счетчиков, например {"rating": 2}.
+            upsert: Создавать ли документ, если его нет.
+        """
+        self._pending[(document_model, document_id)].update(counters)
+        self._upsert[document_model] = upsert
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = time.monotonic()
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    async def flush(self) -> None:
+        """Записывает накопленные изменения счетчиков в MongoDB."""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+            oldest_pending_at, self._oldest_pending_at = self._oldest_pending_at, None
+            if not pending:
+                return
+
+            try:
+                result = await bulk_increment(pending, self._upsert)
+            except Exception:
+                # Запись не началась или ее результат неизвестен: изменения не должны потеряться
+                self._requeue(pending, oldest_pending_at)
+                self.metrics.failed_flushes += 1
+                raise
+            if result.failed:
+                # Возвращаются только незаписанные изменения, иначе записанные были бы применены повторно
+                self._requeue({key: pending[key] for key in result.failed}, oldest_pending_at)
+                self.metrics.failed_flushes += 1
+                logger.error(f"Ошибка записи счетчиков из буфера: {'; '.join(map(str, result.errors))}")
+
+            lag = time.monotonic() - oldest_pending_at if oldest_pending_at is not None else 0.0
+            self.metrics.flushes += 1
+            self.metrics.flushed_updates += result.applied
+            self.metrics.last_flush_size = result.applied
+            self.metrics.last_flush_lag = lag
+            self.metrics.max_flush_lag = max(self.metrics.max_flush_lag, lag)
+            COUNTER_BUFFER_FLUSH_SIZE.observe(result.applied)
+            COUNTER_BUFFER_FLUSH_LAG.observe(lag)
+            logger.debug(f"Из буфера записаны счетчики {result.applied} документов, задержка записи {lag:.3f} с")
+
+    def _requeue(self, increments: Mapping[IncrementKey, Counter[str]], pending_since: float | None) -> None:
+        """Возвращает незаписанные изменения в буфер, сохраняя время самого старого из них."""
+        for key, counters in increments.items():
+            self._pending[key].update(counters)
+        if pending_since is not None:
+            self._oldest_pending_at = min(self._oldest_pending_at or pending_since, pending_since)
+
+    def start(self) -> None:
+        """Запускает фоновый сброс буфера."""
+        if self._task is None:
+            self._stopping = False
+            self._flush_requested = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновый сброс буфера и записывает оставшиеся изменения."""
+        if self._task is not None:
+            # Задача не отменяется, чтобы не прервать запись посреди bulk_write
+            self._stopping = True
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Изменения возвращены в буфер, фоновый сброс продолжается
+                logger.error(f"Ошибка сброса буфера счетчиков: {e}")
+
+
+counter_buffer = CounterBuffer(
+    flush_interval=settings.counter_buffer_flush_interval,
+    max_pending=settings.counter_buffer_max_pending,
+)
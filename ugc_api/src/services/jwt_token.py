@@ -1,5 +1,9 @@
 # stdlib
+import hashlib
 import logging
+import os
+import time
+from typing import Any
 
 # thirdparty
 import jwt
@@ -11,9 +15,65 @@ from pydantic import ValidationError
 from core.config import settings
 from exceptions.auth_exceptions import AuthError
 from schemas.auth import JwtToken
+from services.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+verified_tokens_cache: TTLCache[JwtToken] = TTLCache(
+    ttl=settings.jwt_cache_ttl,
+    max_size=settings.jwt_cache_max_size,
+)
+
+
+class JWTPublicKey:
+    """
+    Публичный ключ для проверки токенов, разобранный один раз и перечитываемый при изменении файла.
+    """
+
+    def __init__(self, path: str, algorithm: str, check_interval: float) -> None:
+        self.path = path
+        self.algorithm = algorithm
+        self.check_interval = check_interval
+        self._key: Any = None
+        self._mtime: int | None = None
+        self._checked_at = 0.0
+
+    def get(self) -> Any:
+        now = time.monotonic()
+        if self._key is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            mtime = self._get_mtime()
+            # Если файл временно недоступен, продолжаем использовать уже загруженный ключ
+            if self._key is None or (mtime is not None and mtime != self._mtime):
+                self.reload()
+        return self._key
+
+    def reload(self) -> None:
+        """Читает и разбирает файл ключа, сбрасывая кеш проверенных этим ключом токенов."""
+        mtime = self._get_mtime()
+        try:
+            with open(self.path) as key_file:
+                public_key = key_file.read()
+        except OSError as err:
+            raise ValueError(f"Error reading public key {self.path}: {str(err)}") from err
+        self._key = jwt.get_algorithm_by_name(self.algorithm).prepare_key(public_key)
+        self._mtime = mtime
+        verified_tokens_cache.clear()
+        logger.info(f"Публичный ключ JWT загружен из {self.path}")
+
+    def _get_mtime(self) -> int | None:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+
+jwt_public_key = JWTPublicKey(
+    path=settings.jwt_public_key_path,
+    algorithm=settings.jwt_algorithm,
+    check_interval=settings.jwt_public_key_check_interval,
+)
+
 
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True) -> None:
@@ -28,14 +88,19 @@ class JWTBearer(HTTPBearer):
 
     @staticmethod
     def verify_jwt(jwt_token: str) -> JwtToken:
+        token_digest = hashlib.sha256(jwt_token.encode()).digest()
+        cached_token = verified_tokens_cache.get(token_digest)
+        if cached_token is not None:
+            return cached_token
+
         try:
             token = jwt.decode(
                 jwt_token,
-                settings.jwt_public_key,
+                jwt_public_key.get(),
                 algorithms=[settings.jwt_algorithm],
                 options={"verify_exp": False},
             )
-            return JwtToken(
+            verified_token = JwtToken(
                 user=token.get("user"),
                 session_version=token.get("session_version"),
                 iat=token.get("iat"),
@@ -45,3 +110,7 @@ class JWTBearer(HTTPBearer):
             )
         except (jwt.exceptions.PyJWTError, ValidationError) as err:
             raise AuthError("JWT token error") from err
+
+        # Запись не должна пережить срок действия токена
+        verified_tokens_cache.set(token_digest, verified_token, ttl=verified_token.exp - time.time())
+        return verified_token
@@ -0,0 +1,135 @@
+# stdlib
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+
+# thirdparty
+from bson import Binary
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+# project
+from documents.movie import Movie
+from schemas.movie import CreateMovie, MovieImportError, MovieImportResult
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+async def iter_ndjson_lines(chunks: AsyncIterable[bytes], max_line_size: int) -> AsyncIterator[bytes | None]:
+    """
+    Разбивает поток байтов на строки NDJSON, не накапливая в памяти больше одной строки.
+
+    Args:
+        chunks: Поток байтов, например тело запроса.
+        max_line_size: Максимальная длина строки в байтах.
+
+    Yields:
+        Строки без перевода строки. Вместо строк длиннее max_line_size возвращается None.
+    """
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if skipping:
+                skipping = False
+            else:
+                buffer += chunk[start:end]
+                yield bytes(buffer) if len(buffer) <= max_line_size else None
+            buffer.clear()
+            start = end + 1
+        if not skipping:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_size:
+                # Остаток слишком длинной строки отбрасывается до следующего перевода строки
+                skipping = True
+                buffer.clear()
+                yield None
+    if buffer:
+        yield bytes(buffer) if len(buffer) <= max_line_size else None
+
+
+class MovieImporter:
+    """
+    Загрузка фильмов пачками insert_many(ordered=False).
+
+    Пока одна пачка записывается, разбирается следующая. Перед отправкой очередной пачки
+    импорт дожидается записи предыдущей, поэтому чтение тела запроса не опережает MongoDB
+    больше чем на одну пачку.
+    """
+
+    def __init__(self, chunk_size: int, max_errors: int) -> None:
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.result = MovieImportResult(received=0, inserted=0, failed=0, errors=[])
+        self._insert_task: asyncio.Task | None = None
+
+    async def run(self, lines: AsyncIterable[bytes | None]) -> MovieImportResult:
+        documents: list[dict] = []
+        line_numbers: list[int] = []
+        line_number = 0
+        try:
+            async for line in lines:
+                line_number += 1
+                if line is not None and not line.strip():
+                    continue
+                self.result.received += 1
+                if line is None:
+                    self._add_error(line_number, "Line is too long")
+                    continue
+                try:
+                    movie = CreateMovie.model_validate_json(line)
+                except ValidationError as e:
+                    self._add_error(line_number, str(e.errors(include_url=False, include_input=False)))
+                    continue
+
+                documents.append(
+                    {
+                        "_id": Binary.from_uuid(movie.id),
+                        "title": movie.title,
+                        "rating": movie.rating,
+                        "created_at": datetime.now(),
+                    }
+                )
+                line_numbers.append(line_number)
+                if len(documents) >= self.chunk_size:
+                    await self._start_insert(documents, line_numbers)
+                    documents, line_numbers = [], []
+
+            if documents:
+                await self._start_insert(documents, line_numbers)
+            await self._wait_insert()
+        finally:
+            if self._insert_task is not None:
+                self._insert_task.cancel()
+        # Ошибки записи пачки приходят позже ошибок разбора следующих строк
+        self.result.errors.sort(key=lambda error: error.line)
+        return self.result
+
+    async def _start_insert(self, documents: list[dict], line_numbers: list[int]) -> None:
+        await self._wait_insert()
+        self._insert_task = asyncio.create_task(self._insert(documents, line_numbers))
+
+    async def _wait_insert(self) -> None:
+        if self._insert_task is not None:
+            await self._insert_task
+            self._insert_task = None
+
+    async def _insert(self, documents: list[dict], line_numbers: list[int]) -> None:
+        try:
+            await Movie.get_motor_collection().insert_many(documents, ordered=False)
+            self.result.inserted += len(documents)
+        except BulkWriteError as e:
+            self.result.inserted += e.details["nInserted"]
+            for error in e.details["writeErrors"]:
+                if error["code"] == DUPLICATE_KEY_ERROR_CODE:
+                    detail = "Document already exists"
+                else:
+                    detail = error["errmsg"]
+                self._add_error(line_numbers[error["index"]], detail)
+
+    def _add_error(self, line_number: int, detail: str) -> None:
+        self.result.failed += 1
+        # Список ошибок ограничен, чтобы импорт битого файла не занимал память без предела
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(MovieImportError(line=line_number, detail=detail))
@@ -1,16 +1,77 @@
 # stdlib
 import asyncio
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Collection, Mapping, Sequence
 from uuid import UUID
 
 # thirdparty
 from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorClientSession
 
 # project
 from documents.bookmark import Bookmark
+from documents.movie_stats import MovieStats
 from documents.reaction import ContentType, LikeValue, Reaction
 from documents.review import Review
+from schemas.reaction import ReactionBatchResult, ReactionRequest
+from services.cache import movie_detail_cache
+from services.counter_buffer import IncrementKey, bulk_increment, counter_buffer
 from services.repositories.base import RatingRepository
-from services.repositories.reactions import get_reaction_repository
+from services.repositories.movie_stats import get_movie_stats_repository
+from services.repositories.reactions import ReactionKey, get_reaction_repository
+
+logger = logging.getLogger(__name__)
+
+REACTION_COUNTERS = {
+    LikeValue.like: "likes_count",
+    LikeValue.dislike: "dislikes_count",
+}
+# Документ статистики фильма создается при первом изменении счетчиков
+COUNTERS_UPSERT = {MovieStats: True}
+
+
+def get_reaction_counters_delta(previous_value: LikeValue | None, value: LikeValue | None) -> dict[str, int]:
+    """
+    Вычисляет изменения счетчиков статистики фильма при смене реакции пользователя.
+
+    Args:
+        previous_value: Значение реакции до изменения или None, если реакции не было.
+        value: Значение реакции после изменения или None, если реакция удалена.
+
+    Returns:
+        Изменения счетчиков likes_count, dislikes_count и reactions_count.
+    """
+    counters = {"likes_count": 0, "dislikes_count": 0, "reactions_count": 0}
+    if previous_value == value:
+        return counters
+    if previous_value is not None:
+        counters[REACTION_COUNTERS[previous_value]] -= 1
+        counters["reactions_count"] -= 1
+    if value is not None:
+        counters[REACTION_COUNTERS[value]] += 1
+        counters["reactions_count"] += 1
+    return counters
+
+
+async def _increment_rating(repo: RatingRepository, target_id: UUID, delta: int) -> None:
+    """
+    Изменение рейтинга оцененной сущности: через буфер отложенной записи, если он запущен, иначе сразу.
+    """
+    if counter_buffer.running:
+        counter_buffer.add(repo.model, target_id, {"rating": delta}, upsert=False)
+        return
+    await repo.update_rating_count(target_id, delta)
+
+
+async def _increment_movie_stats(movie_id: UUID, counters: dict[str, int]) -> None:
+    """
+    Изменение счетчиков статистики фильма: через буфер отложенной записи, если он запущен, иначе сразу.
+    """
+    if counter_buffer.running:
+        counter_buffer.add(MovieStats, movie_id, counters, upsert=True)
+        return
+    await get_movie_stats_repository().increment(movie_id, counters)
 
 
 async def remove_user_reaction(
@@ -18,17 +79,22 @@ async def remove_user_reaction(
     content_type: ContentType,
     user_id: UUID,
     repo: RatingRepository,
+    session: AsyncIOMotorClientSession | None = None,
 ) -> None:
     """
     Удаление реакции пользователя и откат рейтинга оцененной сущности.
     """
-    reaction_repo = get_reaction_repository()
+    reaction_repo = get_reaction_repository(session)
     value = await reaction_repo.remove_value(
         target_id=target_id,
         content_type=content_type,
         user_id=user_id,
     )
-    await repo.update_rating_count(document_id=target_id, like_value=-value)
+    if value:
+        await _increment_rating(repo, target_id, -value)
+        if content_type == ContentType.movie:
+            await _increment_movie_stats(target_id, get_reaction_counters_delta(LikeValue(value), None))
+            movie_detail_cache.invalidate(target_id)
 
 
 async def update_user_reaction(
@@ -37,26 +103,150 @@ async def update_user_reaction(
     user_id: UUID,
     value: LikeValue,
     repo: RatingRepository,
+    session: AsyncIOMotorClientSession | None = None,
 ) -> None:
     """
     Создание/обновление реакции пользователя и обновление рейтинга оцениваемой сущности.
     """
-    reaction_repo = get_reaction_repository()
-    updated, created = await reaction_repo.upsert(
+    reaction_repo = get_reaction_repository(session)
+    previous_value = await reaction_repo.upsert(
         target_id=target_id,
         content_type=content_type,
         value=value,
         user_id=user_id,
     )
-    if created:
-        await repo.update_rating_count(target_id, value)
-    if updated:
-        await repo.update_rating_count(target_id, value * 2)
+    rating_delta = value - (previous_value or 0)
+    if rating_delta:
+        await _increment_rating(repo, target_id, rating_delta)
+        if content_type == ContentType.movie:
+            await _increment_movie_stats(target_id, get_reaction_counters_delta(previous_value, value))
+            movie_detail_cache.invalidate(target_id)
+
+
+async def apply_user_reactions_batch(
+    user_id: UUID,
+    reaction_requests: Sequence[ReactionRequest],
+    repos: Mapping[ContentType, RatingRepository],
+    session: AsyncIOMotorClientSession | None = None,
+) -> list[ReactionBatchResult]:
+    """
+    Пакетное создание, обновление и удаление реакций пользователя.
+
+    Существование контента проверяется одним запросом с $in на тип контента, реакции записываются
+    одним bulk_write с условием на прочитанные значения, а изменения рейтингов и статистики фильмов
+    считаются по значениям, которые заменила запись, суммируются по каждой сущности и записываются
+    вторым bulk_write на коллекцию. При повторе цели в пакете применяется последняя реакция.
+
+    Args:
+        user_id: Идентификатор пользователя.
+        reaction_requests: Реакции пользователя.
+        repos: Репозитории оцениваемых сущностей по типу контента.
+        session: Причинно-согласованная сессия клиента, в которой записываются реакции.
+
+    Returns:
+        Результаты в порядке реакций в запросе.
+    """
+    target_ids: dict[ContentType, set[UUID]] = defaultdict(set)
+    for reaction_request in reaction_requests:
+        target_ids[reaction_request.content_type].add(reaction_request.target_id)
+    existing_ids = dict(
+        zip(
+            target_ids,
+            await asyncio.gather(
+                *(repos[content_type].get_existing_ids(ids) for content_type, ids in target_ids.items())
+            ),
+            strict=True,
+        )
+    )
+
+    values: dict[ReactionKey, LikeValue | None] = {
+        (reaction_request.content_type, reaction_request.target_id): reaction_request.value
+        for reaction_request in reaction_requests
+        if reaction_request.target_id in existing_ids[reaction_request.content_type]
+    }
+    previous_values, failed = await get_reaction_repository(session).bulk_set_values(user_id, values)
+    await _apply_increments(_get_batch_increments(values, previous_values, repos))
+    return _get_batch_results(reaction_requests, values, failed)
+
+
+def _get_batch_increments(
+    values: Mapping[ReactionKey, LikeValue | None],
+    previous_values: Mapping[ReactionKey, LikeValue | None],
+    repos: Mapping[ContentType, RatingRepository],
+) -> dict[IncrementKey, Counter[str]]:
+    """
+    Суммирует изменения рейтингов и статистики фильмов по записанным реакциям пакета.
+    """
+    increments: dict[IncrementKey, Counter[str]] = defaultdict(Counter)
+    for (content_type, target_id), previous_value in previous_values.items():
+        value = values[(content_type, target_id)]
+        rating_delta = (value or 0) - (previous_value or 0)
+        if not rating_delta:
+            continue
+        increments[(repos[content_type].model, target_id)]["rating"] += rating_delta
+        if content_type == ContentType.movie:
+            increments[(MovieStats, target_id)].update(get_reaction_counters_delta(previous_value, value))
+            movie_detail_cache.invalidate(target_id)
+    return increments
+
+
+async def _apply_increments(increments: Mapping[IncrementKey, Counter[str]]) -> None:
+    """
+    Записывает изменения счетчиков после записи реакций: через буфер, если он запущен, иначе сразу.
+
+    Реакции уже записаны, поэтому при ошибке изменения не отбрасываются, а записываются повторно. Если повтор
+    не удался, изменения пишутся в лог: статистику фильмов восстанавливает пересчет по исходным коллекциям.
+    """
+    if counter_buffer.running:
+        for (document_model, document_id), counters in increments.items():
+            counter_buffer.add(document_model, document_id, dict(counters), upsert=document_model is MovieStats)
+        return
+
+    result = await bulk_increment(increments, upsert=COUNTERS_UPSERT)
+    if not result.failed:
+        return
+    failed = {key: increments[key] for key in result.failed}
+    result = await bulk_increment(failed, upsert=COUNTERS_UPSERT)
+    if result.failed:
+        lost = {
+            f"{model.__name__} {document_id}": dict(failed[(model, document_id)])
+            for model, document_id in result.failed
+        }
+        logger.error(f"Изменения счетчиков после записи реакций не записаны: {lost}, ошибки: {result.errors}")
+
+
+def _get_batch_results(
+    reaction_requests: Sequence[ReactionRequest],
+    values: Mapping[ReactionKey, LikeValue | None],
+    failed: Collection[ReactionKey],
+) -> list[ReactionBatchResult]:
+    """
+    Формирует результаты пакета в порядке реакций в запросе.
+    """
+    results = []
+    for reaction_request in reaction_requests:
+        key = (reaction_request.content_type, reaction_request.target_id)
+        detail = None
+        if key not in values:
+            detail = "Not found"
+        elif key in failed:
+            detail = "Write error"
+        results.append(
+            ReactionBatchResult(
+                content_type=reaction_request.content_type,
+                target_id=reaction_request.target_id,
+                success=detail is None,
+                detail=detail,
+            )
+        )
+    return results
 
 
 async def get_movie_statistics(movie_id: UUID) -> dict[str, int]:
     """
-    Получение агрегированных данных для определенного фильма.
+    Подсчет агрегированных данных для определенного фильма по исходным коллекциям.
+
+    Используется для пересчета документа статистики фильма, при чтении используется MovieStatsRepository.
     """
     likes_pipeline = [
         {
@@ -89,3 +279,11 @@ async def get_movie_statistics(movie_id: UUID) -> dict[str, int]:
         "bookmarks_count": bookmarks_count,
         "reviews_count": reviews_count,
     }
+
+
+async def rebuild_movie_statistics(movie_id: UUID) -> None:
+    """
+    Пересчет документа статистики фильма по реакциям, закладкам и рецензиям.
+    """
+    statistics = await get_movie_statistics(movie_id)
+    await get_movie_stats_repository().set_statistics(movie_id, statistics)
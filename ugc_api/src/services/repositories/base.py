@@ -1,14 +1,24 @@
 # stdlib
+import base64
+from collections.abc import Collection, Sequence
 from typing import Any, Generic, TypeVar
 from uuid import UUID
 
 # thirdparty
+import orjson
 from beanie import Document
 from beanie.odm.enums import SortDirection
-from pydantic import BaseModel
+from beanie.odm.queries.update import UpdateResponse
+from beanie.odm.utils.encoder import Encoder
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pydantic import BaseModel, TypeAdapter
+from pymongo.read_preferences import SecondaryPreferred
 
 # project
+from core.config import settings
 from documents.reaction import LikeValue
+from services.bson_json import get_mongo_field
 
 DocumentType = TypeVar("DocumentType", bound=Document)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -16,30 +26,83 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class BaseRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: type[DocumentType]) -> None:
+    def __init__(
+        self,
+        model: type[DocumentType],
+        secondary_reads: bool = False,
+        session: AsyncIOMotorClientSession | None = None,
+    ) -> None:
+        """
+        Создает репозиторий документов модели.
+
+        Args:
+            model: Модель документа.
+            secondary_reads: Читать в list_raw и get_raw со вторичных узлов, если это включено в настройках.
+            session: Сессия MongoDB, в которой выполняются операции репозитория.
+        """
         self.model = model
+        self.secondary_reads = secondary_reads
+        self.session = session
 
     async def create(self, obj_in: CreateSchemaType) -> DocumentType:
         document = self.model(**obj_in.model_dump())
-        await document.insert()
+        await document.insert(session=self.session)
         return document
 
     async def get(self, document_id: UUID, filters: dict | None = None) -> DocumentType:
         query = self._create_query(filters=filters)
         query["_id"] = document_id
-        document = await self.model.find_one(query)
+        document = await self.model.find_one(query, session=self.session)
         if document is None:
             raise DocumentNotFoundException(f"Not found. {self.model.Settings.name}: {document_id}")
         return document
 
+    async def get_raw(self, document_id: UUID, fields: Collection[str], filters: dict | None = None) -> dict[str, Any]:
+        """
+        Возвращает документ в виде словаря MongoDB, минуя создание модели Beanie.
+
+        Args:
+            document_id: Идентификатор документа.
+            fields: Поля, которые нужно прочитать (проекция).
+            filters: Дополнительные фильтры.
+
+        Returns:
+            Документ с типами BSON, например UUID в виде Binary.
+        """
+        query = self._create_query(filters=filters)
+        query["_id"] = document_id
+        record = await self._get_read_collection().find_one(
+            Encoder().encode(query),
+            projection=self._get_projection(fields),
+            session=self.session,
+        )
+        if record is None:
+            raise DocumentNotFoundException(f"Not found. {self.model.Settings.name}: {document_id}")
+        return record
+
+    async def get_existing_ids(self, document_ids: Collection[UUID]) -> set[UUID]:
+        """
+        Возвращает идентификаторы документов, которые есть в коллекции, одним запросом с $in.
+        """
+        if not document_ids:
+            return set()
+        cursor = self.model.get_motor_collection().find(
+            {"_id": {"$in": [Binary.from_uuid(document_id) for document_id in document_ids]}},
+            projection={"_id": True},
+        )
+        return {document["_id"].as_uuid() async for document in cursor}
+
     async def update(self, document_id: UUID, update_data: UpdateSchemaType) -> DocumentType:
         document = await self.get(document_id)
         await document.update(update_data.model_dump())
         return document
 
-    async def delete(self, document_id: UUID) -> None:
-        document = await self.get(document_id)
-        await document.delete()
+    async def delete(self, document_id: UUID, filters: dict | None = None) -> None:
+        document = await self.get(document_id, filters=filters)
+        await self.delete_document(document)
+
+    async def delete_document(self, document: DocumentType) -> None:
+        await document.delete(session=self.session)
 
     async def list(
         self,
@@ -48,29 +111,212 @@ class BaseRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType]):
         sort_field: str | None = None,
         sort_order: SortDirection = SortDirection.ASCENDING,
         filters: dict[str, Any] | None = None,
+        after: str | None = None,
     ) -> list[DocumentType]:
         """
         Возвращает список документов, удовлетворяющих переданным фильтрам.
 
+        Если передан курсор after, то выдача продолжается с документа, следующего за тем,
+        из которого был построен курсор (keyset-пагинация), а skip игнорируется.
+
         Args:
             skip: Сколько документов пропустить в выдаче.
             limit: Сколько документов возвращать.
             sort_field: Название поля, по которому производить сортировку.
             sort_order: Направление сортировки.
             filters: Модель с фильтрами. Если None, то возвращаются все документы.
+            after: Курсор, полученный из get_next_cursor для предыдущей страницы.
 
         Returns:
             Список документов
         """
 
+        query, sort = self._create_list_query(sort_field, sort_order, filters, after)
+        if after is not None:
+            skip = 0
+
+        documents = await self.model.find(query, skip=skip, limit=limit, session=self.session).sort(*sort).to_list()
+        return documents
+
+    async def list_raw(
+        self,
+        fields: Collection[str],
+        skip: int = 0,
+        limit: int = 10,
+        sort_field: str | None = None,
+        sort_order: SortDirection = SortDirection.ASCENDING,
+        filters: dict[str, Any] | None = None,
+        after: str | None = None,
+    ) -> Sequence[dict[str, Any]]:
+        """
+        Возвращает список документов так же, как list, но в виде словарей MongoDB.
+
+        Документы читаются напрямую через motor с проекцией только нужных полей, без создания моделей Beanie.
+        Для построения курсора в документы всегда попадают _id и поле сортировки.
+
+        Args:
+            fields: Поля, которые нужно прочитать (проекция).
+            skip: Сколько документов пропустить в выдаче.
+            limit: Сколько документов возвращать.
+            sort_field: Название поля, по которому производить сортировку.
+            sort_order: Направление сортировки.
+            filters: Модель с фильтрами. Если None, то возвращаются все документы.
+            after: Курсор, полученный из get_next_cursor для предыдущей страницы.
+
+        Returns:
+            Список документов с типами BSON, например UUID в виде Binary.
+        """
+        query, sort = self._create_list_query(sort_field, sort_order, filters, after)
+        if after is not None:
+            skip = 0
+
+        projection = self._get_projection([*fields, sort_field] if sort_field else fields)
+        cursor = self._get_read_collection().find(
+            Encoder().encode(query),
+            projection=projection,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            session=self.session,
+        )
+        return await cursor.to_list(length=limit)
+
+    @staticmethod
+    def get_next_cursor(
+        documents: Sequence[DocumentType],
+        limit: int,
+        sort_field: str | None = None,
+    ) -> str | None:
+        """
+        Строит непрозрачный курсор следующей страницы по последнему документу выдачи.
+
+        Args:
+            documents: Документы текущей страницы, полученные из list.
+            limit: Размер страницы, с которым вызывался list.
+            sort_field: Поле сортировки, с которым вызывался list.
+
+        Returns:
+            Курсор для параметра after или None, если следующей страницы нет.
+        """
+        if not documents or len(documents) < limit:
+            return None
+
+        last_document = documents[-1]
+        sort_value = getattr(last_document, sort_field) if sort_field else None
+        return BaseRepository._encode_cursor(sort_value, last_document.id)  # type: ignore[arg-type]
+
+    @staticmethod
+    def get_next_raw_cursor(
+        records: Sequence[dict[str, Any]],
+        limit: int,
+        sort_field: str | None = None,
+    ) -> str | None:
+        """
+        Строит курсор следующей страницы по документам, полученным из list_raw.
+
+        Курсор совпадает с курсором get_next_cursor для тех же документов.
+        """
+        if not records or len(records) < limit:
+            return None
+
+        last_record = records[-1]
+        sort_value = last_record.get(sort_field) if sort_field else None
+        return BaseRepository._encode_cursor(sort_value, last_record["_id"].as_uuid())
+
+    @staticmethod
+    def _encode_cursor(sort_value: Any, document_id: UUID) -> str:
+        payload = orjson.dumps([sort_value, document_id])
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+    def _get_read_collection(self) -> AsyncIOMotorCollection:
+        """
+        Возвращает коллекцию для чтения в list_raw и get_raw.
+
+        Если репозиторий читает со вторичных узлов, чтение выполняется с secondaryPreferred: узел выбирается
+        среди вторичных, отстающих от первичного не больше чем на mongo_max_staleness_seconds.
+        """
+        collection = self.model.get_motor_collection()
+        if not self.secondary_reads or not settings.mongo_secondary_reads:
+            return collection
+        return collection.with_options(
+            read_preference=SecondaryPreferred(max_staleness=settings.mongo_max_staleness_seconds),  # type: ignore[arg-type]
+        )
+
+    def _create_list_query(
+        self,
+        sort_field: str | None,
+        sort_order: SortDirection,
+        filters: dict[str, Any] | None,
+        after: str | None,
+    ) -> tuple[dict[str, Any], Sequence[tuple[str, SortDirection]]]:
+        """
+        Создает словарь запроса и сортировку для list и list_raw.
+        """
         query = self._create_query(filters=filters)
+        if after is not None:
+            self._add_cursor_to_query(query, after, sort_field, sort_order)
 
         sort = []
         if sort_field:
             sort.append((sort_field, sort_order))
+        # Сортировка по _id делает порядок выдачи однозначным при равных значениях sort_field
+        sort.append(("_id", sort_order))
+        return query, sort
 
-        documents = await self.model.find(query, skip=skip, limit=limit).sort(*sort).to_list()
-        return documents
+    @staticmethod
+    def _get_projection(fields: Collection[str]) -> dict[str, bool]:
+        projection = {get_mongo_field(field): True for field in fields}
+        projection["_id"] = True
+        return projection
+
+    def _add_cursor_to_query(
+        self,
+        query: dict[str, Any],
+        cursor: str,
+        sort_field: str | None,
+        sort_order: SortDirection,
+    ) -> None:
+        """
+        Добавляет в словарь запроса условие keyset-пагинации.
+
+        Args:
+            query: Словарь запроса, который будет изменен.
+            cursor: Курсор, полученный из get_next_cursor.
+            sort_field: Поле сортировки.
+            sort_order: Направление сортировки.
+        """
+        sort_value, document_id = self._decode_cursor(cursor, sort_field)
+        comparator = "$gt" if sort_order == SortDirection.ASCENDING else "$lt"
+
+        if sort_field is None:
+            query["_id"] = {comparator: document_id}
+            return
+
+        query["$or"] = [
+            {sort_field: {comparator: sort_value}},
+            {sort_field: sort_value, "_id": {comparator: document_id}},
+        ]
+
+    def _decode_cursor(self, cursor: str, sort_field: str | None) -> tuple[Any, UUID]:
+        """
+        Разбирает курсор и приводит значение поля сортировки к типу поля документа.
+
+        Args:
+            cursor: Курсор, полученный из get_next_cursor.
+            sort_field: Поле сортировки.
+
+        Returns:
+            Значение поля сортировки и идентификатор последнего документа предыдущей страницы.
+        """
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            sort_value, document_id = orjson.loads(payload)
+            if sort_field is not None:
+                annotation = self.model.model_fields[sort_field].annotation
+                sort_value = TypeAdapter(annotation).validate_python(sort_value)
+            return sort_value, UUID(document_id)
+        except (ValueError, TypeError, KeyError) as err:
+            raise InvalidCursorException(f"Invalid cursor: {cursor}") from err
 
     def _create_query(self, filters: dict[str, Any] | None = None) -> dict[str, Any]:
         """
@@ -118,9 +364,22 @@ class BaseRepository(Generic[DocumentType, CreateSchemaType, UpdateSchemaType]):
 
 class RatingRepository(BaseRepository[DocumentType, CreateSchemaType, UpdateSchemaType]):
     async def update_rating_count(self, document_id: UUID, like_value: LikeValue | int) -> DocumentType:
-        document = await self.get(document_id)
-        document.rating += like_value
-        await document.save()
+        """
+        Атомарно изменяет рейтинг документа на стороне MongoDB за один запрос.
+
+        Args:
+            document_id: Идентификатор документа.
+            like_value: Величина, на которую изменяется рейтинг.
+
+        Returns:
+            Документ с обновленным рейтингом.
+        """
+        document = await self.model.find_one({"_id": document_id}).update(
+            {"$inc": {"rating": int(like_value)}},
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        if document is None:
+            raise DocumentNotFoundException(f"Not found. {self.model.Settings.name}: {document_id}")
         return document
 
 
@@ -130,3 +389,7 @@ class DocumentNotFoundException(Exception):
 
 class DocumentAlreadyExistsException(Exception):
     pass
+
+
+class InvalidCursorException(Exception):
+    pass
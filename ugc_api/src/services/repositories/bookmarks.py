@@ -1,15 +1,36 @@
+# thirdparty
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
 # project
 from documents.bookmark import Bookmark
 from schemas.bookmark import CreateBookmark, UpdateBookmark
+from services.cache import movie_detail_cache
 from services.repositories.base import BaseRepository
+from services.repositories.movie_stats import get_movie_stats_repository
 
 
 class BookmarkRepository(BaseRepository[Bookmark, CreateBookmark, UpdateBookmark]):
-    def __init__(self) -> None:
-        super().__init__(Bookmark)
+    def __init__(self, session: AsyncIOMotorClientSession | None = None) -> None:
+        # Закладки читаются со вторичных узлов только в причинно-согласованной сессии пользователя,
+        # иначе пользователь мог бы не увидеть только что созданную закладку
+        super().__init__(Bookmark, secondary_reads=session is not None, session=session)
 
     async def get_or_create(self, obj_in: CreateBookmark) -> Bookmark:
-        existing_bookmark = await self.model.find_one({"movie_id": obj_in.movie_id, "user_id": obj_in.user_id})
+        existing_bookmark = await self.model.find_one(
+            {"movie_id": obj_in.movie_id, "user_id": obj_in.user_id},
+            session=self.session,
+        )
         if existing_bookmark is not None:
             return existing_bookmark
-        return await super().create(obj_in)
+        return await self.create(obj_in)
+
+    async def create(self, obj_in: CreateBookmark) -> Bookmark:
+        bookmark = await super().create(obj_in)
+        await get_movie_stats_repository().increment(bookmark.movie_id, {"bookmarks_count": 1})
+        movie_detail_cache.invalidate(bookmark.movie_id)
+        return bookmark
+
+    async def delete_document(self, document: Bookmark) -> None:
+        await super().delete_document(document)
+        await get_movie_stats_repository().increment(document.movie_id, {"bookmarks_count": -1})
+        movie_detail_cache.invalidate(document.movie_id)
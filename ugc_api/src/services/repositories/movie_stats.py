@@ -0,0 +1,92 @@
+# stdlib
+from collections.abc import Collection
+from uuid import UUID
+
+# thirdparty
+from bson import Binary
+
+# project
+from documents.movie_stats import MovieStats
+from schemas.movie import AdditionalInfo
+from services.repositories.base import BaseRepository
+
+
+def get_empty_statistics() -> AdditionalInfo:
+    return AdditionalInfo(
+        likes_count=0,
+        dislikes_count=0,
+        reactions_count=0,
+        bookmarks_count=0,
+        reviews_count=0,
+    )
+
+
+def get_statistics_from_record(record: dict[str, int]) -> AdditionalInfo:
+    """
+    Возвращает счетчики из документа статистики. Счетчиков, которые еще не изменялись, в документе нет: они нулевые.
+    """
+    return AdditionalInfo(**{**get_empty_statistics().model_dump(), **record})
+
+
+class MovieStatsRepository(BaseRepository[MovieStats, AdditionalInfo, AdditionalInfo]):
+    def __init__(self) -> None:
+        super().__init__(MovieStats, secondary_reads=True)
+
+    async def get_statistics(self, movie_id: UUID) -> AdditionalInfo:
+        """
+        Возвращает счетчики фильма. Для фильма без реакций, закладок и рецензий счетчики нулевые.
+
+        Счетчики читаются со вторичных узлов, если это включено в настройках, и могут отставать
+        не больше чем на mongo_max_staleness_seconds.
+        """
+        record = await self._get_read_collection().find_one(
+            {"_id": Binary.from_uuid(movie_id)},
+            projection={"_id": False},
+        )
+        if record is None:
+            return get_empty_statistics()
+        return get_statistics_from_record(record)
+
+    async def get_statistics_many(self, movie_ids: Collection[UUID]) -> dict[UUID, AdditionalInfo]:
+        """
+        Возвращает счетчики нескольких фильмов одним запросом с $in.
+        """
+        statistics = {movie_id: get_empty_statistics() for movie_id in movie_ids}
+        if statistics:
+            cursor = self._get_read_collection().find(
+                {"_id": {"$in": [Binary.from_uuid(movie_id) for movie_id in statistics]}},
+            )
+            async for record in cursor:
+                statistics[record.pop("_id").as_uuid()] = get_statistics_from_record(record)
+        return statistics
+
+    async def increment(self, movie_id: UUID, counters: dict[str, int]) -> None:
+        """
+        Атомарно изменяет счетчики фильма, создавая документ статистики при первом изменении.
+
+        Args:
+            movie_id: Идентификатор фильма.
+            counters: Изменения счетчиков, например {"likes_count": 1, "reactions_count": 1}.
+        """
+        counters = {counter: delta for counter, delta in counters.items() if delta}
+        if not counters:
+            return
+        await self.model.get_motor_collection().update_one(
+            {"_id": Binary.from_uuid(movie_id)},
+            {"$inc": counters},
+            upsert=True,
+        )
+
+    async def set_statistics(self, movie_id: UUID, statistics: dict[str, int]) -> None:
+        """
+        Перезаписывает счетчики фильма, например после пересчета по исходным коллекциям.
+        """
+        await self.model.get_motor_collection().update_one(
+            {"_id": Binary.from_uuid(movie_id)},
+            {"$set": statistics},
+            upsert=True,
+        )
+
+
+def get_movie_stats_repository() -> MovieStatsRepository:
+    return MovieStatsRepository()
@@ -1,18 +1,57 @@
 # stdlib
+import asyncio
+from collections.abc import Sequence
 from uuid import UUID
 
 # project
 from documents.movie import Movie
-from schemas.movie import AdditionalInfo, CreateMovie, MovieDetail, UpdateMovie
-from services.reactions import get_movie_statistics
+from schemas.movie import CreateMovie, MovieDetail, UpdateMovie
+from services.cache import movie_detail_cache
 from services.repositories.base import RatingRepository
+from services.repositories.movie_stats import get_movie_stats_repository
 
 
 class MovieRepository(RatingRepository[Movie, CreateMovie, UpdateMovie]):
     def __init__(self) -> None:
-        super().__init__(Movie)
+        super().__init__(Movie, secondary_reads=True)
 
     async def get_detail_info(self, document_id: UUID) -> MovieDetail:
-        movie = await self.get(document_id)
-        movie_info = await get_movie_statistics(document_id)
-        return MovieDetail(**movie.model_dump(), additional_info=AdditionalInfo(**movie_info))
+        movie_detail = movie_detail_cache.get(document_id)
+        if movie_detail is not None:
+            return movie_detail
+
+        movie, additional_info = await asyncio.gather(
+            self.get(document_id),
+            get_movie_stats_repository().get_statistics(document_id),
+        )
+        movie_detail = MovieDetail(**movie.model_dump(), additional_info=additional_info)
+        movie_detail_cache.set(document_id, movie_detail)
+        return movie_detail
+
+    async def get_detail_info_many(self, document_ids: Sequence[UUID]) -> dict[UUID, MovieDetail]:
+        """
+        Возвращает детальную информацию о нескольких фильмах.
+
+        Фильмы, которых нет в кеше, читаются одним запросом с $in вместе с их статистикой.
+        Отсутствующие фильмы в результат не попадают.
+        """
+        movie_details: dict[UUID, MovieDetail] = {}
+        missed_ids = []
+        for document_id in dict.fromkeys(document_ids):
+            movie_detail = movie_detail_cache.get(document_id)
+            if movie_detail is None:
+                missed_ids.append(document_id)
+            else:
+                movie_details[document_id] = movie_detail
+        if not missed_ids:
+            return movie_details
+
+        movies, statistics = await asyncio.gather(
+            self.model.find({"_id": {"$in": missed_ids}}).to_list(),
+            get_movie_stats_repository().get_statistics_many(missed_ids),
+        )
+        for movie in movies:
+            movie_detail = MovieDetail(**movie.model_dump(), additional_info=statistics[movie.id])
+            movie_detail_cache.set(movie.id, movie_detail)
+            movie_details[movie.id] = movie_detail
+        return movie_details
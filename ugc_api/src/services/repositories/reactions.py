@@ -1,42 +1,48 @@
 # stdlib
+import asyncio
+from collections.abc import Awaitable, Collection, Mapping
 from datetime import datetime
+from typing import Any
 from uuid import UUID, uuid4
 
 # thirdparty
 from bson import Binary
-from pymongo.results import UpdateResult
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
 # project
 from documents.reaction import ContentType, LikeValue, Reaction
 from schemas.reaction import CreateReaction, UpdateReaction
 from services.repositories.base import BaseRepository
 
+ReactionKey = tuple[ContentType, UUID]
+# Условие на прочитанное значение не выполнено, и upsert попытался создать вторую реакцию на тот же контент
+DUPLICATE_KEY_ERROR = 11000
+
 
 class ReactionRepository(BaseRepository[Reaction, CreateReaction, UpdateReaction]):
-    def __init__(self) -> None:
-        super().__init__(Reaction)
+    def __init__(self, session: AsyncIOMotorClientSession | None = None) -> None:
+        # Реакции читаются со вторичных узлов только в причинно-согласованной сессии клиента,
+        # иначе пользователь мог бы не увидеть только что поставленную реакцию
+        super().__init__(Reaction, secondary_reads=session is not None, session=session)
 
-    @staticmethod
     async def upsert(
+        self,
         target_id: UUID,
         content_type: ContentType,
         user_id: UUID,
         value: LikeValue = LikeValue.like,
-    ) -> tuple[bool, bool]:
-        current_time = datetime.now()
+    ) -> LikeValue | None:
+        """
+        Создает или обновляет реакцию пользователя одним атомарным запросом.
 
-        existing_record = await Reaction.get_motor_collection().find_one(
-            {
-                "content_type": content_type,
-                "target_id": Binary.from_uuid(target_id),
-                "user_id": Binary.from_uuid(user_id),
-            }
-        )
-
-        if existing_record and existing_record.get("value") == value:
-            return False, False
+        Returns:
+            Значение реакции до обновления или None, если реакция была создана.
+        """
+        current_time = datetime.now()
 
-        result: UpdateResult = await Reaction.get_motor_collection().update_one(
+        previous_record = await Reaction.get_motor_collection().find_one_and_update(
             {
                 "content_type": content_type,
                 "target_id": Binary.from_uuid(target_id),
@@ -49,29 +55,168 @@ class ReactionRepository(BaseRepository[Reaction, CreateReaction, UpdateReaction
                     "created_at": current_time,
                 },
             },
+            projection={"_id": False, "value": True},
             upsert=True,
+            return_document=ReturnDocument.BEFORE,
+            session=self.session,
         )
-        updated = result.modified_count > 0
-        created = result.upserted_id is not None
-        return updated, created
+        if previous_record is None:
+            return None
+        return LikeValue(previous_record["value"])
 
-    @staticmethod
     async def remove_value(
+        self,
         target_id: UUID,
         content_type: ContentType,
         user_id: UUID,
     ) -> LikeValue | int:
-        doc = await Reaction.find_one(
-            Reaction.content_type == content_type,
-            Reaction.target_id == target_id,
-            Reaction.user_id == user_id,
+        """
+        Удаляет реакцию пользователя одним атомарным запросом.
+
+        Returns:
+            Значение удаленной реакции или 0, если реакции не было.
+        """
+        previous_record = await Reaction.get_motor_collection().find_one_and_delete(
+            {
+                "content_type": content_type,
+                "target_id": Binary.from_uuid(target_id),
+                "user_id": Binary.from_uuid(user_id),
+            },
+            projection={"_id": False, "value": True},
+            session=self.session,
+        )
+        if previous_record is None:
+            return 0
+        return LikeValue(previous_record["value"])
+
+    async def get_user_values(
+        self,
+        user_id: UUID,
+        targets: Collection[ReactionKey],
+    ) -> dict[ReactionKey, LikeValue]:
+        """
+        Возвращает текущие реакции пользователя на переданный контент одним запросом с $in.
+        """
+        if not targets:
+            return {}
+        cursor = Reaction.get_motor_collection().find(
+            {
+                "user_id": Binary.from_uuid(user_id),
+                "target_id": {"$in": list({Binary.from_uuid(target_id) for _, target_id in targets})},
+            },
+            projection={"_id": False, "content_type": True, "target_id": True, "value": True},
+            session=self.session,
         )
-        old_value = 0
-        if doc:
-            old_value = doc.value
-            await doc.delete()
-        return old_value
+        values = {}
+        async for record in cursor:
+            key = (ContentType(record["content_type"]), record["target_id"].as_uuid())
+            if key in targets:
+                values[key] = LikeValue(record["value"])
+        return values
+
+    async def bulk_set_values(
+        self,
+        user_id: UUID,
+        values: Mapping[ReactionKey, LikeValue | None],
+    ) -> tuple[dict[ReactionKey, LikeValue | None], set[ReactionKey]]:
+        """
+        Создает, обновляет и удаляет реакции пользователя, возвращая значения, которые они заменили.
+
+        Текущие значения читаются одним запросом с $in, а новые записываются одним неупорядоченным bulk_write
+        с условием на прочитанное значение. Если реакцию между чтением и записью изменил другой запрос,
+        условие не выполняется и upsert нарушает уникальный индекс: такие реакции записываются по одной
+        через find_one_and_update, который атомарно возвращает заменяемое значение. Удаления выполняются
+        через find_one_and_delete: bulk_write не сообщает, какие из DeleteOne удалили документ.
+
+        Args:
+            user_id: Идентификатор пользователя.
+            values: Новые значения реакций на контент. None означает удаление реакции.
+
+        Returns:
+            Значения записанных реакций до изменения (None, если реакции не было)
+            и контент, реакции на который не удалось записать.
+        """
+        current_values = await self.get_user_values(user_id, values.keys())
+        updated = {key: value for key, value in values.items() if value is not None}
+        previous_values, failed, conflicts = await self._bulk_update_values(user_id, updated, current_values)
+        # Удалять нечего, если реакции не было при чтении: удаление считается выполненным до ее создания
+        removed = [key for key, value in values.items() if value is None and key in current_values]
+        previous_values.update((key, None) for key, value in values.items() if value is None and key not in removed)
+
+        keys = [*conflicts, *removed]
+        operations: list[Awaitable[LikeValue | int | None]] = [
+            *(
+                self.upsert(target_id, content_type, user_id, updated[(content_type, target_id)])
+                for content_type, target_id in conflicts
+            ),
+            *(self.remove_value(target_id, content_type, user_id) for content_type, target_id in removed),
+        ]
+        outcomes = await asyncio.gather(*operations, return_exceptions=True)
+        for key, outcome in zip(keys, outcomes, strict=True):
+            if isinstance(outcome, PyMongoError):
+                failed.add(key)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                previous_values[key] = LikeValue(outcome) if outcome else None
+        return previous_values, failed
+
+    async def _bulk_update_values(
+        self,
+        user_id: UUID,
+        values: Mapping[ReactionKey, LikeValue],
+        current_values: Mapping[ReactionKey, LikeValue],
+    ) -> tuple[dict[ReactionKey, LikeValue | None], set[ReactionKey], list[ReactionKey]]:
+        """
+        Записывает реакции одним bulk_write с условием на прочитанное значение.
+
+        Returns:
+            Значения записанных реакций до изменения, контент, реакции на который не удалось записать,
+            и контент, реакции на который изменились после чтения.
+        """
+        previous_values: dict[ReactionKey, LikeValue | None] = {}
+        if not values:
+            return previous_values, set(), []
+
+        current_time = datetime.now()
+        keys = list(values)
+        # _id новых документов задается явно, чтобы по upserted узнать, какие реакции были созданы
+        new_ids = [Binary.from_uuid(uuid4()) for _ in keys]
+        operations = [
+            UpdateOne(
+                {
+                    "content_type": content_type,
+                    "target_id": Binary.from_uuid(target_id),
+                    "user_id": Binary.from_uuid(user_id),
+                    "value": current_values.get((content_type, target_id), {"$exists": False}),
+                },
+                {
+                    "$set": {"value": values[(content_type, target_id)], "updated_at": current_time},
+                    "$setOnInsert": {"_id": new_id, "created_at": current_time},
+                },
+                upsert=True,
+            )
+            for (content_type, target_id), new_id in zip(keys, new_ids, strict=True)
+        ]
+
+        errors: list[dict[str, Any]] = []
+        upserted: set[Any] = set()
+        try:
+            result = await Reaction.get_motor_collection().bulk_write(operations, ordered=False, session=self.session)
+            upserted = set((result.upserted_ids or {}).values())
+        except BulkWriteError as e:
+            errors = e.details["writeErrors"]
+            upserted = {item["_id"] for item in e.details.get("upserted", [])}
+
+        conflicts = [keys[error["index"]] for error in errors if error["code"] == DUPLICATE_KEY_ERROR]
+        failed = {keys[error["index"]] for error in errors if error["code"] != DUPLICATE_KEY_ERROR}
+        not_written = failed.union(conflicts)
+        for key, new_id in zip(keys, new_ids, strict=True):
+            if key not in not_written:
+                # Реакцию, удаленную после чтения, upsert создал заново: прежнего значения не было
+                previous_values[key] = None if new_id in upserted else current_values.get(key)
+        return previous_values, failed, conflicts
 
 
-def get_reaction_repository() -> ReactionRepository:
-    return ReactionRepository()
+def get_reaction_repository(session: AsyncIOMotorClientSession | None = None) -> ReactionRepository:
+    return ReactionRepository(session=session)
@@ -1,9 +1,27 @@
+# thirdparty
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
 # project
 from documents.review import Review
 from schemas.review import CreateReview, UpdateReview
+from services.cache import movie_detail_cache
 from services.repositories.base import RatingRepository
+from services.repositories.movie_stats import get_movie_stats_repository
 
 
 class ReviewRepository(RatingRepository[Review, CreateReview, UpdateReview]):
-    def __init__(self) -> None:
-        super().__init__(Review)
+    def __init__(self, session: AsyncIOMotorClientSession | None = None) -> None:
+        # Рецензии читаются со вторичных узлов только в причинно-согласованной сессии клиента,
+        # иначе автор мог бы не увидеть только что созданную рецензию
+        super().__init__(Review, secondary_reads=session is not None, session=session)
+
+    async def create(self, obj_in: CreateReview) -> Review:
+        review = await super().create(obj_in)
+        await get_movie_stats_repository().increment(review.movie_id, {"reviews_count": 1})
+        movie_detail_cache.invalidate(review.movie_id)
+        return review
+
+    async def delete_document(self, document: Review) -> None:
+        await super().delete_document(document)
+        await get_movie_stats_repository().increment(document.movie_id, {"reviews_count": -1})
+        movie_detail_cache.invalidate(document.movie_id)
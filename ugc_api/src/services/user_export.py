@@ -0,0 +1,60 @@
+# stdlib
+from collections.abc import AsyncIterator
+from typing import Any
+from uuid import UUID
+
+# thirdparty
+import orjson
+from beanie import Document
+from bson import Binary
+from pymongo import ASCENDING
+
+# project
+from documents.bookmark import Bookmark
+from documents.reaction import Reaction
+from documents.review import Review
+from services.bson_json import bson_default
+
+EXPORT_DOCUMENTS: dict[str, type[Document]] = {
+    "reaction": Reaction,
+    "bookmark": Bookmark,
+    "review": Review,
+}
+
+
+def encode_ndjson_line(record_type: str, record: dict[str, Any]) -> bytes:
+    """
+    Кодирует документ, прочитанный напрямую из MongoDB, в строку NDJSON вида {"type": ..., "data": ...}.
+    """
+    record["id"] = record.pop("_id")
+    return orjson.dumps({"type": record_type, "data": record}, default=bson_default) + b"\n"
+
+
+async def export_user_documents(user_id: UUID, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Выгружает реакции, закладки и рецензии пользователя в формате NDJSON.
+
+    Документы читаются курсором MongoDB без создания моделей Beanie, и наружу отдается
+    по одному фрагменту на batch_size документов, поэтому память не зависит от объема данных пользователя.
+
+    Args:
+        user_id: Идентификатор пользователя.
+        batch_size: Размер пачки курсора и число строк во фрагменте ответа.
+
+    Yields:
+        Фрагменты NDJSON.
+    """
+    for record_type, document in EXPORT_DOCUMENTS.items():
+        cursor = document.get_motor_collection().find(
+            {"user_id": Binary.from_uuid(user_id)},
+            sort=[("created_at", ASCENDING)],
+            batch_size=batch_size,
+        )
+        lines = []
+        async for record in cursor:
+            lines.append(encode_ndjson_line(record_type, record))
+            if len(lines) >= batch_size:
+                yield b"".join(lines)
+                lines.clear()
+        if lines:
+            yield b"".join(lines)
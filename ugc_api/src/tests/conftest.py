@@ -15,12 +15,15 @@ from fastapi.testclient import TestClient
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 # project
+from core.config import settings
 from documents.bookmark import Bookmark
 from documents.movie import Movie
+from documents.movie_stats import MovieStats
 from documents.reaction import Reaction
 from documents.review import Review
 from main import app
 from schemas.bookmark import CreateBookmark
+from services.cache import movie_detail_cache
 from services.repositories.bookmarks import BookmarkRepository
 from services.repositories.movies import MovieRepository
 
@@ -32,7 +35,7 @@ async def mock_mongodb() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     client = mongomock_motor.AsyncMongoMockClient()
     db = client.get_database("test_db")
 
-    await beanie.init_beanie(database=db, document_models=[Bookmark, Movie, Review, Reaction])
+    await beanie.init_beanie(database=db, document_models=[Bookmark, Movie, Review, Reaction, MovieStats])
 
     movie = Movie(
         id=UUID("22222222-2222-2222-2222-222222222222"),
@@ -72,12 +75,25 @@ async def mock_mongodb() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     )
     await reaction.insert()
 
-    yield db
+    movie_stats = MovieStats(
+        id=UUID("22222222-2222-2222-2222-222222222222"),
+        likes_count=1,
+        reactions_count=1,
+        bookmarks_count=1,
+        reviews_count=1,
+    )
+    await movie_stats.insert()
+
+    # mongomock не поддерживает сессии и with_options, поэтому тесты не зависят от UGC_MONGO_SECONDARY_READS в .env
+    with patch.object(settings, "mongo_secondary_reads", False):
+        yield db
 
     await db[Movie.get_collection_name()].delete_many({})
     await db[Bookmark.get_collection_name()].delete_many({})
     await db[Review.get_collection_name()].delete_many({})
     await db[Reaction.get_collection_name()].delete_many({})
+    await db[MovieStats.get_collection_name()].delete_many({})
+    movie_detail_cache.clear()
 
 
 @pytest.fixture
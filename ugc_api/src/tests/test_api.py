@@ -41,3 +41,13 @@ def test_create_bookmark(client: TestClient, headers: dict[str, str]) -> None:
 
     bookmark = BookmarkDocument.find_one({"movie_id": UUID(movie_id), "user_id": UUID(user_id)})
     assert bookmark is not None
+
+
+def test_request_without_request_id(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест отклонения запроса без заголовка X-Request-Id."""
+    headers = {key: value for key, value in headers.items() if key != "X-Request-Id"}
+
+    response = client.get("/api-ugc/v1/movies/", headers=headers)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {"detail": "X-Request-Id is required"}
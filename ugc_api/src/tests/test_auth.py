@@ -0,0 +1,76 @@
+# stdlib
+import time
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+# thirdparty
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# project
+from exceptions.auth_exceptions import AuthError
+from services.jwt_token import JWTBearer, JWTPublicKey, verified_tokens_cache
+
+
+def generate_key_pair(public_key_path: Path) -> rsa.RSAPrivateKey:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key_path.write_bytes(
+        private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_key
+
+
+def create_token(private_key: rsa.RSAPrivateKey, expires_in: int = 3600) -> str:
+    now = int(time.time())
+    payload = {
+        "user": str(uuid4()),
+        "session_version": 1,
+        "iat": now,
+        "exp": now + expires_in,
+        "role": "regular_user",
+        "type": "access",
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256")
+
+
+def test_verify_jwt_caches_key_and_tokens(tmp_path: Path) -> None:
+    """Тест однократной загрузки ключа и кеширования проверенного токена."""
+    public_key_path = tmp_path / "public_key.pem"
+    private_key = generate_key_pair(public_key_path)
+    public_key = JWTPublicKey(path=str(public_key_path), algorithm="RS256", check_interval=60)
+    token = create_token(private_key)
+
+    with patch("services.jwt_token.jwt_public_key", public_key), patch.object(
+        public_key, "reload", wraps=public_key.reload
+    ) as reload:
+        first = JWTBearer.verify_jwt(token)
+        hits = verified_tokens_cache.hits
+        second = JWTBearer.verify_jwt(token)
+
+    assert first == second
+    assert reload.call_count == 1
+    assert verified_tokens_cache.hits == hits + 1
+
+
+def test_verify_jwt_after_key_rotation(tmp_path: Path) -> None:
+    """Тест перечитывания ключа: токены, подписанные старым ключом, перестают приниматься."""
+    public_key_path = tmp_path / "public_key.pem"
+    old_private_key = generate_key_pair(public_key_path)
+    public_key = JWTPublicKey(path=str(public_key_path), algorithm="RS256", check_interval=0)
+    old_token = create_token(old_private_key)
+
+    with patch("services.jwt_token.jwt_public_key", public_key):
+        JWTBearer.verify_jwt(old_token)
+
+        new_private_key = generate_key_pair(public_key_path)
+        public_key.reload()
+
+        JWTBearer.verify_jwt(create_token(new_private_key))
+        with pytest.raises(AuthError):
+            JWTBearer.verify_jwt(old_token)
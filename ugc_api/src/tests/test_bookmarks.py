@@ -67,3 +67,6 @@ def test_delete_bookmark(
     )
 
     assert response.status_code == HTTPStatus.NO_CONTENT
+
+    movie_response = client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers)
+    assert movie_response.json()["additional_info"]["bookmarks_count"] == 0
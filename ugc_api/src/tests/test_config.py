@@ -0,0 +1,35 @@
+# thirdparty
+from pymongo.uri_parser import parse_uri
+
+# project
+from core.config import AppSettings
+
+MAX_IDLE_TIME_MS = 60000
+
+
+def test_mongo_dns_with_several_routers() -> None:
+    """Тест подключения ко всем mongos из UGC_MONGO_HOSTS."""
+    settings = AppSettings(mongo_hosts="mongos1:27017, mongos2:27017", mongo_user="user", mongo_password="pass")
+
+    uri = parse_uri(settings.mongo_dns)
+
+    assert uri["nodelist"] == [("mongos1", 27017), ("mongos2", 27017)]
+    assert uri["options"]["authsource"] == "admin"
+
+
+def test_mongo_dns_with_single_host() -> None:
+    """Тест подключения к mongo_host, если список роутеров не задан."""
+    settings = AppSettings(mongo_hosts="", mongo_host="mongos1", mongo_user="")
+
+    assert parse_uri(settings.mongo_dns)["nodelist"] == [("mongos1", 27017)]
+
+
+def test_mongo_client_options_skip_zero_values() -> None:
+    """Тест пропуска нулевых параметров пула: maxPoolSize=0 в pymongo означал бы пул без ограничения."""
+    settings = AppSettings(mongo_max_pool_size=0, mongo_min_pool_size=0, mongo_max_idle_time_ms=MAX_IDLE_TIME_MS)
+
+    options = settings.mongo_client_options
+
+    assert "maxPoolSize" not in options
+    assert "minPoolSize" not in options
+    assert options["maxIdleTimeMS"] == MAX_IDLE_TIME_MS
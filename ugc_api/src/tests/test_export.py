@@ -0,0 +1,42 @@
+# stdlib
+from http import HTTPStatus
+from uuid import UUID, uuid4
+
+# thirdparty
+import orjson
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# project
+from documents.bookmark import Bookmark
+from services.user_export import export_user_documents
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+BOOKMARKS_COUNT = 5
+BATCH_SIZE = 2
+
+
+def test_export_user_data(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест выгрузки реакций, закладок и рецензий пользователя в NDJSON."""
+    response = client.get("/api-ugc/v1/export/", headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [record["type"] for record in records] == ["reaction", "bookmark", "review"]
+    assert records[0]["data"]["id"] == "55555555-5555-5555-5555-555555555555"
+    assert all(record["data"]["user_id"] == USER_ID for record in records)
+    assert records[2]["data"]["review_text"] == "Great movie!"
+
+
+async def test_export_user_documents_in_batches(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест выгрузки фрагментами по batch_size документов."""
+    user_id = uuid4()
+    for _ in range(BOOKMARKS_COUNT):
+        await Bookmark(user_id=user_id, movie_id=uuid4()).insert()
+
+    chunks = [chunk async for chunk in export_user_documents(user_id, batch_size=BATCH_SIZE)]
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    exported_ids = [UUID(orjson.loads(line)["data"]["id"]) for line in b"".join(chunks).splitlines()]
+    assert len(set(exported_ids)) == BOOKMARKS_COUNT
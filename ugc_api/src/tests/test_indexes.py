@@ -0,0 +1,43 @@
+# thirdparty
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+
+# project
+from api.v1.review import ReviewOrderBy
+from db.indexes import QUERY_SHAPES, sync_indexes
+from db.mongodb import COLLECTIONS
+
+
+async def test_sync_indexes_creates_missing_indexes(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест создания объявленных в документах индексов."""
+    for document in COLLECTIONS:
+        await document.get_motor_collection().drop_indexes()
+
+    await sync_indexes(COLLECTIONS)
+
+    for document in COLLECTIONS:
+        index_information = await document.get_motor_collection().index_information()
+        for index in document.get_settings().indexes:
+            assert index.name in index_information
+
+
+def test_query_shapes_cover_all_collections() -> None:
+    """Тест наличия форм запросов для каждой коллекции."""
+    assert {shape.document for shape in QUERY_SHAPES} == set(COLLECTIONS)
+
+
+async def test_unfiltered_list_query_shapes_have_sort_indexes(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест наличия индекса с полем сортировки и _id для каждой сортировки списков без фильтров."""
+    for shape in QUERY_SHAPES:
+        if not shape.sort or shape.filter:
+            continue
+        index_keys = [list(index.index.document["key"].items()) for index in shape.document.get_settings().indexes]
+        assert shape.sort in index_keys, shape.name
+
+
+def test_list_query_shapes_use_sort_params() -> None:
+    """Тест построения форм запросов списка рецензий по всем полям сортировки эндпоинта с _id в конце."""
+    shapes = [shape for shape in QUERY_SHAPES if shape.name.startswith("reviews.list order_by")]
+
+    assert [shape.sort for shape in shapes] == [[(field, ASCENDING), ("_id", ASCENDING)] for field in ReviewOrderBy]
+    assert "reviews.list order_by title (default)" in {shape.name for shape in shapes}
@@ -0,0 +1,87 @@
+# stdlib
+import logging
+import queue
+import threading
+from http import HTTPStatus
+from types import SimpleNamespace
+
+# thirdparty
+import orjson
+from prometheus_client import REGISTRY
+
+# project
+from core.logger import ACCESS_LOGGER, AccessLogSampler, JsonFormatter, NonBlockingQueueHandler
+from middlewares.request_id import RequestIdFilter, request_id_var, request_scope_var
+
+MOVIE_ROUTE = "/api-ugc/v1/movies/{movie_id}"
+ACCESS_LOG_FORMAT = '%s - "%s %s HTTP/%s" %d'
+QUEUE_SIZE = 1
+RECORDS_COUNT = 3
+
+
+def make_access_record(method: str, status_code: int) -> logging.LogRecord:
+    args = ("127.0.0.1:5000", method, "/api-ugc/v1/movies/1", "1.1", status_code)
+    return logging.LogRecord(ACCESS_LOGGER, logging.INFO, __file__, 1, ACCESS_LOG_FORMAT, args, None)
+
+
+def test_json_log_contains_request_fields() -> None:
+    """Тест вывода в JSON X-Request-Id, маршрута, полей extra и исключения, добавленных до очереди."""
+    records: queue.Queue[logging.LogRecord] = queue.Queue()
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger("tests.json")
+    logger.addHandler(handler)
+    request_id_token = request_id_var.set("json-request-id")
+    scope_token = request_scope_var.set({"route": SimpleNamespace(path=MOVIE_ROUTE)})
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Ошибка %s", "запроса", extra={"movie_id": 1, "color_message": "\x1b[31mОшибка"})
+    finally:
+        request_scope_var.reset(scope_token)
+        request_id_var.reset(request_id_token)
+        logger.removeHandler(handler)
+
+    # Запись форматируется в другом потоке, как в QueueListener, без контекста запроса
+    output: list[str] = []
+    record = records.get_nowait()
+    thread = threading.Thread(target=lambda: output.append(JsonFormatter().format(record)))
+    thread.start()
+    thread.join()
+    data = orjson.loads(output[0])
+
+    assert data["message"] == "Ошибка запроса"
+    assert data["request_id"] == "json-request-id"
+    assert data["route"] == MOVIE_ROUTE
+    assert data["movie_id"] == 1
+    assert "color_message" not in data
+    assert "ValueError: boom" in data["exception"]
+
+
+def test_access_log_sampling() -> None:
+    """Тест выборки access-лога по маршруту: ответы с ошибкой логируются всегда."""
+    sampler = AccessLogSampler(default_rate=1.0, route_rates={f"GET {MOVIE_ROUTE}": 0.0})
+    token = request_scope_var.set({"route": SimpleNamespace(path=MOVIE_ROUTE)})
+    try:
+        ok_record = make_access_record("GET", HTTPStatus.OK)
+        assert not sampler.filter(ok_record)
+        error_record = make_access_record("GET", HTTPStatus.INTERNAL_SERVER_ERROR)
+        assert sampler.filter(error_record)
+        assert sampler.filter(make_access_record("POST", HTTPStatus.CREATED))
+    finally:
+        request_scope_var.reset(token)
+
+    assert error_record.__dict__["status_code"] == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert error_record.__dict__["method"] == "GET"
+
+
+def test_full_log_queue_drops_records() -> None:
+    """Тест отбрасывания записей без блокировки, если очередь логов заполнена."""
+    handler = NonBlockingQueueHandler(queue.Queue(QUEUE_SIZE))
+    dropped_before = REGISTRY.get_sample_value("ugc_log_records_dropped_total") or 0.0
+
+    for _ in range(RECORDS_COUNT):
+        handler.handle(logging.makeLogRecord({"msg": "запись"}))
+
+    assert REGISTRY.get_sample_value("ugc_log_records_dropped_total") == dropped_before + RECORDS_COUNT - QUEUE_SIZE
@@ -0,0 +1,60 @@
+# stdlib
+from datetime import timedelta
+from http import HTTPStatus
+
+# thirdparty
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pymongo import monitoring
+
+# project
+from db.command_metrics import CommandMetricsListener, get_command_collection
+from middlewares.metrics import UNMATCHED_ROUTE
+
+CONNECTION_ID = ("mongos1", 27017)
+MOVIE_ROUTE = "/api-ugc/v1/movies/{movie_id}"
+
+
+def get_request_count(route: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "ugc_http_request_duration_seconds_count",
+        {"method": "GET", "route": route, "status": status},
+    )
+    return value or 0.0
+
+
+def test_request_metrics(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест записи времени запросов по шаблону маршрута и отдачи метрик без X-Request-Id."""
+    found_before = get_request_count(MOVIE_ROUTE, "200")
+    not_found_before = get_request_count(UNMATCHED_ROUTE, "404")
+
+    client.get("/api-ugc/v1/movies/22222222-2222-2222-2222-222222222222", headers=headers)
+    client.get("/api-ugc/v1/unknown", headers=headers)
+    response = client.get("/metrics")
+
+    assert response.status_code == HTTPStatus.OK
+    assert "ugc_http_requests_in_progress" in response.text
+    assert get_request_count(MOVIE_ROUTE, "200") == found_before + 1
+    assert get_request_count(UNMATCHED_ROUTE, "404") == not_found_before + 1
+
+
+def test_command_metrics_listener() -> None:
+    """Тест записи времени и ошибок команд MongoDB по коллекциям."""
+    listener = CommandMetricsListener()
+    labels = {"collection": "reviews", "command": "find"}
+    count_before = REGISTRY.get_sample_value("ugc_mongo_command_duration_seconds_count", labels) or 0.0
+    failures_before = REGISTRY.get_sample_value("ugc_mongo_command_failures_total", labels) or 0.0
+
+    for request_id in (1, 2):
+        listener.started(monitoring.CommandStartedEvent({"find": "reviews"}, "Movies", request_id, CONNECTION_ID, 1))
+    listener.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {}, "find", 1, CONNECTION_ID, 1))
+    listener.failed(monitoring.CommandFailedEvent(timedelta(milliseconds=5), {}, "find", 2, CONNECTION_ID, 1))
+
+    assert REGISTRY.get_sample_value("ugc_mongo_command_duration_seconds_count", labels) == count_before + 2
+    assert REGISTRY.get_sample_value("ugc_mongo_command_failures_total", labels) == failures_before + 1
+
+
+def test_get_command_collection() -> None:
+    """Тест определения коллекции команды."""
+    assert get_command_collection("getMore", {"getMore": 1, "collection": "movies"}) == "movies"
+    assert get_command_collection("ping", {"ping": 1}) == ""
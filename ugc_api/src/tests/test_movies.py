@@ -1,11 +1,26 @@
 # stdlib
+from collections.abc import AsyncIterator
 from http import HTTPStatus
+from uuid import UUID
 
 # thirdparty
+import orjson
 from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# project
+from db.movie_stats import rebuild_all_movie_statistics
+from documents.movie import Movie
+from documents.movie_stats import MovieStats
+from services.cache import movie_detail_cache
+from services.movie_import import MovieImporter, iter_ndjson_lines
+from services.reactions import get_movie_statistics
+from services.repositories.movie_stats import MovieStatsRepository
 
 MOVIE_ID = "22222222-2222-2222-2222-222222222222"
 USER_ID = "11111111-1111-1111-1111-111111111111"
+MOVIES_COUNT = 5
+IMPORTED_MOVIES_COUNT = 7
 
 
 def test_get_movies(client: TestClient, headers: dict[str, str]) -> None:
@@ -31,7 +46,13 @@ def test_get_movie_detail(client: TestClient, headers: dict[str, str]) -> None:
     assert response.status_code == HTTPStatus.OK
     data = response.json()
     assert data["id"] == MOVIE_ID
-    assert "additional_info" in data
+    assert data["additional_info"] == {
+        "reactions_count": 1,
+        "likes_count": 1,
+        "dislikes_count": 0,
+        "bookmarks_count": 1,
+        "reviews_count": 1,
+    }
 
 
 def test_create_movie(client: TestClient, headers: dict[str, str]) -> None:
@@ -49,3 +70,157 @@ def test_create_movie(client: TestClient, headers: dict[str, str]) -> None:
     data = response.json()
     assert data["title"] == request_data["title"]
     assert data["rating"] == request_data["rating"]
+
+
+def test_get_movies_with_cursor(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест постраничного получения фильмов по курсору."""
+    for movie_number in range(MOVIES_COUNT - 1):
+        client.post(
+            "/api-ugc/v1/movies/",
+            headers=headers,
+            json={"id": f"6666666{movie_number}-6666-6666-6666-666666666666", "title": "Movie", "rating": 5},
+        )
+
+    movie_ids: list[str] = []
+    params: dict[str, str | int] = {"page_size": 2, "order_by": "rating"}
+    while True:
+        response = client.get("/api-ugc/v1/movies/", headers=headers, params=params)
+        assert response.status_code == HTTPStatus.OK
+        movie_ids.extend(movie["id"] for movie in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params["after"] = next_cursor
+
+    assert len(movie_ids) == len(set(movie_ids)) == MOVIES_COUNT
+    assert movie_ids[-1] == MOVIE_ID
+
+
+def test_get_movies_with_invalid_cursor(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест получения фильмов с некорректным курсором."""
+    response = client.get("/api-ugc/v1/movies/", headers=headers, params={"after": "invalid"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_get_movie_detail_cache_invalidation(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест кеширования детальной информации о фильме и ее сброса после реакции."""
+    hits = movie_detail_cache.hits
+    client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers)
+    client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers)
+    assert movie_detail_cache.hits == hits + 1
+
+    client.post(
+        "/api-ugc/v1/reactions/",
+        headers=headers,
+        json={"content_type": "movie", "target_id": MOVIE_ID, "value": -1},
+    )
+    response = client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers)
+
+    assert movie_detail_cache.hits == hits + 1
+    assert response.json()["additional_info"]["dislikes_count"] == 1
+
+
+def test_get_movie_details(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест получения нескольких фильмов: порядок запроса сохраняется, отсутствующие фильмы перечисляются."""
+    new_movie_id = "77777777-7777-7777-7777-777777777777"
+    missing_movie_id = "88888888-8888-8888-8888-888888888888"
+    client.post("/api-ugc/v1/movies/", headers=headers, json={"id": new_movie_id, "title": "Movie", "rating": 5})
+
+    response = client.get(
+        "/api-ugc/v1/movies/details",
+        headers=headers,
+        params={"ids": [new_movie_id, missing_movie_id, MOVIE_ID, new_movie_id]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [movie["id"] for movie in data["items"]] == [new_movie_id, MOVIE_ID]
+    assert data["items"][0]["additional_info"]["likes_count"] == 0
+    assert data["items"][1]["additional_info"]["likes_count"] == 1
+    assert data["missing_ids"] == [missing_movie_id]
+
+
+def test_import_movies(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест импорта фильмов из NDJSON: ошибки валидации и дубликаты возвращаются с номерами строк."""
+    lines = [
+        orjson.dumps({"id": "99999999-9999-9999-9999-999999999999", "title": "Imported", "rating": 7}),
+        b"",
+        b"{not json",
+        orjson.dumps({"id": MOVIE_ID, "title": "Duplicate", "rating": 1}),
+        orjson.dumps({"title": "Without id", "rating": 1}),
+    ]
+
+    response = client.post(
+        "/api-ugc/v1/movies/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content=b"\n".join(lines),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["received"] == len(lines) - 1
+    assert data["inserted"] == 1
+    assert data["failed"] == len(lines) - 2
+    assert [error["line"] for error in data["errors"]] == [3, 4, 5]
+    assert data["errors"][1]["detail"] == "Document already exists"
+
+
+async def test_import_movies_in_chunks(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест импорта пачками из потока, в котором строки разрезаны между фрагментами."""
+    body = b"".join(
+        orjson.dumps({"id": f"5555555{movie_number}-5555-5555-5555-555555555555", "title": "Movie", "rating": 5})
+        + b"\n"
+        for movie_number in range(IMPORTED_MOVIES_COUNT)
+    )
+    body += b'{"title": "' + b"x" * 100 + b'"}\n'
+
+    async def stream() -> AsyncIterator[bytes]:
+        for start in range(0, len(body), 10):
+            yield body[start : start + 10]
+
+    importer = MovieImporter(chunk_size=3, max_errors=10)
+    result = await importer.run(iter_ndjson_lines(stream(), max_line_size=100))
+
+    assert result.inserted == IMPORTED_MOVIES_COUNT
+    assert [(error.line, error.detail) for error in result.errors] == [
+        (IMPORTED_MOVIES_COUNT + 1, "Line is too long")
+    ]
+    assert await Movie.count() == IMPORTED_MOVIES_COUNT + 1
+
+
+def test_get_movie_detail_with_fields(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест выборки только запрошенных полей фильма."""
+    response = client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers, params={"fields": "id,additional_info"})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert list(data) == ["id", "additional_info"]
+    assert data["additional_info"]["likes_count"] == 1
+
+
+async def test_rebuild_all_movie_statistics(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест пересчета статистики всех фильмов, включая фильмы без документа статистики."""
+    await Movie.insert_many([Movie(title=f"Movie {number}", rating=5) for number in range(MOVIES_COUNT)])
+    await MovieStats.get_motor_collection().delete_many({})
+
+    rebuilt = await rebuild_all_movie_statistics(concurrency=2)
+
+    assert rebuilt == MOVIES_COUNT + 1
+    assert await MovieStats.count() == MOVIES_COUNT + 1
+    additional_info = await MovieStatsRepository().get_statistics(UUID(MOVIE_ID))
+    assert additional_info.model_dump() == await get_movie_statistics(UUID(MOVIE_ID))
+
+
+async def test_statistics_created_by_increment(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест чтения статистики, документ которой создан первым изменением и содержит не все счетчики."""
+    movie = Movie(title="Movie without statistics", rating=5)
+    await movie.insert()
+    repo = MovieStatsRepository()
+    await repo.increment(movie.id, {"bookmarks_count": 1, "likes_count": 0})
+
+    statistics = await repo.get_statistics(movie.id)
+
+    assert statistics.bookmarks_count == 1
+    assert statistics.likes_count == 0
+    assert (await repo.get_statistics_many([movie.id]))[movie.id] == statistics
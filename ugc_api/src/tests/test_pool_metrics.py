@@ -0,0 +1,57 @@
+# thirdparty
+from prometheus_client import REGISTRY
+from pymongo import monitoring
+
+# project
+from core.config import AppSettings
+from db.pool_metrics import PoolMetricsListener
+
+ADDRESS = ("mongos1", 27017)
+CHECKOUT_WAITS = [0.002, 0.010]
+MAX_POOL_SIZE = 50
+
+
+def test_pool_metrics_listener() -> None:
+    """Тест подсчета занятых соединений и времени ожидания соединения из пула."""
+    listener = PoolMetricsListener()
+
+    listener.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    for connection_id, wait in enumerate(CHECKOUT_WAITS, start=1):
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, wait))
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    listener.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, "timeout", 1.0))
+
+    metrics = listener.snapshot()
+    assert metrics.connections_created == 1
+    assert metrics.checkouts == len(CHECKOUT_WAITS)
+    assert metrics.connections_in_use == 1
+    assert metrics.max_connections_in_use == len(CHECKOUT_WAITS)
+    assert metrics.max_checkout_wait == max(CHECKOUT_WAITS)
+    assert metrics.average_checkout_wait == sum(CHECKOUT_WAITS) / len(CHECKOUT_WAITS)
+    assert metrics.checkout_failures == 1
+
+
+def test_mongo_client_options() -> None:
+    """Тест передачи в клиент только заданных параметров пула и сжатия."""
+    settings = AppSettings(mongo_max_pool_size=MAX_POOL_SIZE, mongo_compressors="zstd,zlib")
+
+    options = settings.mongo_client_options
+
+    assert options["maxPoolSize"] == MAX_POOL_SIZE
+    assert options["compressors"] == "zstd,zlib"
+    assert "waitQueueTimeoutMS" not in options
+
+
+def test_pool_metrics_exported() -> None:
+    """Тест экспорта времени ожидания соединения и числа занятых соединений в Prometheus."""
+    listener = PoolMetricsListener()
+    waits_before = REGISTRY.get_sample_value("ugc_mongo_pool_checkout_wait_seconds_count") or 0.0
+    in_use_before = REGISTRY.get_sample_value("ugc_mongo_pool_connections_in_use") or 0.0
+
+    for connection_id, wait in enumerate(CHECKOUT_WAITS, start=1):
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, wait))
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+
+    waits = REGISTRY.get_sample_value("ugc_mongo_pool_checkout_wait_seconds_count")
+    assert waits == waits_before + len(CHECKOUT_WAITS)
+    assert REGISTRY.get_sample_value("ugc_mongo_pool_connections_in_use") == in_use_before + 1
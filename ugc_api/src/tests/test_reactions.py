@@ -1,11 +1,44 @@
 # stdlib
+import asyncio
 from http import HTTPStatus
+from typing import Any
+from unittest.mock import patch
+from uuid import UUID, uuid4
 
 # thirdparty
+import orjson
 from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from prometheus_client import REGISTRY
+from pymongo.errors import BulkWriteError
+
+# project
+from documents.movie import Movie
+from documents.reaction import ContentType, LikeValue, Reaction
+from documents.review import Review
+from schemas.reaction import Reaction as ReactionSchema, ReactionRequest
+from services.bson_json import dumps_documents
+from services.counter_buffer import CounterBuffer
+from services.reactions import (
+    apply_user_reactions_batch,
+    get_movie_statistics,
+    remove_user_reaction,
+    update_user_reaction,
+)
+from services.repositories.movie_stats import MovieStatsRepository
+from services.repositories.movies import MovieRepository
+from services.repositories.reactions import ReactionRepository
+from services.repositories.reviews import ReviewRepository
 
 MOVIE_ID = "22222222-2222-2222-2222-222222222222"
 USER_ID = "11111111-1111-1111-1111-111111111111"
+REVIEW_ID = "44444444-4444-4444-4444-444444444444"
+MOVIE_RATING = 8
+REVIEW_RATING = 9
+CONCURRENT_REACTIONS = 300
+RAW_PAGE_SIZE = 3
+# Рейтинг фильма и документ статистики фильма
+BUFFERED_DOCUMENTS = 2
 
 
 def test_create_reaction(client: TestClient, headers: dict[str, str]) -> None:
@@ -53,3 +86,239 @@ def test_remove_reaction(client: TestClient, headers: dict[str, str]) -> None:
     assert response.status_code == HTTPStatus.OK
     data = response.json()
     assert data["success"] is True
+
+
+async def test_concurrent_reactions_rating(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест итогового рейтинга при одновременных реакциях на один фильм."""
+    movie_id = UUID(MOVIE_ID)
+    values = [LikeValue.like if number % 3 else LikeValue.dislike for number in range(CONCURRENT_REACTIONS)]
+    movies_collection = Movie.get_motor_collection()
+    find_one = movies_collection.find_one
+
+    async def find_one_with_latency(*args: Any, **kwargs: Any) -> Any:
+        # Имитация сетевой задержки: конкурентные запросы успевают выполниться между чтением и записью
+        document = await find_one(*args, **kwargs)
+        await asyncio.sleep(0)
+        return document
+
+    with patch.object(movies_collection, "find_one", find_one_with_latency):
+        await asyncio.gather(
+            *(
+                update_user_reaction(
+                    target_id=movie_id,
+                    content_type=ContentType.movie,
+                    user_id=uuid4(),
+                    value=value,
+                    repo=MovieRepository(),
+                )
+                for value in values
+            )
+        )
+
+    movie = await Movie.get(movie_id)
+    assert movie is not None
+    assert movie.rating == MOVIE_RATING + sum(values)
+
+
+async def test_toggle_reaction_rating(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест изменения рейтинга при смене и удалении реакции пользователя."""
+    movie_id = UUID(MOVIE_ID)
+    user_id = UUID(USER_ID)
+    # Фикстура содержит лайк пользователя, учтенный в рейтинге фильма
+    expected_ratings = [
+        (LikeValue.dislike, MOVIE_RATING - 2),
+        (LikeValue.dislike, MOVIE_RATING - 2),
+        (None, MOVIE_RATING - 1),
+        (None, MOVIE_RATING - 1),
+        (LikeValue.like, MOVIE_RATING),
+    ]
+
+    for value, expected_rating in expected_ratings:
+        if value is None:
+            await remove_user_reaction(movie_id, ContentType.movie, user_id, repo=MovieRepository())
+        else:
+            await update_user_reaction(movie_id, ContentType.movie, user_id, value, repo=MovieRepository())
+        movie = await Movie.get(movie_id)
+        assert movie is not None
+        assert movie.rating == expected_rating
+
+
+async def test_movie_stats_match_recomputed_statistics(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест совпадения инкрементально обновляемой статистики фильма с пересчитанной по коллекциям."""
+    movie_id = UUID(MOVIE_ID)
+    user_ids = [uuid4() for _ in range(4)]
+    for user_id in user_ids:
+        await update_user_reaction(movie_id, ContentType.movie, user_id, LikeValue.like, repo=MovieRepository())
+    await update_user_reaction(movie_id, ContentType.movie, user_ids[0], LikeValue.dislike, repo=MovieRepository())
+    await remove_user_reaction(movie_id, ContentType.movie, user_ids[1], repo=MovieRepository())
+    await remove_user_reaction(movie_id, ContentType.movie, UUID(USER_ID), repo=MovieRepository())
+
+    additional_info = await MovieStatsRepository().get_statistics(movie_id)
+
+    assert additional_info.model_dump() == await get_movie_statistics(movie_id)
+
+
+async def test_counter_buffer_flushes_merged_deltas(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест объединения изменений рейтинга и статистики в буфере и их записи при остановке."""
+    movie_id = UUID(MOVIE_ID)
+    flushes_before = REGISTRY.get_sample_value("ugc_counter_buffer_flush_size_count") or 0.0
+    flushed_before = REGISTRY.get_sample_value("ugc_counter_buffer_flush_size_sum") or 0.0
+    buffer = CounterBuffer(flush_interval=60, max_pending=1000)
+    buffer.start()
+
+    with patch("services.reactions.counter_buffer", buffer):
+        for _ in range(CONCURRENT_REACTIONS):
+            await update_user_reaction(movie_id, ContentType.movie, uuid4(), LikeValue.like, repo=MovieRepository())
+
+        movie = await Movie.get(movie_id)
+        assert movie is not None
+        assert movie.rating == MOVIE_RATING
+
+        await buffer.stop()
+
+    movie = await Movie.get(movie_id)
+    assert movie is not None
+    assert movie.rating == MOVIE_RATING + CONCURRENT_REACTIONS
+    additional_info = await MovieStatsRepository().get_statistics(movie_id)
+    assert additional_info.likes_count == CONCURRENT_REACTIONS + 1
+    assert buffer.metrics.flushes == 1
+    assert buffer.metrics.last_flush_size == BUFFERED_DOCUMENTS
+    assert REGISTRY.get_sample_value("ugc_counter_buffer_flush_size_count") == flushes_before + 1
+    assert REGISTRY.get_sample_value("ugc_counter_buffer_flush_size_sum") == flushed_before + BUFFERED_DOCUMENTS
+    assert REGISTRY.get_sample_value("ugc_counter_buffer_flush_lag_seconds_count") == flushes_before + 1
+
+
+async def test_counter_buffer_requeues_only_failed_writes(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест возврата в буфер только операций из writeErrors: записанные изменения не применяются повторно."""
+    movie_ids = [UUID(MOVIE_ID), uuid4()]
+    movies_collection = Movie.get_motor_collection()
+    bulk_write = movies_collection.bulk_write
+
+    async def bulk_write_with_error(requests: list, **kwargs: Any) -> Any:
+        # Первая операция применяется, вторая завершается ошибкой записи
+        await bulk_write(requests[:1], **kwargs)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 2, "errmsg": "error"}]})
+
+    buffer = CounterBuffer(flush_interval=60, max_pending=1000)
+    for movie_id in movie_ids:
+        buffer.add(Movie, movie_id, {"rating": 1}, upsert=True)
+    with patch.object(movies_collection, "bulk_write", bulk_write_with_error):
+        await buffer.flush()
+
+    assert buffer.pending == 1
+    assert buffer.metrics.failed_flushes == 1
+    await buffer.flush()
+    ratings = {record["_id"].as_uuid(): record["rating"] async for record in movies_collection.find({})}
+    assert ratings == {movie_ids[0]: MOVIE_RATING + 1, movie_ids[1]: 1}
+
+
+async def test_counter_buffer_keeps_running_after_error(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест продолжения фонового сброса после непредвиденной ошибки без потери изменений."""
+    buffer = CounterBuffer(flush_interval=60, max_pending=1)
+    buffer.start()
+
+    with patch("services.counter_buffer.bulk_increment", side_effect=RuntimeError("error")):
+        buffer.add(Movie, UUID(MOVIE_ID), {"rating": 1}, upsert=False)
+        await asyncio.sleep(0.01)
+
+    assert buffer.running
+    assert buffer.pending == 1
+    await buffer.stop()
+    movie = await Movie.get(UUID(MOVIE_ID))
+    assert movie is not None
+    assert movie.rating == MOVIE_RATING + 1
+
+
+async def test_reactions_batch(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест пакетной записи реакций: последняя реакция на цель побеждает, несуществующие цели пропускаются."""
+    movie_id, review_id, unknown_id = UUID(MOVIE_ID), UUID(REVIEW_ID), uuid4()
+    reaction_requests = [
+        ReactionRequest(content_type=ContentType.movie, target_id=movie_id, value=LikeValue.dislike),
+        ReactionRequest(content_type=ContentType.review, target_id=review_id, value=LikeValue.like),
+        ReactionRequest(content_type=ContentType.movie, target_id=unknown_id, value=LikeValue.like),
+        ReactionRequest(content_type=ContentType.review, target_id=review_id, value=LikeValue.dislike),
+    ]
+
+    results = await apply_user_reactions_batch(
+        user_id=UUID(USER_ID),
+        reaction_requests=reaction_requests,
+        repos={ContentType.movie: MovieRepository(), ContentType.review: ReviewRepository()},
+    )
+
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[2].detail == "Not found"
+    movie, review = await Movie.get(movie_id), await Review.get(review_id)
+    assert movie is not None
+    assert review is not None
+    assert movie.rating == MOVIE_RATING - 2
+    assert review.rating == REVIEW_RATING - 1
+    additional_info = await MovieStatsRepository().get_statistics(movie_id)
+    assert additional_info.model_dump() == await get_movie_statistics(movie_id)
+
+
+async def test_reactions_batch_conflicting_write(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест пакета, реакции в котором изменились между чтением и записью: изменения считаются от записанных."""
+    movie_id, review_id = UUID(MOVIE_ID), UUID(REVIEW_ID)
+    reaction_requests = [
+        ReactionRequest(content_type=ContentType.movie, target_id=movie_id, value=LikeValue.dislike),
+        ReactionRequest(content_type=ContentType.review, target_id=review_id, value=LikeValue.like),
+    ]
+    get_user_values = ReactionRepository.get_user_values
+
+    async def get_user_values_before_concurrent_write(*args: Any) -> Any:
+        values = await get_user_values(*args)
+        # Одиночные запросы успевают изменить лайк фильма и создать лайк рецензии после чтения пакетом
+        await update_user_reaction(
+            movie_id, ContentType.movie, UUID(USER_ID), LikeValue.dislike, repo=MovieRepository()
+        )
+        await update_user_reaction(
+            review_id, ContentType.review, UUID(USER_ID), LikeValue.like, repo=ReviewRepository()
+        )
+        return values
+
+    with patch.object(ReactionRepository, "get_user_values", get_user_values_before_concurrent_write):
+        results = await apply_user_reactions_batch(
+            user_id=UUID(USER_ID),
+            reaction_requests=reaction_requests,
+            repos={ContentType.movie: MovieRepository(), ContentType.review: ReviewRepository()},
+        )
+
+    assert all(result.success for result in results)
+    movie, review = await Movie.get(movie_id), await Review.get(review_id)
+    assert movie is not None
+    assert review is not None
+    assert movie.rating == MOVIE_RATING - 2
+    assert review.rating == REVIEW_RATING + 1
+    additional_info = await MovieStatsRepository().get_statistics(movie_id)
+    assert additional_info.model_dump() == await get_movie_statistics(movie_id)
+
+
+def test_reactions_batch_endpoint(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест эндпоинта пакетной записи реакций."""
+    request_data = [{"content_type": "movie", "target_id": MOVIE_ID, "value": None}]
+
+    response = client.post("/api-ugc/v1/reactions/batch", headers=headers, json=request_data)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [
+        {"content_type": "movie", "target_id": MOVIE_ID, "success": True, "detail": None},
+    ]
+
+
+async def test_raw_list_matches_documents(mock_mongodb: AsyncIOMotorDatabase) -> None:
+    """Тест совпадения ответа и курсора list_raw с выдачей через модели Beanie."""
+    for _ in range(RAW_PAGE_SIZE):
+        await Reaction(user_id=uuid4(), target_id=uuid4(), value=LikeValue.dislike).insert()
+    fields = list(ReactionSchema.model_fields)
+    repo = ReactionRepository()
+
+    documents = await repo.list(limit=RAW_PAGE_SIZE, sort_field="value")
+    records = await repo.list_raw(fields=fields, limit=RAW_PAGE_SIZE, sort_field="value")
+
+    expected = [
+        ReactionSchema.model_validate(document, from_attributes=True).model_dump(mode="json") for document in documents
+    ]
+    assert orjson.loads(dumps_documents(records, fields)) == expected
+    assert repo.get_next_raw_cursor(records, RAW_PAGE_SIZE, "value") == repo.get_next_cursor(
+        documents, RAW_PAGE_SIZE, "value"
+    )
@@ -58,3 +58,27 @@ def test_delete_review(client: TestClient, headers: dict[str, str]) -> None:
     )
 
     assert response.status_code == HTTPStatus.NO_CONTENT
+
+    movie_response = client.get(f"/api-ugc/v1/movies/{MOVIE_ID}", headers=headers)
+    assert movie_response.json()["additional_info"]["reviews_count"] == 0
+
+
+def test_get_reviews_with_fields(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест выборки только запрошенных полей рецензий."""
+    response = client.get("/api-ugc/v1/reviews/", headers=headers, params={"fields": "rating,id"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [{"id": REVIEW_ID, "rating": 9}]
+
+    response = client.get(f"/api-ugc/v1/reviews/{REVIEW_ID}", headers=headers, params={"fields": "title"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"title": "Test Review"}
+
+
+def test_get_reviews_with_unknown_fields(client: TestClient, headers: dict[str, str]) -> None:
+    """Тест запроса полей, которых нет в схеме ответа."""
+    response = client.get("/api-ugc/v1/reviews/", headers=headers, params={"fields": "id,password"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "password" in response.json()["detail"]
@@ -0,0 +1,133 @@
+# stdlib
+from collections.abc import Mapping
+from typing import Any
+from unittest.mock import patch
+
+# thirdparty
+from bson import Timestamp
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+# project
+from core.config import settings
+from documents.movie import Movie
+from middlewares.causal_time import CAUSAL_TIME_STATE, CausalTimeCookieMiddleware
+from services.causal_sessions import CAUSAL_TIME_COOKIE, dump_operation_times, start_causal_session
+from services.repositories.bookmarks import BookmarkRepository
+from services.repositories.movies import MovieRepository
+
+MAX_STALENESS = 120
+CLUSTER_TIME = {"clusterTime": Timestamp(100, 1)}
+OPERATION_TIME = Timestamp(100, 1)
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.cluster_time: Mapping[str, Any] | None = None
+        self.operation_time: Timestamp | None = None
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+    def advance_cluster_time(self, cluster_time: Mapping[str, Any]) -> None:
+        self.cluster_time = cluster_time
+
+    def advance_operation_time(self, operation_time: Timestamp) -> None:
+        self.operation_time = operation_time
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.sessions: list[FakeSession] = []
+
+    async def start_session(self, causal_consistency: bool) -> FakeSession:
+        assert causal_consistency
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+
+def test_read_collection_uses_secondary_preferred() -> None:
+    """Тест чтения публичных списков со вторичных узлов с ограничением отставания."""
+    client: AsyncIOMotorClient = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    collection = client.test_db.movies
+
+    with (
+        patch.object(Movie, "get_motor_collection", return_value=collection),
+        patch.object(settings, "mongo_secondary_reads", True),
+        patch.object(settings, "mongo_max_staleness_seconds", MAX_STALENESS),
+    ):
+        read_preference = MovieRepository()._get_read_collection().read_preference
+        bookmark_read_preference = BookmarkRepository()._get_read_collection().read_preference
+
+    assert read_preference == SecondaryPreferred(max_staleness=MAX_STALENESS)
+    # Без причинно-согласованной сессии закладки пользователя читаются с первичного узла
+    assert bookmark_read_preference == Primary()
+
+
+def test_read_collection_uses_primary_when_disabled() -> None:
+    """Тест чтения с первичного узла, если чтение со вторичных узлов выключено."""
+    client: AsyncIOMotorClient = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    collection = client.test_db.movies
+
+    with (
+        patch.object(Movie, "get_motor_collection", return_value=collection),
+        patch.object(settings, "mongo_secondary_reads", False),
+    ):
+        assert MovieRepository()._get_read_collection() is collection
+
+
+async def test_causal_session_continues_client_operations() -> None:
+    """Тест передачи времени последней операции клиента в его следующую сессию через cookie."""
+    client = FakeClient()
+
+    with patch.object(settings, "mongo_secondary_reads", True):
+        async with start_causal_session(client, None) as session:  # type: ignore[arg-type]
+            assert session is not None
+            assert session.operation_time is None
+            # Время, которое драйвер сохраняет в сессии после записи
+            session.advance_cluster_time(CLUSTER_TIME)
+            session.advance_operation_time(OPERATION_TIME)
+            causal_time = dump_operation_times(session)  # type: ignore[arg-type]
+
+        assert causal_time is not None
+        async with start_causal_session(client, causal_time) as session:  # type: ignore[arg-type]
+            assert session is not None
+            assert session.cluster_time == CLUSTER_TIME
+            assert session.operation_time == OPERATION_TIME
+
+        async with start_causal_session(client, "поврежденное значение") as session:  # type: ignore[arg-type]
+            assert session is not None
+            assert session.operation_time is None
+
+
+async def test_causal_session_disabled() -> None:
+    """Тест работы без сессии, если чтение со вторичных узлов выключено."""
+    client = FakeClient()
+
+    with patch.object(settings, "mongo_secondary_reads", False):
+        async with start_causal_session(client, None) as session:  # type: ignore[arg-type]
+            assert session is None
+
+    assert not client.sessions
+
+
+def test_causal_time_cookie_middleware() -> None:
+    """Тест возврата клиенту cookie со временем, которое зависимость сессии записала в request.state."""
+    app = FastAPI()
+
+    @app.get("/")
+    async def index(request: Request) -> dict[str, str]:
+        setattr(request.state, CAUSAL_TIME_STATE, "causal-time")
+        return {}
+
+    app.add_middleware(CausalTimeCookieMiddleware, max_age=MAX_STALENESS)
+    response = TestClient(app).get("/")
+
+    assert response.cookies[CAUSAL_TIME_COOKIE] == "causal-time"
+    assert f"Max-Age={MAX_STALENESS}" in response.headers["set-cookie"]
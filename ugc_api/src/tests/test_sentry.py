@@ -0,0 +1,93 @@
+# stdlib
+from collections.abc import Generator
+from typing import Any
+
+# thirdparty
+import pytest
+import sentry_sdk
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.transport import Transport
+from sentry_sdk.types import Event
+
+# project
+from core.sentry import RouteTracesSampler
+from main import app
+from middlewares.sentry_traces import SlowRequestTraceMiddleware
+
+DEFAULT_RATE = 0.01
+MOVIES_RATE = 0.001
+# Любой запрос дольше этого порога
+SLOW_REQUEST_THRESHOLD_MS = 0.000001
+ROUTE_RATES = {"GET /api-ugc/v1/movies/": MOVIES_RATE, "POST /api-ugc/v1/reviews/": 1.0}
+
+
+class CapturingTransport(Transport):
+    def __init__(self, options: dict[str, Any] | None = None) -> None:
+        super().__init__(options)
+        self.transactions: list[Event] = []
+
+    def capture_envelope(self, envelope: Envelope) -> None:
+        transaction = envelope.get_transaction_event()
+        if transaction is not None:
+            self.transactions.append(transaction)
+
+
+def get_sampling_context(method: str, path: str) -> dict[str, Any]:
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    return {"parent_sampled": None, "asgi_scope": scope}
+
+
+def test_route_traces_sampler() -> None:
+    """Тест выбора доли трассировок по маршруту запроса."""
+    sampler = RouteTracesSampler(app, default_rate=DEFAULT_RATE, route_rates=ROUTE_RATES)
+
+    assert sampler(get_sampling_context("GET", "/api-ugc/v1/movies/")) == MOVIES_RATE
+    assert sampler(get_sampling_context("POST", "/api-ugc/v1/reviews/")) == 1.0
+    assert sampler(get_sampling_context("GET", "/api-ugc/v1/reviews/")) == DEFAULT_RATE
+    assert sampler(get_sampling_context("GET", "/unknown")) == DEFAULT_RATE
+    assert sampler({"parent_sampled": True, "asgi_scope": None}) == 1.0
+
+
+@pytest.fixture
+def transport() -> Generator[CapturingTransport, None, None]:
+    transport = CapturingTransport()
+    sentry_sdk.init(dsn="http://public@localhost/1", transport=transport, traces_sample_rate=0.0)
+    yield transport
+    sentry_sdk.init()
+
+
+def create_test_client(slow_request_threshold_ms: float) -> TestClient:
+    test_app = FastAPI()
+
+    @test_app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict[str, int]:
+        if item_id == 0:
+            raise HTTPException(status_code=503)
+        return {"item_id": item_id}
+
+    test_app.add_middleware(SlowRequestTraceMiddleware, slow_request_threshold_ms=slow_request_threshold_ms)
+    return TestClient(test_app)
+
+
+def test_failed_requests_keep_traces(transport: CapturingTransport) -> None:
+    """Тест отправки транзакций запросов с ошибкой 5xx, не попавших в выборку."""
+    client = create_test_client(slow_request_threshold_ms=0)
+
+    client.get("/items/1")
+    client.get("/items/0")
+
+    assert [transaction["transaction"] for transaction in transport.transactions] == ["/items/{item_id}"]
+    assert transport.transactions[0]["tags"]["sampling_reason"] == "error"
+
+
+def test_slow_requests_keep_traces(transport: CapturingTransport) -> None:
+    """Тест отправки транзакций запросов дольше порога, не попавших в выборку."""
+    client = create_test_client(slow_request_threshold_ms=SLOW_REQUEST_THRESHOLD_MS)
+
+    client.get("/items/1")
+
+    assert len(transport.transactions) == 1
+    assert transport.transactions[0]["tags"]["sampling_reason"] == "slow"
+    assert transport.transactions[0]["contexts"]["trace"]["status"] == "ok"
@@ -0,0 +1,48 @@
+# stdlib
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+# project
+from core.config import settings
+from core.metrics import MULTIPROC_DIR_ENV
+from server import get_limit_max_requests, get_workers_count, prepare_metrics_dir
+
+WORKERS = 3
+AVAILABLE_CPUS = {0, 1, 2, 3}
+LIMIT_MAX_REQUESTS = 10000
+
+
+def test_get_workers_count() -> None:
+    """Тест выбора числа воркеров: явное значение или число доступных процессу ядер."""
+    assert get_workers_count(WORKERS) == WORKERS
+
+    with patch("os.sched_getaffinity", return_value=AVAILABLE_CPUS, create=True):
+        assert get_workers_count(0) == len(AVAILABLE_CPUS)
+
+
+def test_limit_max_requests_requires_several_workers() -> None:
+    """Тест перезапуска воркеров после limit_max_requests только при нескольких воркерах."""
+    assert get_limit_max_requests(WORKERS, LIMIT_MAX_REQUESTS) == LIMIT_MAX_REQUESTS
+    assert get_limit_max_requests(WORKERS, 0) is None
+    # Единственный воркер не перезапускается: uvicorn завершил бы весь сервис
+    assert get_limit_max_requests(1, LIMIT_MAX_REQUESTS) is None
+
+
+def test_prepare_metrics_dir(tmp_path: Path) -> None:
+    """Тест подготовки каталога метрик воркеров: он очищается и передается воркерам через окружение."""
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "counter_1.db").touch()
+
+    with (
+        patch.object(settings, "metrics_multiproc_dir", str(metrics_dir)),
+        patch.dict(os.environ, clear=False) as environ,
+    ):
+        prepare_metrics_dir(1)
+        assert MULTIPROC_DIR_ENV not in environ
+
+        prepare_metrics_dir(WORKERS)
+        assert environ[MULTIPROC_DIR_ENV] == str(metrics_dir)
+
+    assert list(metrics_dir.iterdir()) == []
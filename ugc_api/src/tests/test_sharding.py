@@ -0,0 +1,21 @@
+# project
+from db.sharding import describe_query_routing
+
+# Запросы на горячих путях записи и чтения должны попадать на один шард
+TARGETED_QUERY_SHAPES = [
+    "movies.get/update_rating_count",
+    "reactions.upsert/remove_value",
+    "reactions.get_movie_statistics",
+    "reviews.get_movie_statistics",
+    "bookmarks.get_or_create",
+    "bookmarks.list by user_id order_by created_at (default)",
+    "movie_stats.get_statistics/increment",
+]
+
+
+def test_hot_query_shapes_are_targeted() -> None:
+    """Тест адресного выполнения горячих запросов при шардировании."""
+    routing = dict(describe_query_routing())
+
+    for shape_name in TARGETED_QUERY_SHAPES:
+        assert routing[shape_name], shape_name
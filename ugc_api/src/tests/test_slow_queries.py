@@ -0,0 +1,125 @@
+# stdlib
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from uuid import uuid4
+
+# thirdparty
+import pytest
+from bson import Binary
+from motor.frameworks import asyncio as motor_asyncio_framework
+from pymongo import monitoring
+
+# project
+from db.slow_queries import (
+    SlowQueryListener,
+    get_plan_stages,
+    get_query_shape,
+    is_explainable,
+    propagate_context_to_motor,
+)
+from middlewares.request_id import request_id_var
+
+CONNECTION_ID = ("mongos1", 27017)
+THRESHOLD_MS = 100
+
+
+def make_find(movie_ids: list) -> dict:
+    return {
+        "find": "reviews",
+        "filter": {"movie_id": {"$in": movie_ids}, "rating": {"$gte": 5}},
+        "sort": {"created_at": -1},
+        "limit": 10,
+        "lsid": {"id": Binary.from_uuid(uuid4())},
+        "$db": "Movies",
+    }
+
+
+def test_query_shape_ignores_values() -> None:
+    """Тест одинаковой формы запросов, отличающихся только значениями."""
+    shape = get_query_shape("find", make_find([uuid4()]))
+
+    assert shape == get_query_shape("find", make_find([uuid4(), uuid4()]))
+    assert shape == '{"filter":{"movie_id":{"$in":"?"},"rating":{"$gte":"?"}},"sort":{"created_at":"?"},"limit":"?"}'
+
+
+def test_query_shape_keeps_pipeline_stages() -> None:
+    """Тест сохранения стадий конвейера агрегации в форме запроса."""
+    command = {"aggregate": "reactions", "pipeline": [{"$match": {"target_id": 1}}, {"$group": {"_id": "$value"}}]}
+    expected_shape = '{"pipeline":[{"$match":{"target_id":"?"}},{"$group":{"_id":"?"}}]}'
+
+    assert get_query_shape("aggregate", command) == expected_shape
+
+
+def test_plan_stages_from_all_shards() -> None:
+    """Тест сбора стадий выигравших планов со всех шардов без отклоненных планов."""
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "SHARD_MERGE",
+                "shards": [
+                    {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}, "rejectedPlans": []},
+                    {"winningPlan": {"stage": "COLLSCAN"}, "rejectedPlans": [{"stage": "SORT"}]},
+                ],
+            },
+        },
+    }
+
+    assert get_plan_stages(explain) == ["SHARD_MERGE", "FETCH", "IXSCAN", "COLLSCAN"]
+
+
+def test_slow_query_listener_logs_slow_commands(caplog: pytest.LogCaptureFixture) -> None:
+    """Тест логирования только медленных команд с формой запроса и X-Request-Id."""
+    listener = SlowQueryListener(threshold_ms=THRESHOLD_MS, explain=False, explain_interval=60, max_shapes=10)
+    token = request_id_var.set("slow-request-id")
+    try:
+        for request_id in (1, 2):
+            command = make_find([uuid4()])
+            listener.started(monitoring.CommandStartedEvent(command, "Movies", request_id, CONNECTION_ID, 1))
+    finally:
+        request_id_var.reset(token)
+
+    with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+        fast = timedelta(milliseconds=THRESHOLD_MS - 1)
+        slow = timedelta(milliseconds=THRESHOLD_MS + 1)
+        listener.succeeded(monitoring.CommandSucceededEvent(fast, {}, "find", 1, CONNECTION_ID, 1))
+        listener.succeeded(monitoring.CommandSucceededEvent(slow, {}, "find", 2, CONNECTION_ID, 1))
+
+    assert len(caplog.records) == 1
+    assert 'reviews.find {"filter":{"movie_id":{"$in":"?"}' in caplog.text
+    assert "request_id=slow-request-id" in caplog.text
+
+
+def test_explain_rate_limited_per_shape() -> None:
+    """Тест ограничения частоты explain для одной формы запроса."""
+    listener = SlowQueryListener(threshold_ms=THRESHOLD_MS, explain=True, explain_interval=60, max_shapes=10)
+
+    assert listener._should_explain("reviews.find {}")
+    assert not listener._should_explain("reviews.find {}")
+    assert listener._should_explain("movies.find {}")
+
+
+def test_explain_only_single_statement_writes() -> None:
+    """Тест выполнения explain только для команд update и delete с одной операцией."""
+    statement = {"q": {"movie_id": "?"}, "u": {"$inc": {"likes_count": 1}}}
+
+    assert is_explainable("find", make_find([1]))
+    assert is_explainable("update", {"update": "movie_stats", "updates": [statement]})
+    assert not is_explainable("update", {"update": "movie_stats", "updates": [statement, statement]})
+    assert not is_explainable("delete", {"delete": "reactions", "deletes": []})
+    assert not is_explainable("insert", {"insert": "reactions", "documents": [{}]})
+
+
+async def test_motor_executor_propagates_context() -> None:
+    """Тест передачи X-Request-Id в потоки motor, в которых вызываются события мониторинга."""
+    propagate_context_to_motor()
+    run_on_executor: Callable[..., Awaitable[str | None]] = motor_asyncio_framework.run_on_executor
+    token = request_id_var.set("motor-request-id")
+    try:
+        loop = asyncio.get_running_loop()
+        request_id = await run_on_executor(loop, request_id_var.get)
+    finally:
+        request_id_var.reset(token)
+
+    assert request_id == "motor-request-id"